@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.routers import DefaultRouter
+
+from .metrics import recording_queries
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Пул потоков чтения, ASYNC_READ_WORKERS потоков на процесс."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.ASYNC_READ_WORKERS, thread_name_prefix='api-read'
+            )
+    return _executor
+
+
+def in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def call_view(view, request, *args, **kwargs):
+    """
+    Синхронная вьюха в рабочем потоке: соединения потока проверяются
+    как в начале и конце обычного запроса, запросы к базе идут в счётчик
+    текущего HTTP-запроса, ответ рендерится здесь же.
+    """
+    close_old_connections()
+    try:
+        with recording_queries():
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def as_async_view(view):
+    """
+    Асинхронная обёртка синхронной вьюхи. Django 3.2 без асинхронного
+    ORM выполняет все синхронные вьюхи под ASGI в одном общем потоке;
+    безопасные запросы здесь уходят в пул потоков чтения и выполняются
+    параллельно. Запись остаётся в общем потоке, как раньше.
+    """
+    write = sync_to_async(partial(call_view, view), thread_sensitive=True)
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return await write(request, *args, **kwargs)
+        read = sync_to_async(
+            partial(call_view, view), thread_sensitive=False,
+            executor=get_executor(),
+        )
+        return await read(request, *args, **kwargs)
+
+    return async_view
+
+
+class AsyncReadPattern(URLPattern):
+    """
+    Маршрут с двумя вьюхами: под ASGI (запрос разбирается в цикле
+    событий) отдаёт асинхронную обёртку, под WSGI - исходную вьюху.
+    """
+
+    def __init__(self, pattern, callback, default_args=None, name=None):
+        super().__init__(pattern, callback, default_args, name)
+        self.async_callback = as_async_view(callback)
+
+    def resolve(self, path):
+        match = super().resolve(path)
+        if match is not None and in_event_loop():
+            match.func = self.async_callback
+        return match
+
+
+class AsyncReadRouter(DefaultRouter):
+    """Роутер, у которого маршруты вьюсетов с async_reads асинхронны."""
+
+    def get_urls(self):
+        return [
+            AsyncReadPattern(
+                url.pattern, url.callback, url.default_args, url.name
+            )
+            if getattr(getattr(url.callback, 'cls', None), 'async_reads',
+                       False)
+            else url
+            for url in super().get_urls()
+        ]
@@ -0,0 +1,129 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+# Поля пользователя, которые едут в токене и в кэше claims.
+CLAIM_FIELDS = ('username', 'role', 'is_superuser', 'is_staff')
+VERSION_CLAIM = 'ver'
+CLAIMS_CACHE_SIZE = 1024
+
+_claims = {}
+_claims_lock = threading.Lock()
+
+
+class ClaimsAccessToken(AccessToken):
+    """Access-токен с ролью, правами и версией токенов пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for name in CLAIM_FIELDS:
+            token[name] = getattr(user, name)
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+def load_claims(user_id):
+    return User.objects.filter(
+        **{api_settings.USER_ID_FIELD: user_id}
+    ).values('pk', 'is_active', 'token_version', *CLAIM_FIELDS).first()
+
+
+def get_claims(user_id):
+    """
+    Актуальные claims пользователя из кэша процесса. Запись живёт
+    JWT_CLAIMS_CACHE_TIMEOUT секунд, поэтому смена роли в другом
+    процессе отзывает токены не позже чем через это время.
+    """
+    now = time.monotonic()
+    stale = now - settings.JWT_CLAIMS_CACHE_TIMEOUT
+    with _claims_lock:
+        cached = _claims.get(user_id)
+    if cached is not None and cached[0] > stale:
+        return cached[1]
+    claims = load_claims(user_id)
+    with _claims_lock:
+        if len(_claims) >= CLAIMS_CACHE_SIZE:
+            for key in [key for key, (loaded, _) in _claims.items()
+                        if loaded <= stale]:
+                del _claims[key]
+        if len(_claims) >= CLAIMS_CACHE_SIZE:
+            _claims.clear()
+        _claims[user_id] = (now, claims)
+    return claims
+
+
+def forget_claims(user_id=None):
+    with _claims_lock:
+        if user_id is None:
+            _claims.clear()
+        else:
+            _claims.pop(user_id, None)
+
+
+def make_user(claims):
+    """
+    Пользователь без запроса к базе: загружены только поля из claims,
+    остальные отложены и подгрузятся при первом обращении. Такой объект
+    годится для внешних ключей, а save() сохранит лишь загруженные поля.
+    """
+    values = {'id': claims['pk'], 'is_active': True}
+    values.update((name, claims[name]) for name in CLAIM_FIELDS)
+    names = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        router.db_for_read(User), names, [values[name] for name in names]
+    )
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без загрузки пользователя на каждый запрос.
+    Роль, права, блокировка и версия токенов берутся из кэша claims
+    с коротким временем жизни; версия в токене позволяет отозвать его.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Токен не содержит идентификатора пользователя.'
+            )
+        claims = get_claims(user_id)
+        if claims is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        if not claims['is_active']:
+            raise AuthenticationFailed(
+                'Пользователь заблокирован.', code='user_inactive'
+            )
+        # Токен без версии (например, AccessToken.for_user) не отзывается,
+        # но роль и флаги всё равно берутся из кэша, а не из токена.
+        version = validated_token.get(VERSION_CLAIM)
+        if version is not None and version != claims['token_version']:
+            raise AuthenticationFailed(
+                'Токен отозван: роль или права пользователя изменились.',
+                code='token_revoked',
+            )
+        return make_user(claims)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_claims(sender, instance, **kwargs):
+    forget_claims(getattr(instance, api_settings.USER_ID_FIELD))
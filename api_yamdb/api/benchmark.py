@@ -0,0 +1,517 @@
+import asyncio
+import itertools
+import json
+import random
+import re
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.test import AsyncClient, Client
+from rest_framework.renderers import JSONRenderer
+
+from reviews.models import (Category, Comments, Genre, Review, Title,
+                            User)
+
+from .authentication import ClaimsAccessToken
+from .cache import get_cache
+from .querysets import plan_queryset
+from .renderers import MessagePackRenderer, ORJSONRenderer
+from .serializers import TitleReadSerializer
+from .tokens import confirmation_code_generator
+
+API_PREFIX = '/api/v1'
+QUERIES_PATTERN = re.compile(r'desc="(\d+) queries')
+SAMPLE_SIZE = 50
+RENDERERS = (JSONRenderer, ORJSONRenderer, MessagePackRenderer)
+# Маршруты с асинхронным чтением (async_reads) для замера --fan-in.
+FAN_IN_ROUTES = (
+    'titles-list', 'titles-detail', 'genres-list', 'categories-list',
+    'reviews-list',
+)
+# Администратор, от имени которого идут запросы с токеном.
+BENCHMARK_USERNAME = 'benchmark'
+BENCHMARK_EMAIL = 'benchmark@yamdb.fake'
+
+# Запрос сценария: data уходит телом JSON, token - в Authorization.
+Call = namedtuple('Call', 'method path data token', defaults=(None, None))
+
+
+def api_get(path, token=None):
+    return Call('GET', API_PREFIX + path, token=token)
+
+
+def get_benchmark_user():
+    """Создаёт администратора для сценариев с токеном и пишет ему токен."""
+    user, _ = User.objects.update_or_create(
+        username=BENCHMARK_USERNAME, defaults={
+            'email': BENCHMARK_EMAIL, 'role': User.ADMIN,
+            'is_staff': True, 'is_superuser': True, 'is_active': True,
+        }
+    )
+    return user, str(ClaimsAccessToken.for_user(user))
+
+
+def replace_review(user, title_id, create=True):
+    """Снимает отзыв пользователя на произведение и при create пишет новый."""
+    Review.objects.filter(title_id=title_id, author=user).delete()
+    if create:
+        return Review.objects.create(
+            title_id=title_id, author=user, text='Отзыв', score=5
+        )
+    return None
+
+
+def get_write_scenarios(user, token, titles):
+    """
+    Запись отзывов и комментариев и вход по коду. Сценарий может быть
+    функцией: она готовит строки через ORM до замера и возвращает запрос,
+    например DELETE только что созданного отзыва или POST с новым кодом.
+    """
+    if len(titles) < 2:
+        return {}
+    title, others = titles[0], titles[1:]
+    review = replace_review(user, title)
+    reviews = f'{API_PREFIX}/titles/{title}/reviews/'
+    comments = f'{reviews}{review.pk}/comments/'
+    comment = Comments.objects.create(
+        review=review, author=user, text='Комментарий'
+    )
+
+    def create_review(title_id):
+        def call():
+            replace_review(user, title_id, create=False)
+            return Call('POST', f'{API_PREFIX}/titles/{title_id}/reviews/',
+                        {'text': 'Отзыв', 'score': 7}, token)
+        return call
+
+    def delete_review(title_id):
+        def call():
+            pk = replace_review(user, title_id).pk
+            return Call('DELETE',
+                        f'{API_PREFIX}/titles/{title_id}/reviews/{pk}/',
+                        token=token)
+        return call
+
+    def delete_comment():
+        pk = Comments.objects.create(
+            review=review, author=user, text='Комментарий'
+        ).pk
+        return Call('DELETE', f'{comments}{pk}/', token=token)
+
+    def get_token():
+        # Код одноразовый: после каждого обмена нужен новый.
+        code = confirmation_code_generator.make_code(
+            User.objects.get(pk=user.pk)
+        )
+        return Call('POST', f'{API_PREFIX}/auth/token/', {
+            'username': user.username, 'confirmation_code': code,
+        })
+
+    return {
+        'reviews-create': [create_review(pk) for pk in others],
+        'reviews-update': [Call('PATCH', f'{reviews}{review.pk}/',
+                                {'text': 'Правка'}, token)],
+        'reviews-delete': [delete_review(pk) for pk in others],
+        'comments-create': [Call('POST', comments,
+                                 {'text': 'Комментарий'}, token)],
+        'comments-update': [Call('PATCH', f'{comments}{comment.pk}/',
+                                 {'text': 'Правка'}, token)],
+        'comments-delete': [delete_comment],
+        'auth-signup': [Call('POST', f'{API_PREFIX}/auth/signup/', {
+            'username': user.username, 'email': user.email,
+        })],
+        'auth-token': [get_token],
+    }
+
+
+def get_scenarios(seed=0):
+    """
+    Маршруты API со списками запросов. Пути детальных маршрутов берутся
+    из выборки объектов базы, самые популярные произведения - первыми.
+    Служебные маршруты и запись идут от имени администратора с токеном.
+    """
+    rng = random.Random(seed)
+    titles = list(Title.objects.order_by('-reviews_count', 'pk').values_list(
+        'pk', flat=True
+    )[:SAMPLE_SIZE])
+    reviews = list(Review.objects.filter(title__in=titles[:5]).values_list(
+        'title_id', 'pk'
+    )[:SAMPLE_SIZE])
+    genres = list(Genre.objects.values_list('slug', flat=True)[:SAMPLE_SIZE])
+    categories = list(
+        Category.objects.values_list('slug', flat=True)[:SAMPLE_SIZE]
+    )
+    words = [
+        word for name in Title.objects.values_list('name', flat=True)[:20]
+        for word in name.split()
+    ]
+    user, token = get_benchmark_user()
+    paths = {
+        'titles-list': ['/titles/'],
+        'titles-top': ['/titles/top/'],
+        'genres-list': ['/genres/'],
+        'categories-list': ['/categories/'],
+        'titles-detail': [f'/titles/{pk}/' for pk in titles],
+        'titles-stats': [f'/titles/{pk}/stats/' for pk in titles],
+        'titles-by-genre': [f'/titles/?genre={slug}' for slug in genres],
+        'titles-by-category': [
+            f'/titles/?category={slug}' for slug in categories
+        ],
+        'titles-top-by-genre': [f'/titles/top/?genre={slug}'
+                                for slug in genres],
+        'titles-search': [f'/titles/?name={word}' for word in words],
+        'genres-search': [f'/genres/?search={slug[:3]}' for slug in genres],
+        'reviews-list': [f'/titles/{pk}/reviews/' for pk in titles],
+        'reviews-keyset': [f'/titles/{pk}/reviews/?cursor='
+                           for pk in titles],
+        'reviews-detail': [f'/titles/{title}/reviews/{pk}/'
+                           for title, pk in reviews],
+        'comments-list': [f'/titles/{title}/reviews/{pk}/comments/'
+                          for title, pk in reviews],
+        'sync': ['/sync/'],
+    }
+    scenarios = {
+        name: [api_get(path) for path in route_paths]
+        for name, route_paths in paths.items()
+    }
+    for name, path in (
+        ('users-list', '/users/'), ('users-me', '/users/me/'),
+        ('metrics', '/metrics/'), ('cache-stats', '/cache/stats/'),
+        ('export', '/export/'),
+    ):
+        scenarios[name] = [api_get(path, token)]
+    scenarios.update(get_write_scenarios(user, token, titles))
+    for calls in scenarios.values():
+        rng.shuffle(calls)
+    return {name: calls for name, calls in scenarios.items() if calls}
+
+
+def prepare(call):
+    """Запрос сценария; подготовка через ORM не входит в замер."""
+    return call() if callable(call) else call
+
+
+def get_size(response):
+    """Размер тела; потоковый ответ дочитывается, иначе он не выполнится."""
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def get_client_arguments(call):
+    """Аргументы generic() тестового клиента для запроса сценария."""
+    extra = {}
+    if call.token:
+        extra['HTTP_AUTHORIZATION'] = f'Bearer {call.token}'
+    data = '' if call.data is None else json.dumps(call.data)
+    return (call.method, call.path, data), {
+        'content_type': 'application/json', **extra,
+    }
+
+
+class ClientTransport:
+    """Запросы через тестовый клиент Django в этом же процессе."""
+
+    def __init__(self):
+        self.client = Client(HTTP_HOST='localhost')
+
+    def send(self, call):
+        args, kwargs = get_client_arguments(call)
+        response = self.client.generic(*args, **kwargs)
+        size = get_size(response)
+        return response.status_code, response.get('Server-Timing', ''), size
+
+
+class AsyncClientTransport:
+    """Запросы через асинхронный тестовый клиент: обработчик ASGI."""
+
+    def __init__(self):
+        self.client = AsyncClient()
+
+    async def send(self, call):
+        args, kwargs = get_client_arguments(call)
+        response = await self.client.generic(*args, **kwargs)
+        size = get_size(response)
+        return response.status_code, response.get('Server-Timing', ''), size
+
+
+class HttpTransport:
+    """Запросы к уже запущенному серверу, например gunicorn."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def send(self, call):
+        headers = {'Content-Type': 'application/json'}
+        if call.token:
+            headers['Authorization'] = f'Bearer {call.token}'
+        data = None
+        if call.data is not None:
+            data = json.dumps(call.data).encode('utf-8')
+        request = urllib.request.Request(
+            self.base_url + call.path, data=data, headers=headers,
+            method=call.method,
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                body = response.read()
+                return (response.status,
+                        response.headers.get('Server-Timing', ''), len(body))
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers.get('Server-Timing', ''), 0
+
+
+def percentile(latencies, percent):
+    if len(latencies) < 2:
+        return latencies[0]
+    return statistics.quantiles(latencies, n=100)[percent - 1]
+
+
+def summarize(latencies, queries, statuses, sizes, elapsed):
+    latencies = [latency * 1000 for latency in latencies]
+    return {
+        'requests': len(latencies),
+        'errors': sum(
+            count for status, count in statuses.items() if status >= 400
+        ),
+        'statuses': {str(status): count for status, count in statuses.items()},
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'avg_queries': (
+            round(statistics.fmean(queries), 2) if queries else None
+        ),
+        'max_queries': max(queries) if queries else None,
+        'avg_bytes': sum(sizes) // len(sizes),
+    }
+
+
+def run_scenario(transport, calls, requests, warmup=0, cold=False):
+    """Прогоняет запросы по кругу requests раз, первые warmup не считает."""
+    latencies, queries, sizes, statuses = [], [], [], Counter()
+    started = None
+    for number in range(warmup + requests):
+        if number == warmup:
+            started = time.perf_counter()
+        if cold:
+            get_cache().clear()
+        call = prepare(calls[number % len(calls)])
+        request_started = time.perf_counter()
+        status, timing, size = transport.send(call)
+        latency = time.perf_counter() - request_started
+        if number < warmup:
+            continue
+        latencies.append(latency)
+        statuses[status] += 1
+        sizes.append(size)
+        match = QUERIES_PATTERN.search(timing)
+        if match:
+            queries.append(int(match.group(1)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, queries, statuses, sizes, elapsed)
+
+
+def summarize_samples(samples, elapsed):
+    """Сводка по списку (задержка, статус, Server-Timing, размер)."""
+    queries = [
+        int(match.group(1)) for match in (
+            QUERIES_PATTERN.search(timing) for _, _, timing, _ in samples
+        ) if match
+    ]
+    return summarize(
+        [latency for latency, _, _, _ in samples], queries,
+        Counter(status for _, status, _, _ in samples),
+        [size for _, _, _, size in samples], elapsed,
+    )
+
+
+def fan_in_threads(make_transport, calls, requests, concurrency):
+    """
+    concurrency синхронных воркеров, как у WSGI-сервера: у каждого свой
+    поток, клиент и соединение с базой. Вместе выполняют requests
+    запросов.
+    """
+    numbers = itertools.count()
+
+    def worker():
+        transport = make_transport()
+        samples = []
+        try:
+            for number in numbers:
+                if number >= requests:
+                    break
+                call = prepare(calls[number % len(calls)])
+                started = time.perf_counter()
+                status, timing, size = transport.send(call)
+                samples.append(
+                    (time.perf_counter() - started, status, timing, size)
+                )
+        finally:
+            connections.close_all()
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        futures = [pool.submit(worker) for _ in range(concurrency)]
+        samples = [sample for future in futures for sample in future.result()]
+    return summarize_samples(samples, time.perf_counter() - started)
+
+
+async def fan_in_async(calls, requests, concurrency):
+    """
+    concurrency одновременных клиентов в одном цикле событий через
+    обработчик ASGI, как у асинхронного воркера.
+    """
+    transport = AsyncClientTransport()
+    numbers = itertools.count()
+
+    async def worker():
+        samples = []
+        for number in numbers:
+            if number >= requests:
+                break
+            call = prepare(calls[number % len(calls)])
+            started = time.perf_counter()
+            status, timing, size = await transport.send(call)
+            samples.append(
+                (time.perf_counter() - started, status, timing, size)
+            )
+        return samples
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize_samples(
+        [sample for samples in results for sample in samples],
+        time.perf_counter() - started,
+    )
+
+
+def run_fan_in(requests=200, concurrency=32, seed=0, only=None,
+               base_url=None):
+    """
+    Одни и те же маршруты при concurrency одновременных клиентах:
+    синхронные воркеры WSGI против асинхронного обработчика ASGI в этом
+    процессе. С base_url - только потоки против запущенного сервера,
+    чтобы сравнить, например, gunicorn и uvicorn отдельными прогонами.
+    """
+    scenarios = get_scenarios(seed)
+    routes = {}
+    for name in only or FAN_IN_ROUTES:
+        calls = scenarios.get(name)
+        if not calls:
+            continue
+        if base_url:
+            routes[name] = {'server': fan_in_threads(
+                lambda: HttpTransport(base_url), calls, requests, concurrency
+            )}
+            continue
+        get_cache().clear()
+        wsgi = fan_in_threads(ClientTransport, calls, requests, concurrency)
+        get_cache().clear()
+        routes[name] = {
+            'wsgi': wsgi,
+            'asgi': asyncio.run(fan_in_async(calls, requests, concurrency)),
+        }
+    return {
+        'revision': get_revision(),
+        'started': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'settings': {
+            'requests': requests, 'concurrency': concurrency, 'seed': seed,
+            'async_read_workers': settings.ASYNC_READ_WORKERS,
+        },
+        'routes': routes,
+    }
+
+
+def measure_renderers(pages=200, page_size=100):
+    """Среднее время рендеринга страницы произведений каждым рендерером."""
+    data = TitleReadSerializer(plan_queryset(
+        Title.objects.all()[:page_size], TitleReadSerializer
+    ), many=True).data
+    results = {}
+    for renderer_class in RENDERERS:
+        renderer = renderer_class()
+        media_type = renderer.media_type
+        started = time.perf_counter()
+        for _ in range(pages):
+            body = renderer.render(data, media_type, {})
+        elapsed = time.perf_counter() - started
+        results[renderer_class.__name__] = {
+            'page_size': len(data),
+            'ms_per_page': round(elapsed * 1000 / pages, 3),
+            'bytes': len(body),
+        }
+    return results
+
+
+def get_revision():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(transport, requests=200, warmup=20, cold=False, seed=0,
+        only=None, renderers=False):
+    """Замеряет все сценарии и возвращает отчёт, пригодный для JSON."""
+    scenarios = get_scenarios(seed)
+    if only:
+        scenarios = {
+            name: calls for name, calls in scenarios.items() if name in only
+        }
+    report = {
+        'revision': get_revision(),
+        'started': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'settings': {
+            'requests': requests, 'warmup': warmup,
+            'cold': cold, 'seed': seed,
+        },
+        'dataset': {
+            model._meta.model_name: model.objects.count()
+            for model in (Title, Genre, Category, Review, Comments)
+        },
+        'routes': {
+            name: run_scenario(transport, calls, requests, warmup, cold)
+            for name, calls in scenarios.items()
+        },
+    }
+    if renderers:
+        report['renderers'] = measure_renderers()
+    return report
+
+
+def compare(previous, current):
+    """
+    Сравнивает два отчёта по маршрутам: изменение p95 в процентах
+    и среднего числа запросов к базе.
+    """
+    changes = {}
+    for name, route in current['routes'].items():
+        before = previous['routes'].get(name)
+        if before is None:
+            continue
+        queries = None
+        if route['avg_queries'] is not None \
+                and before['avg_queries'] is not None:
+            queries = round(route['avg_queries'] - before['avg_queries'], 2)
+        changes[name] = {
+            'p95_change_percent': round(
+                (route['p95_ms'] - before['p95_ms'])
+                / max(before['p95_ms'], 1e-6) * 100, 1
+            ),
+            'queries_change': queries,
+        }
+    return changes
@@ -0,0 +1,142 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete,
+                                      post_migrate, post_save)
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from reviews.models import Category, Genre, Review, Title
+from reviews.signals import catalogue_reloaded
+
+CACHE_ALIAS = 'api'
+
+# Какие группы ответов устаревают при изменении модели.
+INVALIDATED_GROUPS = {
+    Title: ('titles',),
+    Title.genre.through: ('titles',),
+    Review: ('titles',),
+    Genre: ('genres', 'titles'),
+    Category: ('categories', 'titles'),
+}
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_generation(group):
+    """
+    Текущее поколение группы. Значение берётся из времени, поэтому
+    после вытеснения ключа из кэша старые ответы не оживут.
+    """
+    cache = get_cache()
+    key = f'generation:{group}'
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def invalidate(*groups):
+    cache = get_cache()
+    for group in groups:
+        cache.set(f'generation:{group}', time.time_ns(), timeout=None)
+
+
+def make_key(group, action, request, view_kwargs):
+    """Ключ ответа по нормализованным параметрам запроса."""
+    params = sorted(
+        (name, sorted(values))
+        for name, values in request.query_params.lists()
+    )
+    raw = repr((request.get_host(), action,
+                sorted(view_kwargs.items()), params))
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'response:{group}:{get_generation(group)}:{digest}'
+
+
+def record(group, outcome):
+    with _stats_lock:
+        _stats[group, outcome] += 1
+
+
+def get_stats():
+    """Счётчики попаданий и промахов текущего процесса по группам."""
+    with _stats_lock:
+        stats = dict(_stats)
+    groups = sorted({group for group, _ in stats})
+    return {
+        group: {
+            'hits': stats.get((group, 'hits'), 0),
+            'misses': stats.get((group, 'misses'), 0),
+        }
+        for group in groups
+    }
+
+
+class ResponseCacheMixin:
+    """
+    Кэширует данные ответов list и retrieve в группе cache_group.
+    Сериализация и запросы к базе при попадании не выполняются.
+    """
+    cache_group = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if self.cache_group is None:
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        key = make_key(self.cache_group, self.action, request, kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            record(self.cache_group, 'hits')
+            response = Response(cached)
+            response['X-Cache'] = 'HIT'
+            return response
+        record(self.cache_group, 'misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(m2m_changed)
+def invalidate_responses(sender, **kwargs):
+    # Поколение меняется после коммита: иначе читатель успеет закэшировать
+    # данные до коммита уже под новым поколением.
+    groups = INVALIDATED_GROUPS.get(sender)
+    if groups:
+        transaction.on_commit(lambda: invalidate(*groups))
+
+
+@receiver(catalogue_reloaded)
+def invalidate_catalogue(sender, **kwargs):
+    groups = {group for groups in INVALIDATED_GROUPS.values()
+              for group in groups}
+    transaction.on_commit(lambda: invalidate(*groups))
+
+
+@receiver(post_migrate)
+def clear_responses(sender, **kwargs):
+    get_cache().clear()
@@ -0,0 +1,82 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Сильный ETag из значений, однозначно задающих состояние ответа."""
+    return quote_etag(hashlib.md5(repr(parts).encode('utf-8')).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    Условные запросы: ETag и Last-Modified считаются до сериализации,
+    поэтому 304 и 412 отдаются без рендеринга тела ответа.
+
+    Наследник определяет get_list_validators и get_object_validators,
+    возвращающие пару (etag, last_modified) для списка и для объекта;
+    last_modified - timestamp или None. Если last_modified_is_validator
+    выключен, Last-Modified только сообщается клиенту, а сравнивается
+    лишь ETag.
+    """
+    last_modified_is_validator = True
+
+    def get_list_validators(self):
+        raise NotImplementedError
+
+    def get_object_validators(self):
+        raise NotImplementedError
+
+    def get_object(self):
+        if getattr(self, '_conditional_object', None) is None:
+            self._conditional_object = super().get_object()
+        return self._conditional_object
+
+    def get_precondition_response(self, etag, last_modified):
+        if not self.last_modified_is_validator:
+            last_modified = None
+        return get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        )
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code < 300:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_validators()
+        precondition = self.get_precondition_response(etag, last_modified)
+        if precondition is not None:
+            return precondition
+        response = super().list(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_object_validators()
+        precondition = self.get_precondition_response(etag, last_modified)
+        if precondition is not None:
+            return precondition
+        response = super().retrieve(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    def check_object_preconditions(self):
+        """If-Match/If-Unmodified-Since для изменения и удаления."""
+        etag, last_modified = self.get_object_validators()
+        return self.get_precondition_response(etag, last_modified)
+
+    def update(self, request, *args, **kwargs):
+        precondition = self.check_object_preconditions()
+        if precondition is not None:
+            return precondition
+        response = super().update(request, *args, **kwargs)
+        return self.set_validators(response, *self.get_object_validators())
+
+    def destroy(self, request, *args, **kwargs):
+        precondition = self.check_object_preconditions()
+        if precondition is not None:
+            return precondition
+        return super().destroy(request, *args, **kwargs)
@@ -0,0 +1,173 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from reviews.models import Comments, Genre, Review, Title
+
+from .benchmark import ClientTransport, get_scenarios
+from .pagination import KeysetPagination
+
+PAGE = 21
+KEYSET_ORDERING = KeysetPagination.ordering
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+# «SCAN t» без индекса; обход по индексу («SCAN t USING INDEX i»)
+# и SEARCH полным сканированием не считаются.
+FULL_SCAN_PATTERN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+SEARCH_PATTERN = re.compile(r'^SEARCH (?:TABLE )?(\w+) USING (?!INTEGER)')
+ORDER_PATTERN = re.compile(r'" (?:ASC|DESC)')
+
+# Формы запросов горячих маршрутов API: фильтры и сортировка как во
+# вьюсетах, значения параметров для плана не важны.
+HOT_QUERIES = {
+    'titles-list': lambda: Title.objects.all()[:PAGE],
+    'titles-by-year': lambda: Title.objects.filter(year=0)[:PAGE],
+    'titles-by-category': lambda: Title.objects.filter(
+        category__slug='slug'
+    )[:PAGE],
+    'titles-by-genre': lambda: Title.objects.filter(
+        genre__slug='slug'
+    )[:PAGE],
+    'title-genres': lambda: Genre.objects.filter(titles__in=[0]),
+    'genre-titles': lambda: Title.genre.through.objects.filter(
+        genre_id=0
+    ).values('title_id'),
+    'reviews-list': lambda: Review.objects.filter(
+        title_id=0
+    ).order_by(*KEYSET_ORDERING)[:PAGE],
+    'comments-list': lambda: Comments.objects.filter(
+        review_id=0
+    ).order_by(*KEYSET_ORDERING)[:PAGE],
+}
+
+
+def capture(func, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Выполняет func и возвращает уникальные SELECT с параметрами."""
+    statements = {}
+
+    def wrapper(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            statements.setdefault(sql, params)
+        return execute(sql, params, many, context)
+
+    with connections[using].execute_wrapper(wrapper):
+        func(*args, **kwargs)
+    return list(statements.items())
+
+
+def explain(sql, params=(), using=DEFAULT_DB_ALIAS):
+    """Строки плана запроса: EXPLAIN QUERY PLAN в SQLite."""
+    connection = connections[using]
+    prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {sql}', params)
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def get_full_scans(plan):
+    return [
+        match.group(1) for match in map(FULL_SCAN_PATTERN.match, plan)
+        if match
+    ]
+
+
+def get_columns(sql, table, joined=False):
+    """
+    Столбцы таблицы в условиях равенства и в ORDER BY запроса,
+    собранного Django. Столбцы соединения (ON) учитываются, только
+    если таблица присоединяется, а не открывает план.
+    """
+    head, _, order = sql.partition(' ORDER BY ')
+    column = re.escape(f'"{table}"') + r'\."(\w+)"'
+    patterns = [column + r' (?:= %s|IN \()']
+    if joined:
+        patterns += [column + r' = "', r'= ' + column + r'\)']
+    equal = [
+        name for pattern in patterns for name in re.findall(pattern, head)
+    ]
+    ordered = re.findall(column + r' (ASC|DESC)', order)
+    return list(dict.fromkeys(equal)), ordered
+
+
+def propose_index(sql, table, joined=False, sort=False):
+    """
+    Индекс, которым таблица table отвечает на запрос: сначала столбцы
+    равенств, затем столбцы сортировки. При sort - только если вся
+    сортировка идёт по этой таблице, иначе индекс её не уберёт.
+    """
+    equal, ordered = get_columns(sql, table, joined)
+    if sort and (not ordered or len(ordered) != len(
+        ORDER_PATTERN.findall(sql.partition(' ORDER BY ')[2])
+    )):
+        return None
+    columns = [f'"{name}"' for name in equal] + [
+        f'"{name}" DESC' if direction == 'DESC' else f'"{name}"'
+        for name, direction in ordered if name not in equal
+    ]
+    if not columns:
+        return None
+    names = equal + [
+        name for name, _ in ordered if name not in equal
+    ]
+    return (
+        f'CREATE INDEX "{table}_{"_".join(names)}_idx" '
+        f'ON "{table}" ({", ".join(columns)});'
+    )
+
+
+def analyze(sql, params=(), using=DEFAULT_DB_ALIAS):
+    """
+    План запроса, полные сканирования, сортировка во временном B-дереве
+    и предлагаемые индексы для таблиц, которые их вызвали.
+    """
+    plan = explain(sql, params, using)
+    sort = TEMP_SORT in plan
+    proposals = []
+    # Первая строка плана - ведущая таблица, остальные присоединяются.
+    for position, line in enumerate(plan):
+        scan = FULL_SCAN_PATTERN.match(line)
+        search = SEARCH_PATTERN.match(line)
+        if scan:
+            proposals.append(
+                propose_index(sql, scan.group(1), joined=position > 0)
+            )
+        elif search and sort:
+            proposals.append(propose_index(
+                sql, search.group(1), joined=position > 0, sort=True
+            ))
+    return {
+        'sql': sql,
+        'plan': plan,
+        'full_scans': get_full_scans(plan),
+        'temp_sort': sort,
+        'proposals': list(dict.fromkeys(filter(None, proposals))),
+    }
+
+
+def explain_hot_queries(names=None, using=DEFAULT_DB_ALIAS):
+    """Анализ зарегистрированных горячих запросов по именам."""
+    report = {}
+    for name, build in HOT_QUERIES.items():
+        if names and name not in names:
+            continue
+        sql, params = build().query.sql_with_params()
+        report[name] = analyze(sql, params, using)
+    return report
+
+
+def explain_scenarios(names=None, seed=0, using=DEFAULT_DB_ALIAS):
+    """
+    Анализ всех SELECT, выполненных первым запросом каждого сценария
+    бенчмарка через тестовый клиент. Сценарии записи пропускаются.
+    """
+    transport = ClientTransport()
+    report = {}
+    for name, calls in get_scenarios(seed).items():
+        call = calls[0]
+        if names and name not in names or callable(call) \
+                or call.method != 'GET':
+            continue
+        statements = capture(transport.send, call, using=using)
+        report[name] = [
+            analyze(sql, params, using) for sql, params in statements
+        ]
+    return report
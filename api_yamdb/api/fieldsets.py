@@ -0,0 +1,76 @@
+import sys
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+# (fields, omit, expand): fields равно None, если список полей не задан.
+EMPTY_FIELDSET = (None, frozenset(), frozenset())
+
+
+def parse_names(value):
+    """Разбирает `a,b,c` из параметра запроса в множество имён."""
+    return frozenset(
+        name.strip() for name in (value or '').split(',') if name.strip()
+    )
+
+
+def get_fieldset(request):
+    """
+    Набор полей из параметров ?fields=, ?omit= и ?expand=. Учитывается
+    только при чтении: запись всегда принимает и отдаёт все поля.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return EMPTY_FIELDSET
+    params = request.query_params
+    fields = parse_names(params.get('fields'))
+    return (
+        fields or None,
+        parse_names(params.get('omit')),
+        parse_names(params.get('expand')),
+    )
+
+
+def is_sparse(fieldset):
+    """Запрошена ли часть полей, а не все поля сериализатора."""
+    fields, omit, _ = fieldset
+    return fields is not None or bool(omit)
+
+
+class SparseFieldsetMixin:
+    """
+    Сериализатор, отдающий только запрошенные поля. Набор полей берётся
+    из context['fieldset'] или из параметров запроса и применяется лишь
+    к полям верхнего уровня; неизвестные имена пропускаются.
+
+    expandable_fields сопоставляет полю имя сериализатора из того же
+    модуля: с ?expand=<поле> вместо первичного ключа отдаётся объект.
+    """
+    expandable_fields = {}
+
+    def get_fieldset(self):
+        if 'fieldset' in self.context:
+            return self.context['fieldset']
+        return get_fieldset(self.context.get('request'))
+
+    def is_root(self):
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_expanded_field(self, name):
+        module = sys.modules[type(self).__module__]
+        serializer_class = getattr(module, self.expandable_fields[name])
+        return serializer_class(read_only=True)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_root():
+            return fields
+        only, omit, expand = self.get_fieldset()
+        for name in expand & self.expandable_fields.keys():
+            fields[name] = self.get_expanded_field(name)
+        for name in list(fields):
+            if name in omit or only is not None and name not in only:
+                del fields[name]
+        return fields
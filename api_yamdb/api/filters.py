@@ -1,14 +1,16 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 
+from reviews import search
 from reviews.models import Title
 
 
 class FilterForTitle(filters.FilterSet):
     """
     Фильтр произведений по названию, категории и жанров по слагу.
+    Название ищется по полнотекстовому индексу с учётом релевантности.
     """
-    name = filters.CharFilter(field_name='name',
-                              lookup_expr='contains')
+    name = filters.CharFilter(method='filter_name')
     category = filters.CharFilter(field_name='category__slug',
                                   lookup_expr='exact')
     genre = filters.CharFilter(field_name='genre__slug',
@@ -17,3 +19,16 @@ class FilterForTitle(filters.FilterSet):
     class Meta:
         model = Title
         fields = ('name', 'category', 'genre', 'year',)
+
+    def filter_name(self, queryset, name, value):
+        return search.search(queryset, value, fields=(name,))
+
+
+class IndexSearchFilter(SearchFilter):
+    """SearchFilter поверх полнотекстового индекса, если он доступен."""
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        if not text.strip() or not search.is_supported():
+            return super().filter_queryset(request, queryset, view)
+        return search.search(queryset, text)
@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmark import (ClientTransport, HttpTransport, compare, run,
+                          run_fan_in)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержки p50/p95/p99, пропускную способность и число '
+        'запросов к базе для маршрутов API и пишет отчёт в JSON. '
+        'Служебные маршруты и запись идут от имени администратора '
+        'benchmark, которого команда создаёт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество замеряемых запросов на маршрут.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help='Количество незамеряемых запросов перед замером.',
+        )
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного сервера; без него запросы идут '
+                 'через тестовый клиент в этом процессе.',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кэш ответов перед каждым запросом.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно для порядка путей в сценариях.',
+        )
+        parser.add_argument(
+            '--route',
+            action='append',
+            dest='routes',
+            help='Замерить только этот сценарий; можно повторять.',
+        )
+        parser.add_argument(
+            '--renderers',
+            action='store_true',
+            help='Замерить рендеринг страницы произведений каждым рендерером.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для отчёта; без него отчёт печатается.',
+        )
+        parser.add_argument(
+            '--fan-in',
+            type=int,
+            help='Сравнить синхронные воркеры WSGI и асинхронный ASGI '
+                 'при стольких одновременных клиентах.',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Отчёт прошлого прогона для сравнения.',
+        )
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            help='Допустимый рост p95 в процентах; при превышении '
+                 'команда завершается с ошибкой.',
+        )
+
+    def handle(self, **options):
+        if options['requests'] < 1 or options['warmup'] < 0:
+            raise CommandError(
+                '--requests должен быть больше нуля, --warmup - не меньше.'
+            )
+        if options['max_regression'] is not None and not options['compare']:
+            raise CommandError('--max-regression работает только с --compare.')
+        if options['fan_in'] is not None:
+            return self.handle_fan_in(options)
+        transport = (
+            HttpTransport(options['url']) if options['url']
+            else ClientTransport()
+        )
+        report = run(
+            transport, options['requests'], options['warmup'],
+            options['cold'], options['seed'], options['routes'],
+            options['renderers'],
+        )
+        if options['compare']:
+            previous = json.loads(Path(options['compare']).read_text())
+            report['comparison'] = compare(previous, report)
+        self.write_report(report, options['output'])
+        self.check_regressions(report, options['max_regression'])
+
+    def handle_fan_in(self, options):
+        if options['fan_in'] < 1:
+            raise CommandError('--fan-in должен быть больше нуля.')
+        if options['compare']:
+            raise CommandError('--compare не работает с --fan-in.')
+        report = run_fan_in(
+            options['requests'], options['fan_in'], options['seed'],
+            options['routes'], options['url'],
+        )
+        self.write_report(report, options['output'])
+
+    def write_report(self, report, path):
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if path:
+            Path(path).write_text(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def check_regressions(self, report, limit):
+        if limit is None:
+            return
+        regressions = [
+            f'{name}: p95 +{change["p95_change_percent"]}%'
+            for name, change in report['comparison'].items()
+            if change['p95_change_percent'] > limit
+        ]
+        if regressions:
+            raise CommandError(
+                'Замедлились маршруты: ' + ', '.join(regressions)
+            )
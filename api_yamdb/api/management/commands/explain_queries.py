@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...explain import HOT_QUERIES, explain_hot_queries, explain_scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы EXPLAIN горячих запросов API, находит полные '
+        'сканирования и сортировки без индекса и предлагает индексы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--capture',
+            action='store_true',
+            help='Разобрать SQL, выполненный сценариями бенчмарка через '
+                 'тестовый клиент, вместо зарегистрированных запросов.',
+        )
+        parser.add_argument(
+            '--query',
+            action='append',
+            dest='names',
+            help='Только этот запрос или сценарий; можно повторять.',
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Завершиться с ошибкой при полном сканировании.',
+        )
+
+    def handle(self, **options):
+        names = options['names']
+        if options['capture']:
+            report = explain_scenarios(names)
+            analyses = [
+                analysis for statements in report.values()
+                for analysis in statements
+            ]
+        else:
+            unknown = set(names or ()) - set(HOT_QUERIES)
+            if unknown:
+                raise CommandError(
+                    f'Неизвестные запросы: {", ".join(sorted(unknown))}.'
+                )
+            report = explain_hot_queries(names)
+            analyses = list(report.values())
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        proposals = dict.fromkeys(
+            proposal for analysis in analyses
+            for proposal in analysis['proposals']
+        )
+        for proposal in proposals:
+            self.stderr.write(proposal)
+        scans = sum(bool(analysis['full_scans']) for analysis in analyses)
+        if options['strict'] and scans:
+            raise CommandError(f'{scans} запросов сканируют таблицу целиком.')
@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...stress import run_stress
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает базу одновременными чтениями и записями из нескольких '
+        'потоков и печатает пропускную способность и число отказов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Количество потоков, каждый со своим соединением.',
+        )
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=10.0,
+            help='Длительность нагрузки.',
+        )
+        parser.add_argument(
+            '--write-ratio',
+            type=float,
+            default=0.2,
+            help='Доля операций записи от 0 до 1.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно для выбора операций.',
+        )
+
+    def handle(self, **options):
+        if options['workers'] < 1 or options['seconds'] <= 0:
+            raise CommandError(
+                '--workers и --seconds должны быть больше нуля.'
+            )
+        if not 0 <= options['write_ratio'] <= 1:
+            raise CommandError('--write-ratio должен быть от 0 до 1.')
+        report = run_stress(
+            options['workers'], options['seconds'],
+            options['write_ratio'], options['seed'],
+        )
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        if report['errors']:
+            raise CommandError(
+                f'{report["errors"]} операций не выполнено: база занята.'
+            )
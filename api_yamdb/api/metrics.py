@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_metrics = defaultdict(Counter)
+_metrics_lock = threading.Lock()
+# Счётчик запросов текущего HTTP-запроса: переходит в рабочие потоки
+# асинхронных вьюх вместе с контекстом.
+_recorder = ContextVar('query_recorder', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Маршрут выполнил больше запросов к базе, чем разрешено."""
+
+
+class QueryRecorder:
+    """
+    Обёртка execute_wrapper: считает запросы, время в базе и повторы
+    одного и того же запроса с теми же параметрами.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.allowance = 0
+        self.duplicates = 0
+        self.duration = 0.0
+        self.seen = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            key = (sql, repr(params))
+            if key in self.seen:
+                self.duplicates += 1
+            self.seen.add(key)
+
+
+@contextmanager
+def recording_queries(recorder=None):
+    """
+    Считает запросы соединений текущего потока в recorder, а без него -
+    в счётчик текущего HTTP-запроса, если он есть.
+    """
+    recorder = recorder or _recorder.get()
+    with ExitStack() as stack:
+        if recorder is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+def allow_queries(count):
+    """
+    Разрешает текущему HTTP-запросу count запросов сверх бюджета
+    маршрута: так ?expand= оплачивает подгрузку связей, которые он
+    добавил. Повторный вызов не суммируется.
+    """
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.allowance = max(recorder.allowance, count)
+
+
+def get_budget(route):
+    """Бюджет запросов маршрута, действует для GET и HEAD."""
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(route, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
+
+
+def record(route, wall, recorder, size, over_budget):
+    with _metrics_lock:
+        metrics = _metrics[route]
+        metrics['requests'] += 1
+        metrics['wall'] += wall
+        metrics['db'] += recorder.duration
+        metrics['queries'] += recorder.count
+        metrics['duplicates'] += recorder.duplicates
+        metrics['bytes'] += size
+        metrics['over_budget'] += over_budget
+        metrics['max_wall'] = max(metrics['max_wall'], wall)
+        metrics['max_queries'] = max(metrics['max_queries'], recorder.count)
+
+
+def get_metrics():
+    """Сводка по маршрутам текущего процесса, время в миллисекундах."""
+    with _metrics_lock:
+        snapshot = {
+            route: dict(metrics) for route, metrics in _metrics.items()
+        }
+    return {
+        route: {
+            'requests': metrics['requests'],
+            'avg_ms': round(metrics['wall'] * 1000 / metrics['requests'], 2),
+            'max_ms': round(metrics['max_wall'] * 1000, 2),
+            'avg_db_ms': round(metrics['db'] * 1000 / metrics['requests'], 2),
+            'avg_queries': round(
+                metrics['queries'] / metrics['requests'], 2
+            ),
+            'max_queries': metrics['max_queries'],
+            'duplicated_queries': metrics['duplicates'],
+            'avg_bytes': metrics['bytes'] // metrics['requests'],
+            'budget': get_budget(route),
+            'over_budget': metrics['over_budget'],
+        }
+        for route, metrics in sorted(snapshot.items())
+    }
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+class QueryMetricsMiddleware:
+    """
+    Замеряет для каждого маршрута время ответа, время и число запросов
+    к базе, повторы запросов и размер тела ответа. Итог отдаётся
+    в заголовке Server-Timing и копится для /api/v1/metrics/.
+
+    Превышение QUERY_BUDGETS пишется в лог, а при QUERY_BUDGET_STRICT
+    поднимает QueryBudgetExceeded - так бюджет ломает тесты.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django 3.2 узнаёт, что middleware асинхронный.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        token = _recorder.set(recorder)
+        try:
+            with recording_queries(recorder):
+                response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        # Запросы считает рабочий поток вьюхи через recording_queries.
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        token = _recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    def finish(self, request, response, recorder, started):
+        wall = time.perf_counter() - started
+        match = request.resolver_match
+        if match is None:
+            return response
+        route = match.view_name
+        size = 0 if response.streaming else len(response.content)
+        budget = None
+        if request.method in ('GET', 'HEAD'):
+            budget = get_budget(route)
+        if budget is not None:
+            budget += recorder.allowance
+        over_budget = budget is not None and recorder.count > budget
+        record(route, wall, recorder, size, over_budget)
+        response['Server-Timing'] = (
+            f'total;dur={wall * 1000:.1f}, '
+            f'db;dur={recorder.duration * 1000:.1f};'
+            f'desc="{recorder.count} queries, '
+            f'{recorder.duplicates} duplicated"'
+        )
+        if over_budget:
+            message = (f'{route}: {recorder.count} запросов к базе '
+                       f'при бюджете {budget}')
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
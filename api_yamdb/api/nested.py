@@ -0,0 +1,66 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.response import Response
+
+
+class NestedResourceMixin:
+    """
+    Вьюсет вложенного маршрута вида titles/{title_id}/reviews/... .
+    Строки выбираются фильтром по всей цепочке родителей из URL через
+    соединение, без отдельного запроса на проверку каждого родителя:
+    неверная цепочка просто не находит строк. Ближайший родитель
+    загружается, только когда он нужен - при создании и для 404 на пустом
+    списке, - и один раз на запрос хранится в request.
+    """
+    # Цепочка от ближайшего родителя: (путь от модели вьюсета, kwarg URL).
+    parent_lookups = ()
+
+    def get_chain_filter(self, prefix=''):
+        """
+        Фильтр по цепочке из URL относительно пути prefix: для отзывов
+        {'title__pk': 1}, для их произведения {'pk': 1}.
+        """
+        lookups = {}
+        for path, kwarg in self.parent_lookups:
+            path = path[len(prefix):]
+            lookups[f'{path}__pk' if path else 'pk'] = self.kwargs[kwarg]
+        return lookups
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**self.get_chain_filter())
+
+    def get_parent_queryset(self):
+        """Ближайший родитель, отфильтрованный по остальной цепочке."""
+        field = self.parent_lookups[0][0]
+        model = self.queryset.model._meta.get_field(field).related_model
+        return model.objects.filter(**self.get_chain_filter(f'{field}__'))
+
+    def set_parent(self, parent):
+        self.request.nested_parent = parent
+        return parent
+
+    def get_parent(self):
+        parent = getattr(self.request, 'nested_parent', None)
+        if parent is None:
+            parent = self.set_parent(
+                get_object_or_404(self.get_parent_queryset())
+            )
+        return parent
+
+    def get_save_kwargs(self):
+        """Поля нового объекта, которые приходят из маршрута."""
+        return {self.parent_lookups[0][0]: self.get_parent()}
+
+    def perform_create(self, serializer):
+        serializer.save(**self.get_save_kwargs())
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset if page is None else page)
+        if not rows:
+            # Пусто: либо у родителя нет строк, либо цепочка неверна.
+            self.get_parent()
+        serializer = self.get_serializer(rows, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
@@ -0,0 +1,71 @@
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+
+from reviews.models import User
+
+AUTHENTICATED = 1
+MODERATOR = 2
+ADMIN = 4
+
+ROLE_MASKS = {
+    User.USER: AUTHENTICATED,
+    User.MODERATOR: AUTHENTICATED | MODERATOR,
+    User.ADMIN: AUTHENTICATED | MODERATOR | ADMIN,
+}
+
+
+def get_role_mask(request):
+    """
+    Права пользователя битовой маской, один раз на запрос. Роль
+    и is_superuser берутся из пользователя, которого
+    ClaimsJWTAuthentication собирает из кэша claims без запроса к базе.
+    """
+    mask = getattr(request, '_role_mask', None)
+    if mask is None:
+        user = request.user
+        if not user.is_authenticated:
+            mask = 0
+        elif user.is_superuser:
+            mask = ROLE_MASKS[User.ADMIN]
+        else:
+            mask = ROLE_MASKS.get(user.role, AUTHENTICATED)
+        request._role_mask = mask
+    return mask
+
+
+def has_role(request, role):
+    return bool(get_role_mask(request) & role)
+
+
+class IsAdmin(BasePermission):
+    """Только администраторы."""
+
+    def has_permission(self, request, view):
+        return has_role(request, ADMIN)
+
+
+class IsAdminOrReadOnly(BasePermission):
+    """Чтение - всем, изменения - администраторам."""
+
+    def has_permission(self, request, view):
+        return request.method in SAFE_METHODS or has_role(request, ADMIN)
+
+
+class IsAuthorOrModeratorOrReadOnly(BasePermission):
+    """
+    Чтение - всем, создание - вошедшим. Менять и удалять объект может
+    его автор, модератор и администратор. Автор сверяется по author_id,
+    без загрузки связанного пользователя.
+    """
+
+    def has_permission(self, request, view):
+        return (
+            request.method in SAFE_METHODS
+            or has_role(request, AUTHENTICATED)
+        )
+
+    def has_object_permission(self, request, view, obj):
+        return (
+            request.method in SAFE_METHODS
+            or obj.author_id == request.user.pk
+            or has_role(request, MODERATOR)
+        )
@@ -0,0 +1,121 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from .fieldsets import EMPTY_FIELDSET, get_fieldset, is_sparse
+from .metrics import allow_queries
+
+
+def _nested_serializer(field):
+    """Возвращает вложенный сериализатор поля, если он есть."""
+    if isinstance(field, ListSerializer):
+        field = field.child
+    elif isinstance(field, ManyRelatedField):
+        field = field.child_relation
+    if isinstance(field, BaseSerializer) and hasattr(field, 'fields'):
+        return field
+    return None
+
+
+def _collect_lookups(serializer, model, prefix, in_prefetch, select, prefetch):
+    """Обходит поля сериализатора и раскладывает связи по видам загрузки."""
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        name = field.source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+        many = model_field.many_to_many or model_field.one_to_many
+        if not many and isinstance(field, PrimaryKeyRelatedField):
+            # Для первичного ключа хватает колонки `<name>_id`.
+            continue
+        lookup = prefix + name
+        if many or in_prefetch:
+            prefetch.add(lookup)
+        else:
+            select.add(lookup)
+        nested = _nested_serializer(field)
+        if nested is not None:
+            _collect_lookups(nested, model_field.related_model,
+                             f'{lookup}__', in_prefetch or many,
+                             select, prefetch)
+
+
+def _get_deferred(serializer, model):
+    """Колонки модели, которые не нужны ни одному полю сериализатора."""
+    sources = set()
+    for field in serializer.fields.values():
+        if field.source == '*':
+            return ()
+        sources.add(field.source.split('.')[0])
+    return tuple(
+        field.name for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in sources
+    )
+
+
+@lru_cache(maxsize=256)
+def get_related_lookups(serializer_class, fieldset=EMPTY_FIELDSET):
+    """
+    Возвращает тройку (select_related, prefetch_related, defer) для
+    набора полей: связи, нужные сериализатору, чтобы не делать запросов
+    на каждый объект, и колонки, которые можно не читать.
+    """
+    serializer = serializer_class(context={'fieldset': fieldset})
+    model = serializer_class.Meta.model
+    select, prefetch = set(), set()
+    _collect_lookups(serializer, model, '', False, select, prefetch)
+    deferred = _get_deferred(serializer, model) if is_sparse(fieldset) else ()
+    return tuple(sorted(select)), tuple(sorted(prefetch)), deferred
+
+
+def count_expanded_queries(serializer_class, fieldset):
+    """Сколько запросов prefetch набор полей добавляет к полному выводу."""
+    _, prefetch, _ = get_related_lookups(serializer_class, fieldset)
+    _, default, _ = get_related_lookups(serializer_class)
+    return len(set(prefetch) - set(default))
+
+
+def plan_queryset(queryset, serializer_class, fieldset=EMPTY_FIELDSET,
+                  required_fields=()):
+    """
+    Добавляет в queryset загрузку связей, объявленных в сериализаторе,
+    и откладывает колонки полей, не попавших в набор. Поля из
+    required_fields читаются всегда.
+    """
+    select, prefetch, deferred = get_related_lookups(
+        serializer_class, fieldset
+    )
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    deferred = [name for name in deferred if name not in required_fields]
+    if deferred:
+        queryset = queryset.defer(*deferred)
+    return queryset
+
+
+class QuerysetPlannerMixin:
+    """
+    Планирует queryset вьюсета под его текущий сериализатор и набор
+    полей запроса. required_fields - колонки, которые нужны самому
+    вьюсету, например для пагинации или валидаторов кэша.
+    """
+    required_fields = ()
+
+    def get_queryset(self):
+        serializer_class = self.get_serializer_class()
+        fieldset = get_fieldset(self.request)
+        # Бюджет запросов маршрута рассчитан на вывод без ?expand=.
+        allow_queries(count_expanded_queries(serializer_class, fieldset))
+        return plan_queryset(
+            super().get_queryset(), serializer_class, fieldset,
+            self.required_fields,
+        )
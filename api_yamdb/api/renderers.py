@@ -0,0 +1,74 @@
+import math
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+# Типы, которых нет в JSON, приводятся так же, как в JSONRenderer:
+# даты с точностью до миллисекунд и «Z», Decimal, ленивые строки.
+encode_default = JSONEncoder().default
+
+
+def has_non_finite(data):
+    """Есть ли в словарях и списках data NaN или бесконечность."""
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        data = data.values()
+    elif not isinstance(data, (list, tuple)):
+        return False
+    return any(has_non_finite(item) for item in data)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson. Компактный вывод совпадает с JSONRenderer
+    побайтно; отступы, ensure_ascii и числа больше 64 бит уходят
+    в обычный JSONRenderer. orjson пишет NaN и бесконечность как null,
+    поэтому в строгом режиме (STRICT_JSON) такие данные тоже отдаются
+    JSONRenderer, и он отвергает их, как раньше.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data, default=encode_default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # null в выводе - единственный признак, что NaN мог потеряться.
+        if self.strict and b'null' in ret and has_non_finite(data):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Как и JSONRenderer, экранируем U+2028 и U+2029.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029'
+            )
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Двоичный MessagePack для клиентов с Accept: application/msgpack."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
@@ -1,13 +1,77 @@
 from datetime import datetime as dt
 
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
-from reviews.models import (Review, Comment, Title,
-                            Category, Genre, User)
+from reviews.models import Review, Comments, Title, Category, Genre, User
 
+from .fieldsets import SparseFieldsetMixin
 
-class ReviewSerializer(serializers.ModelSerializer):
+
+def validate_username_not_me(value):
+    if value.lower() == 'me':
+        raise serializers.ValidationError(
+            'Имя пользователя «me» зарезервировано.'
+        )
+    return value
+
+
+class SignUpSerializer(serializers.Serializer):
+    """Регистрация и повторный запрос кода подтверждения."""
+
+    username = serializers.CharField(max_length=150, validators=(
+        UnicodeUsernameValidator(), validate_username_not_me,
+    ))
+    email = serializers.EmailField(max_length=254)
+
+    def validate(self, data):
+        # Повторная регистрация допустима только с теми же username и email.
+        matches = User.objects.filter(username=data['username']) | (
+            User.objects.filter(email=data['email'])
+        )
+        for username, email in matches.values_list('username', 'email'):
+            if (username, email) != (data['username'], data['email']):
+                raise serializers.ValidationError(
+                    'Имя пользователя или email уже заняты.'
+                )
+        return data
+
+
+class TokenSerializer(serializers.Serializer):
+    """Обмен кода подтверждения на токен."""
+
+    username = serializers.CharField(max_length=150)
+    confirmation_code = serializers.CharField()
+
+
+class UserSerializer(serializers.ModelSerializer):
+    """Пользователи для администратора."""
+
+    username = serializers.CharField(max_length=150, validators=(
+        UnicodeUsernameValidator(), validate_username_not_me,
+        UniqueValidator(queryset=User.objects.all()),
+    ))
+    email = serializers.EmailField(max_length=254, validators=(
+        UniqueValidator(queryset=User.objects.all()),
+    ))
+
+    class Meta:
+        model = User
+        fields = ('username', 'email', 'first_name', 'last_name', 'bio',
+                  'role')
+
+
+class ProfileSerializer(UserSerializer):
+    """Собственный профиль: роль меняет только администратор."""
+
+    class Meta(UserSerializer.Meta):
+        read_only_fields = ('role',)
+
+
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Отзывы."""
+    expandable_fields = {'title': 'TitleReadSerializer'}
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -18,7 +82,19 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('author', 'title')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Комментарии к отзывам."""
+    author = serializers.SlugRelatedField(
+        read_only=True, slug_field='username'
+    )
+
+    class Meta:
+        fields = '__all__'
+        model = Comments
+        read_only_fields = ('author', 'review')
+
+
+class GenreSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для работы с жанрами."""
     class Meta:
         model = Genre
@@ -26,7 +102,7 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для работы с категориями."""
     class Meta:
         model = Category
@@ -34,7 +110,7 @@ class CategorySerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для получения информации о произведениях."""
 
     rating = serializers.IntegerField(read_only=True)
@@ -59,7 +135,7 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         slug_field='slug',
         queryset=Category.objects.all(),
     )
-    rating = serializers.IntegerField(required=False)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -72,3 +148,21 @@ class TitleWriteSerializer(serializers.ModelSerializer):
                 f'Год {data} больше текущего!',
             )
         return data
+
+
+class TopTitlesSerializer(serializers.Serializer):
+    """Параметры запроса рейтинговых списков произведений."""
+
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    year = serializers.IntegerField(required=False)
+    min_reviews = serializers.IntegerField(min_value=1, default=1)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    bayesian = serializers.BooleanField(default=False)
+
+
+class SyncSerializer(serializers.Serializer):
+    """Параметры запроса журнала изменений."""
+
+    token = serializers.IntegerField(min_value=0, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
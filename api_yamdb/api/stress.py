@@ -0,0 +1,98 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import OperationalError, connections
+
+from core.db import retry_on_locked
+from core.jobs import enqueue
+from core.models import Job
+from reviews.models import Title
+
+from .benchmark import percentile
+from .querysets import plan_queryset
+from .serializers import TitleReadSerializer
+
+STRESS_KIND = 'stress'
+
+
+@retry_on_locked
+def read_page():
+    """Чтение как у списка произведений: страница со связями."""
+    return TitleReadSerializer(plan_queryset(
+        Title.objects.all()[:20], TitleReadSerializer
+    ), many=True).data
+
+
+def write_job(number):
+    """Запись как у регистрации: задача в очереди в своей транзакции."""
+    return enqueue(STRESS_KIND, {'number': number})
+
+
+def stress_worker(seed, deadline, write_ratio):
+    rng = random.Random(seed)
+    latencies = {'read': [], 'write': []}
+    errors = 0
+    try:
+        while time.monotonic() < deadline:
+            kind = 'write' if rng.random() < write_ratio else 'read'
+            started = time.perf_counter()
+            try:
+                if kind == 'write':
+                    write_job(rng.randrange(10 ** 9))
+                else:
+                    read_page()
+            except OperationalError:
+                errors += 1
+                continue
+            latencies[kind].append(time.perf_counter() - started)
+    finally:
+        connections.close_all()
+    return latencies, errors
+
+
+def summarize_kind(latencies, elapsed):
+    latencies = [latency * 1000 for latency in latencies]
+    return {
+        'operations': len(latencies),
+        'per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 3) if latencies else None,
+    }
+
+
+def run_stress(workers=4, seconds=5.0, write_ratio=0.2, seed=0):
+    """
+    Потоки одновременно читают страницы произведений и пишут задачи
+    в очередь. Возвращает пропускную способность чтения и записи
+    и число операций, упавших с «database is locked» после повторов.
+    Записанные задачи удаляются в конце.
+    """
+    deadline = time.monotonic() + seconds
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(
+                stress_worker,
+                range(seed, seed + workers),
+                [deadline] * workers,
+                [write_ratio] * workers,
+            ))
+        elapsed = time.perf_counter() - started
+    finally:
+        retry_on_locked(
+            Job.objects.filter(kind=STRESS_KIND).delete
+        )()
+    return {
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'read': summarize_kind(
+            [lat for latencies, _ in results for lat in latencies['read']],
+            elapsed,
+        ),
+        'write': summarize_kind(
+            [lat for latencies, _ in results for lat in latencies['write']],
+            elapsed,
+        ),
+        'errors': sum(errors for _, errors in results),
+    }
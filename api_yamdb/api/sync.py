@@ -0,0 +1,102 @@
+from reviews.models import Category, Change, Comments, Genre, Review, Title
+
+from .querysets import plan_queryset
+from .serializers import (CategorySerializer, CommentSerializer,
+                          GenreSerializer, ReviewSerializer,
+                          TitleReadSerializer)
+
+SYNCED = {
+    model._meta.model_name: (model, serializer_class)
+    for model, serializer_class in (
+        (Title, TitleReadSerializer),
+        (Review, ReviewSerializer),
+        (Comments, CommentSerializer),
+        (Genre, GenreSerializer),
+        (Category, CategorySerializer),
+    )
+}
+
+
+def get_latest_token():
+    return Change.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+
+
+def merge_changes(changes):
+    """
+    Оставляет по одной записи на объект в порядке последнего изменения:
+    удаление побеждает, а создание с правками остаётся созданием.
+    """
+    merged = {}
+    for pk, action, model, object_id, slug in changes:
+        key = (model, object_id)
+        previous = merged.pop(key, None)
+        if previous is not None and action == Change.UPDATED \
+                and previous['action'] == Change.CREATED:
+            action = Change.CREATED
+        merged[key] = {'model': model, 'id': object_id, 'action': action}
+        if slug:
+            # Жанры и категории адресуются в API по slug.
+            merged[key]['slug'] = slug
+    return list(merged.values())
+
+
+def load_data(entries):
+    """
+    Текущее состояние изменённых объектов: один запрос на модель
+    (и её связи), а не на объект. Объекты, удалённые после записи
+    в журнал, отдаются как удалённые: их tombstone будет дальше.
+    """
+    by_model = {}
+    for entry in entries:
+        if entry['action'] != Change.DELETED:
+            by_model.setdefault(entry['model'], []).append(entry['id'])
+    data = {}
+    for name, ids in by_model.items():
+        model, serializer_class = SYNCED[name]
+        objects = list(plan_queryset(
+            model.objects.filter(pk__in=ids).order_by(), serializer_class
+        ))
+        serialized = serializer_class(objects, many=True).data
+        data.update(
+            ((name, obj.pk), item) for obj, item in zip(objects, serialized)
+        )
+    for entry in entries:
+        if entry['action'] == Change.DELETED:
+            continue
+        item = data.get((entry['model'], entry['id']))
+        if item is None:
+            entry['action'] = Change.DELETED
+        else:
+            entry['data'] = item
+    return entries
+
+
+def get_changes(token=None, limit=100):
+    """
+    Страница журнала изменений после token. Читаются только записи
+    журнала, поэтому стоимость зависит от числа изменений, а не от
+    размера каталога. Без токена или после массовой загрузки клиент
+    получает reset: нужно загрузить всё заново и продолжить с token.
+    """
+    if token is None:
+        return {'token': str(get_latest_token()), 'reset': True,
+                'has_more': False, 'changes': []}
+    changes = Change.objects.filter(pk__gt=token).order_by('pk')
+    page = list(changes.values_list(
+        'pk', 'action', 'model', 'object_id', 'slug'
+    )[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    resets = [pk for pk, action, *_ in page if action == Change.RESET]
+    if resets:
+        return {'token': str(resets[-1]), 'reset': True,
+                'has_more': has_more or resets[-1] != page[-1][0],
+                'changes': []}
+    return {
+        'token': str(page[-1][0] if page else token),
+        'reset': False,
+        'has_more': has_more,
+        'changes': load_data(merge_changes(page)),
+    }
@@ -0,0 +1,82 @@
+import time
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from core.jobs import enqueue_email
+
+
+class ConfirmationCodeGenerator:
+    """
+    Коды подтверждения для /auth/signup/ и /auth/token/ по образцу
+    PasswordResetTokenGenerator: код не хранится, а вычисляется HMAC
+    от id, email, версии токенов, времени последнего входа пользователя
+    и номера интервала времени.
+
+    Интервал длится CONFIRMATION_CODE_TIMEOUT секунд; принимается код
+    текущего и предыдущего интервалов, так что код живёт от одного до
+    двух интервалов. Повторная регистрация в том же интервале даёт тот же
+    код, а смена email или роли делает выданные коды недействительными.
+    Выдача токена обновляет last_login, поэтому код одноразовый.
+    """
+    key_salt = 'api.tokens.ConfirmationCodeGenerator'
+    algorithm = 'sha256'
+    length = 16
+
+    def _now(self):
+        # Отдельный метод, чтобы время можно было подменить в тестах.
+        return time.time()
+
+    def _bucket(self):
+        return int(self._now() // settings.CONFIRMATION_CODE_TIMEOUT)
+
+    def _make_hash_value(self, user, bucket):
+        login_timestamp = (
+            '' if user.last_login is None
+            else user.last_login.replace(microsecond=0, tzinfo=None)
+        )
+        return (
+            f'{user.pk}:{user.email}:{user.token_version}:'
+            f'{login_timestamp}:{bucket}'
+        )
+
+    def _make_code(self, user, bucket):
+        return salted_hmac(
+            self.key_salt,
+            self._make_hash_value(user, bucket),
+            algorithm=self.algorithm,
+        ).hexdigest()[:self.length]
+
+    def make_code(self, user):
+        return self._make_code(user, self._bucket())
+
+    def check_code(self, user, code):
+        """Проверяет код без обращений к базе за постоянное время."""
+        if not (user and code) or not isinstance(code, str):
+            return False
+        bucket = self._bucket()
+        # Без раннего выхода: время проверки не зависит от интервала.
+        valid = False
+        for candidate in (bucket, bucket - 1):
+            valid |= constant_time_compare(
+                self._make_code(user, candidate), code
+            )
+        return valid
+
+
+confirmation_code_generator = ConfirmationCodeGenerator()
+
+
+def send_confirmation_code(user):
+    """
+    Ставит в очередь письмо с кодом. Повторные регистрации, пока письмо
+    не отправлено, склеиваются по ключу пользователя и не требуют записи
+    кода в базу.
+    """
+    return enqueue_email(
+        'Код подтверждения YaMDb',
+        f'Ваш код подтверждения: '
+        f'{confirmation_code_generator.make_code(user)}',
+        [user.email],
+        dedup_key=f'signup:{user.pk}',
+    )
@@ -1,14 +1,15 @@
 from django.urls import include, path
-from rest_framework.routers import DefaultRouter
 
+from .async_views import AsyncReadRouter
 from .views import (TitleViewSet, CategoryViewSet,
                     GenreViewSet, ReviewViewSet,
                     CommentViewSet, get_token, SignUp,
-                    UsersViewSet)
+                    UsersViewSet, cache_stats, export, metrics,
+                    sync)
 
 app_name = 'api'
 
-router_v1 = DefaultRouter()
+router_v1 = AsyncReadRouter()
 
 router_v1.register(r'users', UsersViewSet, basename='users')
 router_v1.register(r'titles', TitleViewSet)
@@ -30,5 +31,10 @@ registration_patterns = [
 
 urlpatterns = [
     path('v1/auth/', include(registration_patterns)),
+    path('v1/cache/stats/', cache_stats, name='cache-stats'),
+    path('v1/metrics/', metrics, name='metrics'),
+    path('v1/export/', export, name='export'),
+    path('v1/export/<str:filename>', export, name='export-file'),
+    path('v1/sync/', sync, name='sync'),
     path('v1/', include(router_v1.urls)),
 ]
@@ -1,26 +1,120 @@
-from rest_framework import viewsets
-from django.db.models import Avg
-from reviews.models import Title, Category, Genre
-from rest_framework import viewsets, filters
-from rest_framework.pagination import LimitOffsetPagination
+from django.conf import settings
+from django.db.models import Count, Max, Subquery, Sum
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import filters, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from reviews.export import (EXPORT_FILES, decode_cursor, encode_cursor,
+                            get_mark, iter_csv, iter_ndjson)
+from reviews.models import (SCORES, Category, Change, Comments, Genre, Review,
+                            Title, TitleRanking, User, get_score_stats,
+                            score_field)
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core.db import RetryOnLockedMixin
+from core.routers import ReplicaReadMixin
 
-from .filters import FilterForTitle
-from .serializers import (CategorySerializer, GenreSerializer,
-                          TitleReadSerializer, TitleWriteSerializer,
-                          ReviewSerializer)
 
+from .authentication import ClaimsAccessToken
+from .cache import ResponseCacheMixin, get_stats
+from .conditional import ConditionalGetMixin, make_etag
+from .fieldsets import get_fieldset
+from .filters import FilterForTitle, IndexSearchFilter
+from .metrics import get_metrics
+from .nested import NestedResourceMixin
+from .pagination import KeysetOrLimitOffsetPagination, UserPagination
+from .permissions import (IsAdmin, IsAdminOrReadOnly,
+                          IsAuthorOrModeratorOrReadOnly)
+from .querysets import QuerysetPlannerMixin, plan_queryset
+from .serializers import (CategorySerializer, CommentSerializer,
+                          GenreSerializer, ProfileSerializer,
+                          SignUpSerializer, TitleReadSerializer,
+                          TitleWriteSerializer, TokenSerializer,
+                          TopTitlesSerializer, ReviewSerializer,
+                          SyncSerializer, UserSerializer)
+from .sync import get_changes
+from .tokens import confirmation_code_generator, send_confirmation_code
 
-class TitleViewSet(viewsets.ModelViewSet):
-    """Отображение действий с произведениями."""
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
+
+class SignUp(APIView):
+    """
+    Регистрация и повторный запрос кода: пользователь создаётся один раз,
+    письмо с кодом уходит через очередь задач.
+    """
+    permission_classes = (AllowAny,)
+
+    def post(self, request):
+        serializer = SignUpSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user, _ = User.objects.get_or_create(**serializer.validated_data)
+        send_confirmation_code(user)
+        return Response(serializer.data)
+
+
+@api_view(['POST'])
+@permission_classes((AllowAny,))
+def get_token(request):
+    """Обменивает код подтверждения на access-токен."""
+    serializer = TokenSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    user = get_object_or_404(
+        User, username=serializer.validated_data['username']
     )
-    # permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
-    filter_backends = (DjangoFilterBackend, filters.OrderingFilter, )
+    code = serializer.validated_data['confirmation_code']
+    # Код одноразовый: обмен меняет last_login, а условие на прежнее
+    # значение не даёт двум одновременным запросам обменять один код.
+    if not (
+        confirmation_code_generator.check_code(user, code)
+        and User.objects.filter(
+            pk=user.pk, last_login=user.last_login
+        ).update(last_login=timezone.now())
+    ):
+        raise ValidationError(
+            {'confirmation_code': 'Неверный или устаревший код.'}
+        )
+    return Response({'token': str(ClaimsAccessToken.for_user(user))})
+
+
+class UsersViewSet(RetryOnLockedMixin, viewsets.ModelViewSet):
+    """Пользователи для администратора и собственный профиль."""
+
+    queryset = User.objects.order_by('username')
+    serializer_class = UserSerializer
+    permission_classes = (IsAdmin,)
+    pagination_class = UserPagination
+    filter_backends = (filters.SearchFilter,)
+    search_fields = ('username',)
+    lookup_field = 'username'
+    http_method_names = ('get', 'post', 'patch', 'delete', 'head', 'options')
+
+    @action(detail=False, methods=('get', 'patch'),
+            permission_classes=(IsAuthenticated,))
+    def me(self, request):
+        # Пользователь из токена загружен не целиком: профиль читается
+        # одним запросом.
+        user = get_object_or_404(User, pk=request.user.pk)
+        if request.method == 'GET':
+            return Response(ProfileSerializer(user).data)
+        serializer = ProfileSerializer(user, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
+
+
+class TitleViewSet(ReplicaReadMixin, RetryOnLockedMixin,
+                   ConditionalGetMixin, ResponseCacheMixin,
+                   QuerysetPlannerMixin, viewsets.ModelViewSet):
+    """Отображение действий с произведениями."""
+    async_reads = True
+    cache_group = 'titles'
+    queryset = Title.objects.all()
+    permission_classes = (IsAdminOrReadOnly,)
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = FilterForTitle
     filterset_fields = ('category__slug', 'genre__slug', 'name', 'year')
 
@@ -29,38 +123,214 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def get_last_change(self):
+        # Журнал изменений в базе общий для всех процессов. Его последняя
+        # запись меняется при любой записи каталога и отзывов, включая
+        # смену рейтинга.
+        last_id = Change.objects.last_id()
+        return {
+            'change_id': last_id,
+            'changed': Subquery(
+                Change.objects.filter(id=last_id).values('created')
+            ),
+        }
+
+    def make_validators(self, change_id, changed):
+        etag = make_etag(self.cache_group, change_id,
+                         self.request.accepted_media_type)
+        return etag, changed.timestamp() if changed is not None else None
+
+    def get_list_validators(self):
+        change = Change.objects.filter(
+            id=Change.objects.last_id()
+        ).values_list('id', 'created').first()
+        return self.make_validators(*change or (None, None))
+
+    def get_object_validators(self):
+        # Тот же запрос проверяет, что произведение есть: иначе 404, а не 304.
+        title = get_object_or_404(Title.objects.filter(
+            pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        ).values(**self.get_last_change()))
+        return self.make_validators(title['change_id'], title['changed'])
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        """Лучшие произведения из предрассчитанных рейтинговых списков."""
+        return self.get_cached_response(self.get_top, request)
+
+    def get_top(self, request):
+        params = TopTitlesSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        options = dict(params.validated_data)
+        ids = TitleRanking.objects.top(
+            options.pop('limit'), weighted=options.pop('bayesian'), **options
+        )
+        titles = plan_queryset(
+            Title.objects.filter(pk__in=ids), TitleReadSerializer,
+            get_fieldset(request),
+        ).in_bulk()
+        serializer = TitleReadSerializer(
+            [titles[pk] for pk in ids if pk in titles], many=True,
+            context=self.get_serializer_context(),
+        )
+        return Response(serializer.data)
+
+    @action(detail=True, url_path='stats')
+    def stats(self, request, pk=None):
+        """Распределение оценок произведения по гистограмме."""
+        return self.get_cached_response(self.get_title_stats, request, pk=pk)
+
+    def get_title_stats(self, request, pk=None):
+        # Одна строка с корзинами: статистика не читает таблицу отзывов.
+        title = get_object_or_404(
+            Title.objects.only(*map(score_field, SCORES)), pk=pk
+        )
+        return Response(get_score_stats(title.histogram))
 
-class GenreViewSet(viewsets.ModelViewSet):
+
+class GenreViewSet(ReplicaReadMixin, RetryOnLockedMixin,
+                   ResponseCacheMixin, QuerysetPlannerMixin,
+                   viewsets.ModelViewSet):
     """Отображение действий с жанрами для произведений."""
+    async_reads = True
+    cache_group = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
-    # permission_classes = (IsAdminOrReadOnly,)
-    lookup_field = 'slug'
-    filter_backends = (filters.SearchFilter,)
-    lookup_field = 'slug'
+    permission_classes = (IsAdminOrReadOnly,)
+    filter_backends = (IndexSearchFilter,)
     search_fields = ('name',)
+    lookup_field = 'slug'
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ReplicaReadMixin, RetryOnLockedMixin,
+                      ResponseCacheMixin, QuerysetPlannerMixin,
+                      viewsets.ModelViewSet):
     """Отображение действий с категориями произведений."""
+    async_reads = True
+    cache_group = 'categories'
     queryset = Category.objects.all()
-    # permission_classes = (IsAdminOrReadOnly,)
+    permission_classes = (IsAdminOrReadOnly,)
     serializer_class = CategorySerializer
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (IndexSearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, RetryOnLockedMixin,
+                    ConditionalGetMixin, NestedResourceMixin,
+                    QuerysetPlannerMixin, viewsets.ModelViewSet):
     """Отображение действий с отзывами."""
+    async_reads = True
 
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    permission_classes = (IsAuthorOrModeratorOrReadOnly,)
+    pagination_class = KeysetOrLimitOffsetPagination
+    parent_lookups = (('title', 'title_id'),)
+    # Нужны ключу пагинации и валидаторам условных запросов.
+    required_fields = ('pub_date', 'version')
+    # Правка и удаление отзыва не сдвигают max(pub_date).
+    last_modified_is_validator = False
+
+    def get_save_kwargs(self):
+        return {**super().get_save_kwargs(), 'author': self.request.user}
+
+    def get_list_validators(self):
+        # Счётчики отзывов вместе с произведением: тот же запрос
+        # проверяет, что оно есть, и кладёт его в request для list().
+        title = self.set_parent(get_object_or_404(
+            self.get_parent_queryset().annotate(
+                count=Count('reviews'), last=Max('reviews__pub_date'),
+                versions=Sum('reviews__version'),
+            )
+        ))
+        etag = make_etag('reviews', title.pk, title.count, title.last,
+                         title.versions, self.request.accepted_media_type)
+        last = title.last
+        return etag, last.timestamp() if last is not None else None
+
+    def get_object_validators(self):
+        review = self.get_object()
+        etag = make_etag('review', review.pk, review.version,
+                         self.request.accepted_media_type)
+        return etag, review.pub_date.timestamp()
+
+
+class CommentViewSet(ReplicaReadMixin, RetryOnLockedMixin,
+                     NestedResourceMixin, QuerysetPlannerMixin,
+                     viewsets.ModelViewSet):
+    """Отображение действий с комментариями к отзывам."""
+
+    queryset = Comments.objects.all()
+    serializer_class = CommentSerializer
+    permission_classes = (IsAuthorOrModeratorOrReadOnly,)
+    pagination_class = KeysetOrLimitOffsetPagination
+    parent_lookups = (('review', 'review_id'), ('review__title', 'title_id'))
+    # Нужно ключу пагинации.
+    required_fields = ('pub_date',)
+
+    def get_save_kwargs(self):
+        return {**super().get_save_kwargs(), 'author': self.request.user}
+
+
+@api_view(['GET'])
+@permission_classes((IsAdminUser,))
+def cache_stats(request):
+    """Счётчики попаданий в кэш ответов для мониторинга."""
+    return Response(get_stats())
+
+
+@api_view(['GET'])
+@permission_classes((IsAdminUser,))
+def metrics(request):
+    """Время ответа и запросы к базе по маршрутам текущего процесса."""
+    return Response(get_metrics())
+
+
+@api_view(['GET'])
+def sync(request):
+    """
+    Изменения каталога, отзывов и комментариев после ?token=: созданные
+    и изменённые объекты целиком, удалённые - tombstone с id.
+    """
+    params = SyncSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    return Response(get_changes(**params.validated_data))
 
-    def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
-        return title.reviews.all()
 
-    def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
-        serializer.save(author=self.request.user, title=title)
+@api_view(['GET'])
+@permission_classes((IsAdminUser,))
+def export(request, filename=None):
+    """
+    Потоковая выгрузка каталога: без имени файла - NDJSON со всеми
+    таблицами, с именем - CSV в формате static/data. Курсор для
+    ?since= следующей выгрузки отдаётся в заголовке X-Export-Cursor;
+    изменения после курсора с удалениями выгружаются только в NDJSON.
+    """
+    if filename is not None and filename not in EXPORT_FILES:
+        raise Http404
+    try:
+        since = decode_cursor(request.query_params.get('since'))
+    except ValueError as error:
+        raise ValidationError({'since': str(error)})
+    if filename is not None and since is not None:
+        raise ValidationError(
+            {'since': 'CSV выгружается только целиком: удаления в нём '
+                      'не передать.'}
+        )
+    until = get_mark()
+    if filename is None:
+        response = StreamingHttpResponse(
+            iter_ndjson(since, until, settings.EXPORT_CHUNK_SIZE),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+    else:
+        response = StreamingHttpResponse(
+            iter_csv(filename, settings.EXPORT_CHUNK_SIZE),
+            content_type='text/csv; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}"'
+        )
+    response['X-Export-Cursor'] = encode_cursor(until)
+    return response
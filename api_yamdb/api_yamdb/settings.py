@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.metrics.QueryMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -62,13 +63,148 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
+# Сколько секунд соединение SQLite ждёт чужую блокировку записи, прежде
+# чем ответить «database is locked». Модуль sqlite3 выставляет по нему
+# busy_timeout при подключении; нужен в OPTIONS каждой базы SQLite.
+DB_LOCK_TIMEOUT = 20
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переживает запрос: PRAGMA и кэш страниц SQLite
+        # не теряются между запросами одного процесса.
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'timeout': DB_LOCK_TIMEOUT,
+        },
     }
 }
 
+# Реплики только для чтения: alias из DATABASES -> вес. Безопасные
+# запросы к вьюсетам API читают с реплик, остальное идёт в default.
+# Например, 'replica': {..., 'NAME': '/srv/replica/db.sqlite3'}
+# в DATABASES и DATABASE_REPLICAS = {'replica': 1}.
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+DATABASE_REPLICAS = {}
+# Сколько секунд после записи клиент читает с основной базы,
+# и как часто проверять доступность реплик.
+REPLICA_PIN_SECONDS = 5
+REPLICA_HEALTH_INTERVAL = 10
+# Отметки о записи нужны всем процессам: кэш из CACHES, общий для них.
+REPLICA_PIN_CACHE = 'api'
+
+# PRAGMA для каждого нового соединения SQLite (core.db). WAL позволяет
+# читать во время записи, NORMAL в WAL не теряет целостность при сбое
+# процесса. Ожидание блокировки задаёт DB_LOCK_TIMEOUT.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Сколько раз повторять транзакцию записи, если база занята,
+# и начальная задержка повтора в секундах (удваивается).
+DB_LOCK_RETRIES = 5
+DB_LOCK_RETRY_DELAY = 0.05
+
+# Под ASGI безопасные запросы к вьюсетам с async_reads выполняются
+# в пуле из стольких потоков, у каждого своё соединение с базой.
+ASYNC_READ_WORKERS = 16
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'api.authentication.ClaimsJWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ),
+    # JSON через orjson; MessagePack выбирается по
+    # Accept/Content-Type: application/msgpack.
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.ORJSONParser',
+        'api.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+SIMPLE_JWT = {
+    'AUTH_TOKEN_CLASSES': ('api.authentication.ClaimsAccessToken',),
+}
+
+# Сколько секунд процесс доверяет закэшированной версии токенов
+# пользователя: столько может работать токен после смены роли.
+JWT_CLAIMS_CACHE_TIMEOUT = 5
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+DEFAULT_FROM_EMAIL = 'noreply@yamdb.fake'
+
+# Длина интервала в секундах, по которому вычисляется код подтверждения:
+# код действует от одного до двух интервалов.
+CONFIRMATION_CODE_TIMEOUT = 60 * 60
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Кэш ответов каталога. Поколения групп в нём сбрасывают ответы
+    # во всех процессах, поэтому кэш должен быть общим: файловый
+    # или, например, Redis/Memcached, но не LocMemCache.
+    'api': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+}
+
+# Очередь фоновых задач (manage.py run_workers): число попыток, базовая
+# задержка повтора в секундах (удваивается с каждой попыткой) и время,
+# после которого задачу упавшего обработчика забирает другой.
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10
+JOB_LOCK_TIMEOUT = 300
+
+# Байесовский рейтинг в /api/v1/titles/top/: средняя оценка, к которой
+# тянется рейтинг, и сколько отзывов она весит.
+LEADERBOARD_PRIOR_MEAN = 5.5
+LEADERBOARD_PRIOR_WEIGHT = 10
+
+# Сколько запросов к базе может выполнить GET-запрос к маршруту.
+# Превышение пишется в лог, а при QUERY_BUDGET_STRICT (включается
+# в тестах) - ошибка. Поиск добавляет запрос к словарю на каждое слово,
+# а ?expand= - по запросу на каждую подгружаемую им связь.
+QUERY_BUDGETS = {
+    'api:title-list': 6,
+    'api:title-detail': 3,
+    'api:title-top': 3,
+    'api:title-stats': 1,
+    'api:genre-list': 4,
+    'api:category-list': 4,
+    'api:reviews-list': 3,
+    'api:reviews-detail': 3,
+    'api:comments-list': 2,
+    # Страница журнала и по запросу на каждую модель в ней.
+    'api:sync': 7,
+}
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGET_STRICT = False
+
+# Сколько строк выгрузка (manage.py export, /api/v1/export/) читает
+# из базы за один проход курсора.
+EXPORT_CHUNK_SIZE = 2000
+
 
 # Password validation
 
@@ -0,0 +1,85 @@
+import functools
+import logging
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def configure_sqlite(connection):
+    """
+    Применяет SQLITE_PRAGMAS к соединению sqlite3. journal_mode=WAL
+    хранится в файле базы, остальные настройки действуют на соединение.
+    """
+    cursor = connection.cursor()
+    try:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+@receiver(connection_created)
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        configure_sqlite(connection.connection)
+
+
+def is_locked(error):
+    return any(message in str(error) for message in LOCKED_MESSAGES)
+
+
+def retry_on_locked(func=None, using=DEFAULT_DB_ALIAS):
+    """
+    Выполняет функцию в транзакции и повторяет её, если SQLite ответил
+    «database is locked». Блокировку SQLite ждёт сам (DB_LOCK_TIMEOUT),
+    но запись в транзакции, начатой чтением, получает отказ сразу: снимок WAL
+    устарел, и помогает только повтор транзакции целиком.
+
+    Внутри внешней транзакции повтор невозможен, ошибка пробрасывается.
+    """
+    if func is None:
+        return functools.partial(retry_on_locked, using=using)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        attempts = settings.DB_LOCK_RETRIES
+        for attempt in range(attempts + 1):
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if attempt == attempts or not is_locked(error) \
+                        or connections[using].in_atomic_block:
+                    raise
+                logger.debug('База занята, повтор %s: %s', attempt + 1,
+                             func.__qualname__)
+                time.sleep(settings.DB_LOCK_RETRY_DELAY * 2 ** attempt)
+    return wrapper
+
+
+class RetryOnLockedMixin:
+    """Вьюсет, повторяющий запись, если база занята другим процессом."""
+
+    def perform_create(self, serializer):
+        create = super().perform_create
+
+        @retry_on_locked
+        def attempt():
+            # Иначе после отката повтор вызовет update() вместо create().
+            serializer.instance = None
+            create(serializer)
+        attempt()
+
+    def perform_update(self, serializer):
+        retry_on_locked(super().perform_update)(serializer)
+
+    def perform_destroy(self, instance):
+        retry_on_locked(super().perform_destroy)(instance)
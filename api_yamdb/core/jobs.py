@@ -0,0 +1,188 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .db import retry_on_locked
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Обработчики по видам задач. Обработчик получает список payload пачки
+# и возвращает словарь {индекс: ошибка} для неудавшихся задач.
+HANDLERS = {}
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def replace_pending(kind, dedup_key, payload):
+    """Заменяет payload ожидающей задачи с ключом; None, если такой нет."""
+    pending = Job.objects.filter(
+        kind=kind, dedup_key=dedup_key, status=Job.PENDING
+    )
+    job = pending.first()
+    if job is None or not pending.filter(pk=job.pk).update(payload=payload):
+        return None
+    job.payload = payload
+    return job
+
+
+@retry_on_locked
+def enqueue(kind, payload, dedup_key='', delay=0):
+    """
+    Ставит задачу в очередь. Пока задача с тем же dedup_key ждёт
+    в очереди, повтор только заменяет её payload: уйдёт последний.
+    Взятая или выполненная задача не мешает поставить новую.
+
+    Одну ожидающую задачу на ключ гарантирует уникальный индекс, а не
+    блокировка строки: SQLite не поддерживает SELECT ... FOR UPDATE.
+    """
+    if dedup_key:
+        job = replace_pending(kind, dedup_key, payload)
+        if job is not None:
+            return job
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                kind=kind, payload=payload, dedup_key=dedup_key,
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        # Ожидающую задачу с тем же ключом успел поставить другой запрос.
+        job = replace_pending(kind, dedup_key, payload)
+        if job is None:
+            raise
+        return job
+
+
+def enqueue_email(subject, body, recipients, dedup_key=''):
+    return enqueue('email', {
+        'subject': subject,
+        'body': body,
+        'to': list(recipients),
+    }, dedup_key=dedup_key)
+
+
+def get_ready_jobs(now):
+    """Задачи, которые пора выполнить, и брошенные упавшим процессом."""
+    abandoned = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return Job.objects.filter(
+        Q(status=Job.PENDING, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=abandoned)
+    )
+
+
+@retry_on_locked
+def claim(limit):
+    """
+    Забирает до limit готовых задач одного вида. Задача достаётся тому,
+    чей условный UPDATE её изменил, поэтому обработчики не пересекаются
+    и без SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    now = timezone.now()
+    ready = get_ready_jobs(now).order_by('run_after', 'pk')
+    kind = ready.values_list('kind', flat=True).first()
+    if kind is None:
+        return None, []
+    ids = list(ready.filter(kind=kind).values_list('pk', flat=True)[:limit])
+    token = uuid.uuid4().hex
+    get_ready_jobs(now).filter(pk__in=ids).update(
+        status=Job.RUNNING, locked_by=token, locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return kind, list(Job.objects.filter(pk__in=ids, locked_by=token))
+
+
+def retry_later(job, error, now):
+    """Возвращает задачу в очередь с экспоненциальной задержкой."""
+    job.last_error = repr(error)
+    job.locked_by = ''
+    if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+        job.status = Job.FAILED
+        job.finished = now
+    else:
+        job.status = Job.PENDING
+        job.run_after = now + timedelta(
+            seconds=settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+    fields = ('status', 'run_after', 'finished', 'last_error', 'locked_by')
+    try:
+        with transaction.atomic():
+            job.save(update_fields=fields)
+    except IntegrityError:
+        # Пока задача выполнялась, с тем же ключом поставили новую:
+        # она и доставит последний payload.
+        job.status = Job.FAILED
+        job.finished = now
+        job.save(update_fields=fields)
+
+
+def run_batch(kind, jobs):
+    try:
+        job_handler = HANDLERS[kind]
+        failures = job_handler([job.payload for job in jobs]) or {}
+    except Exception as error:
+        logger.exception('Пачка задач %s не выполнена', kind)
+        failures = dict.fromkeys(range(len(jobs)), error)
+    finish_batch(jobs, failures)
+    return len(jobs) - len(failures), len(failures)
+
+
+@retry_on_locked
+def finish_batch(jobs, failures):
+    """Записывает итог пачки; повтор не отправляет письма заново."""
+    now = timezone.now()
+    for index, error in failures.items():
+        retry_later(jobs[index], error, now)
+    Job.objects.filter(pk__in=[
+        job.pk for index, job in enumerate(jobs) if index not in failures
+    ]).update(status=Job.DONE, finished=now, locked_by='', last_error='')
+
+
+def work(stop, batch_size=50, poll_interval=1.0, once=False):
+    """
+    Цикл обработчика: берёт пачки, пока не выставлен stop. С once
+    выходит, когда готовых задач не осталось.
+    """
+    done = failed = 0
+    try:
+        while not stop.is_set():
+            kind, jobs = claim(batch_size)
+            if jobs:
+                succeeded, rejected = run_batch(kind, jobs)
+                done += succeeded
+                failed += rejected
+            elif once:
+                break
+            elif kind is None:
+                stop.wait(poll_interval)
+    finally:
+        connections.close_all()
+    return done, failed
+
+
+@handler('email')
+def send_emails(payloads):
+    """Отправляет пачку писем через одно соединение с почтовым сервером."""
+    failures = {}
+    with get_connection() as connection:
+        for index, payload in enumerate(payloads):
+            message = EmailMessage(
+                payload['subject'], payload['body'], to=payload['to'],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                failures[index] = error
+    return failures
@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...jobs import work
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди, например отправку писем.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Количество потоков-обработчиков.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Сколько задач одного вида обработчик берёт за раз.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+
+    def handle(self, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError(
+                '--workers и --batch-size должны быть больше нуля.'
+            )
+        stop = threading.Event()
+        with ThreadPoolExecutor(options['workers']) as pool:
+            futures = [
+                pool.submit(
+                    work, stop, options['batch_size'],
+                    options['poll_interval'], options['once'],
+                )
+                for _ in range(options['workers'])
+            ]
+            try:
+                while wait(futures, timeout=0.5).not_done:
+                    pass
+            except KeyboardInterrupt:
+                self.stdout.write('Остановка после текущих пачек...')
+                stop.set()
+        done = sum(future.result()[0] for future in futures)
+        failed = sum(future.result()[1] for future in futures)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, отложено или не выполнено: {failed}.'
+        ))
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 
 
 class CommentsAndReviews(models.Model):
@@ -25,3 +26,51 @@ class CategoryAndGenre(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class Job(models.Model):
+    """Фоновая задача очереди, выполняется командой run_workers."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Не выполнена'),
+    )
+    kind = models.CharField('Вид', max_length=32)
+    payload = models.JSONField('Данные')
+    dedup_key = models.CharField(
+        'Ключ повтора', max_length=255, blank=True, db_index=True
+    )
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    run_after = models.DateTimeField('Выполнить после')
+    locked_by = models.CharField('Обработчик', max_length=64, blank=True)
+    locked_at = models.DateTimeField('Взята в работу', null=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    finished = models.DateTimeField('Завершена', null=True)
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(
+                fields=['status', 'kind', 'run_after'], name='job_queue_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'dedup_key'],
+                condition=Q(status='pending') & ~Q(dedup_key=''),
+                name='job_pending_dedup_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk} ({self.status})'
@@ -0,0 +1,129 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_PREFIX = 'primary-pin:'
+
+# Реплика, выбранная для чтений текущего запроса; None - основная база.
+_read_alias = ContextVar('read_alias', default=None)
+# alias -> (время проверки, доступна ли реплика)
+_health = {}
+
+
+def is_healthy(alias):
+    """
+    Доступна ли реплика. Проверка - SELECT 1 не чаще раза
+    в REPLICA_HEALTH_INTERVAL секунд; недоступная реплика получает
+    нулевой вес до следующей проверки.
+    """
+    now = time.monotonic()
+    checked = _health.get(alias)
+    if checked is not None \
+            and now - checked[0] < settings.REPLICA_HEALTH_INTERVAL:
+        return checked[1]
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        healthy = True
+    except DatabaseError:
+        logger.warning('Реплика %s недоступна', alias, exc_info=True)
+        healthy = False
+    _health[alias] = (now, healthy)
+    return healthy
+
+
+def choose_replica():
+    """Случайная доступная реплика с учётом весов из DATABASE_REPLICAS."""
+    replicas = [
+        (alias, weight)
+        for alias, weight in settings.DATABASE_REPLICAS.items()
+        if weight > 0 and is_healthy(alias)
+    ]
+    if not replicas:
+        return None
+    aliases, weights = zip(*replicas)
+    return random.choices(aliases, weights)[0]
+
+
+def get_client_key(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def get_pin_cache():
+    """
+    Кэш отметок о записи. Следующий запрос клиента может попасть
+    в другой процесс, поэтому кэш должен быть общим для всех процессов.
+    """
+    return caches[settings.REPLICA_PIN_CACHE]
+
+
+def pin_to_primary(key):
+    """После записи клиент REPLICA_PIN_SECONDS читает с основной базы."""
+    get_pin_cache().set(PIN_PREFIX + key, True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(key):
+    return get_pin_cache().get(PIN_PREFIX + key) is not None
+
+
+class ReplicaRouter:
+    """
+    Чтения внутри ReplicaReadMixin идут на реплику, выбранную для
+    запроса, всё остальное - на основную базу. Миграции на реплики
+    не применяются: их схема приходит репликацией.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Без явного ответа Django пишет в базу, из которой прочитан
+        # объект, то есть в реплику.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Вьюсет, читающий безопасными методами с реплики. Реплика выбирается
+    один раз на запрос, чтобы все запросы видели одно состояние. Клиент,
+    только что записавший данные, читает с основной базы и сразу видит
+    свои изменения, хотя реплика ещё отстаёт.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.DATABASE_REPLICAS:
+            return
+        if request.method in SAFE_METHODS \
+                and not is_pinned(get_client_key(request)):
+            self._read_token = _read_alias.set(choose_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_read_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._read_token = None
+        elif settings.DATABASE_REPLICAS \
+                and request.method not in SAFE_METHODS \
+                and response.status_code < 400:
+            pin_to_primary(get_client_key(request))
+        return super().finalize_response(request, response, *args, **kwargs)
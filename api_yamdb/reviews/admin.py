@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 
-from .models import Review, Comment, Title, Category, Genre
+from .models import Review, Comments, Title, Category, Genre
 
 
 User = get_user_model()
@@ -25,7 +25,9 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'year', 'description', 'category')
+    list_display = ('id', 'name', 'year', 'description', 'category',
+                    'rating')
+    readonly_fields = ('reviews_count', 'score_sum', 'rating')
     search_fields = ('name',)
     list_filter = ('category',)
 
@@ -47,4 +49,4 @@ admin.site.register(Category, CategoryAdmin)
 admin.site.register(Genre, GenreAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(Review, ReviewAdmin)
-admin.site.register(Comment, CommentAdmin)
+admin.site.register(Comments, CommentAdmin)
@@ -0,0 +1,298 @@
+import csv
+import pickle
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.db import connection, transaction
+
+from .models import Category, Comments, Genre, Review, Title, User
+
+# Файлы из static/data в порядке зависимостей по внешним ключам.
+CSV_FILES = (
+    ('users.csv', User),
+    ('category.csv', Category),
+    ('genre.csv', Genre),
+    ('titles.csv', Title),
+    ('genre_title.csv', Title.genre.through),
+    ('review.csv', Review),
+    ('comments.csv', Comments),
+)
+
+
+def get_dependencies(files):
+    """
+    Строит граф зависимостей файлов по внешним ключам их моделей.
+    Ссылки на модели вне списка файлов не учитываются.
+    """
+    filenames = {model: filename for filename, model in files}
+    return {
+        filename: {
+            filenames[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model is not model
+            and field.related_model in filenames
+        }
+        for filename, model in files
+    }
+
+
+def read_batches(path, batch_size):
+    """Построчно читает CSV и отдаёт строки пачками по batch_size."""
+    with open(path, encoding='utf-8', newline='') as file:
+        reader = csv.DictReader(file)
+        while True:
+            batch = list(islice(reader, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+def get_columns(model, header):
+    """
+    Сопоставляет колонки CSV с полями модели по имени или attname.
+    Возвращает словарь колонка -> поле и список колонок без поля.
+    """
+    fields = {}
+    for field in model._meta.concrete_fields:
+        fields[field.name] = field
+        fields[field.attname] = field
+    columns = {name: fields[name] for name in header if name in fields}
+    skipped = [name for name in header if name not in fields]
+    return columns, skipped
+
+
+def parse_file(path, model, batch_size):
+    """
+    Отдаёт пачки строк файла, приведённых к python-типам полей модели.
+    Первым значением отдаёт список колонок, которых нет в модели.
+    """
+    columns = None
+    for rows in read_batches(path, batch_size):
+        if columns is None:
+            columns, skipped = get_columns(model, rows[0].keys())
+            yield skipped
+        batch = []
+        for row in rows:
+            values = {}
+            for name, field in columns.items():
+                value = row[name]
+                if value == '' and field.null:
+                    value = None
+                values[field.attname] = field.to_python(value)
+            batch.append(values)
+        yield batch
+    if columns is None:
+        yield []
+
+
+def spool_file(path, label, batch_size, spool_dir):
+    """
+    Разбирает файл в отдельном процессе и складывает пачки в pickle-файл,
+    чтобы основной процесс читал их потоком, не держа файл в памяти.
+    """
+    model = apps.get_model(label)
+    with tempfile.NamedTemporaryFile(
+        dir=spool_dir, suffix='.pickle', delete=False
+    ) as spool:
+        for batch in parse_file(Path(path), model, batch_size):
+            pickle.dump(batch, spool, pickle.HIGHEST_PROTOCOL)
+    return spool.name
+
+
+def read_spool(path):
+    """Читает пачки, записанные spool_file."""
+    with open(path, 'rb') as spool:
+        while True:
+            try:
+                yield pickle.load(spool)
+            except EOFError:
+                return
+
+
+@contextmanager
+def keep_auto_now(model):
+    """Не даёт auto_now/auto_now_add затереть даты из файла."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class CsvImporter:
+    """
+    Потоковый импорт CSV пачками через bulk_create.
+    Внешние ключи проверяются по словарям известных id в памяти.
+    """
+
+    INSERT = 'insert'
+    TRUNCATE = 'truncate'
+    UPSERT = 'upsert'
+
+    def __init__(self, batch_size=1000, mode=INSERT, stdout=None,
+                 progress=False):
+        self.batch_size = batch_size
+        self.mode = mode
+        self.stdout = stdout
+        self.progress = progress
+        self.known_ids = {}
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def get_known_ids(self, model):
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list('pk', flat=True).iterator()
+            )
+        return self.known_ids[model]
+
+    def truncate(self, models):
+        """
+        Очищает таблицы в обратном порядке зависимостей. Модели, на которые
+        ссылаются таблицы вне импорта, удаляются через ORM с каскадом.
+        """
+        models = set(models)
+        for model in reversed([model for _, model in CSV_FILES]):
+            if model not in models:
+                continue
+            external = any(
+                relation.related_model not in models
+                for relation in model._meta.related_objects
+            )
+            with transaction.atomic():
+                if external:
+                    model.objects.all().delete()
+                else:
+                    with connection.cursor() as cursor:
+                        table = connection.ops.quote_name(model._meta.db_table)
+                        cursor.execute(f'DELETE FROM {table}')
+            self.known_ids[model] = set()
+
+    def build_objects(self, model, batch):
+        """Создаёт объекты модели, отбрасывая строки с битыми ссылками."""
+        relations = [
+            field for field in model._meta.concrete_fields
+            if field.is_relation
+        ]
+        objects, orphans = [], 0
+        for values in batch:
+            if any(
+                values.get(field.attname) is not None
+                and values[field.attname]
+                not in self.get_known_ids(field.related_model)
+                for field in relations
+            ):
+                orphans += 1
+                continue
+            objects.append(model(**values))
+        return objects, orphans
+
+    def write(self, model, batch, objects):
+        if self.mode != self.UPSERT:
+            return model.objects.bulk_create(
+                objects, batch_size=self.batch_size
+            )
+        existing = set(model.objects.filter(
+            pk__in=[obj.pk for obj in objects]
+        ).values_list('pk', flat=True))
+        updates = [obj for obj in objects if obj.pk in existing]
+        if updates:
+            model.objects.bulk_update(
+                updates,
+                [name for name in batch[0] if name != model._meta.pk.attname],
+                batch_size=self.batch_size,
+            )
+        return model.objects.bulk_create(
+            [obj for obj in objects if obj.pk not in existing],
+            batch_size=self.batch_size,
+        )
+
+    def import_file(self, path, model, batches=None):
+        """
+        Импортирует один файл в одной транзакции. Уже разобранные пачки
+        можно передать в batches, иначе файл читается здесь же.
+        """
+        if batches is None:
+            batches = parse_file(path, model, self.batch_size)
+        started = time.monotonic()
+        imported = orphans = 0
+        skipped = next(batches)
+        if skipped:
+            self.log(f'{path.name}: пропущены колонки '
+                     f'без поля в модели: {", ".join(skipped)}')
+        with transaction.atomic(), keep_auto_now(model):
+            for batch in batches:
+                objects, rejected = self.build_objects(model, batch)
+                self.write(model, batch, objects)
+                imported += len(objects)
+                orphans += rejected
+                self.get_known_ids(model).update(obj.pk for obj in objects)
+                if self.progress:
+                    elapsed = time.monotonic() - started
+                    self.log(f'{path.name}: {imported} строк, '
+                             f'{imported / max(elapsed, 1e-6):.0f} строк/с')
+        if model is Review:
+            Title.objects.recalculate_ratings()
+        elapsed = time.monotonic() - started
+        self.log(f'{path.name}: импортировано {imported}, пропущено '
+                 f'{orphans} без связанных объектов за {elapsed:.2f} с '
+                 f'({imported / max(elapsed, 1e-6):.0f} строк/с)')
+        return imported, orphans
+
+    def import_files(self, path, files=CSV_FILES, jobs=None):
+        """
+        Разбирает файлы параллельно в пуле процессов и пишет их в базу
+        по мере готовности, соблюдая порядок зависимостей.
+        """
+        dependencies = get_dependencies(files)
+        models = dict(files)
+        done, total = set(), 0
+        with tempfile.TemporaryDirectory() as spool_dir, \
+                ProcessPoolExecutor(jobs, initializer=django.setup) as pool:
+            spools = {
+                filename: pool.submit(
+                    spool_file, path / filename, model._meta.label,
+                    self.batch_size, spool_dir,
+                )
+                for filename, model in files
+            }
+            while len(done) < len(files):
+                unblocked = [
+                    filename for filename, _ in files
+                    if filename not in done
+                    and dependencies[filename] <= done
+                ]
+                if not unblocked:
+                    raise ValueError('Циклическая зависимость между файлами.')
+                ready = [
+                    filename for filename in unblocked
+                    if spools[filename].done()
+                ]
+                if not ready:
+                    wait([spools[filename] for filename in unblocked],
+                         return_when=FIRST_COMPLETED)
+                    continue
+                for filename in ready:
+                    imported, _ = self.import_file(
+                        path / filename, models[filename],
+                        read_spool(spools[filename].result()),
+                    )
+                    total += imported
+                    done.add(filename)
+        return total
@@ -0,0 +1,152 @@
+import csv
+import random
+from datetime import datetime, timedelta, timezone
+
+# Заголовки совпадают с файлами static/data, чтобы результат
+# загружался командой import_from_csv.
+HEADERS = {
+    'users.csv': ('id', 'username', 'email', 'role', 'bio',
+                  'first_name', 'last_name'),
+    'category.csv': ('id', 'name', 'slug'),
+    'genre.csv': ('id', 'name', 'slug'),
+    'titles.csv': ('id', 'name', 'year', 'category'),
+    'genre_title.csv': ('id', 'title_id', 'genre_id'),
+    'review.csv': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments.csv': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+CATEGORIES = 10
+GENRES = 30
+MAX_GENRES_PER_TITLE = 3
+WORDS = (
+    'фильм', 'книга', 'песня', 'сюжет', 'герой', 'финал', 'актёр', 'сцена',
+    'музыка', 'автор', 'жанр', 'история', 'время', 'мир', 'любовь', 'война',
+    'дорога', 'город', 'море', 'ночь', 'тайна', 'свет', 'тень', 'дом',
+)
+START_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+PERIOD_SECONDS = 3 * 365 * 24 * 3600
+
+
+def get_sizes(reviews):
+    """Размеры таблиц, пропорциональные количеству отзывов."""
+    return {
+        'users': max(100, reviews // 20),
+        'titles': max(50, reviews // 10),
+        'reviews': reviews,
+        'comments': reviews // 2,
+    }
+
+
+def get_review_counts(rng, reviews, titles, users, skew):
+    """
+    Раскладывает отзывы по произведениям по закону Ципфа: у первых
+    произведений отзывов на порядки больше, чем у хвоста. Отзывов
+    у произведения не больше, чем пользователей.
+    """
+    weights = [1 / (rank + 1) ** skew for rank in range(titles)]
+    total = sum(weights)
+    counts = [min(users, int(reviews * weight / total)) for weight in weights]
+    deficit = reviews - sum(counts)
+    index = titles - 1
+    while deficit > 0:
+        if counts[index] < users:
+            counts[index] += 1
+            deficit -= 1
+        index = index - 1 if index else titles - 1
+    order = list(range(titles))
+    rng.shuffle(order)
+    return {title_id + 1: counts[rank] for rank, title_id in enumerate(order)}
+
+
+def skewed_id(rng, count, skew):
+    """id от 1 до count, малые id выпадают чаще."""
+    return int(count * rng.random() ** (1 + skew)) + 1
+
+
+def make_text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def make_date(rng):
+    moment = START_DATE + timedelta(seconds=rng.randrange(PERIOD_SECONDS))
+    return moment.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def open_writer(path, filename):
+    file = open(path / filename, 'w', encoding='utf-8', newline='')
+    writer = csv.writer(file)
+    writer.writerow(HEADERS[filename])
+    return file, writer
+
+
+def write_catalogue(path, rng, sizes):
+    file, writer = open_writer(path, 'users.csv')
+    with file:
+        for user_id in range(1, sizes['users'] + 1):
+            writer.writerow((user_id, f'user{user_id}',
+                             f'user{user_id}@yamdb.fake', 'user', '', '', ''))
+    for filename, name, count in (('category.csv', 'Категория', CATEGORIES),
+                                  ('genre.csv', 'Жанр', GENRES)):
+        file, writer = open_writer(path, filename)
+        with file:
+            for pk in range(1, count + 1):
+                writer.writerow((pk, f'{name} {pk}', f'{filename[:-5]}-{pk}'))
+    titles, titles_writer = open_writer(path, 'titles.csv')
+    genres, genres_writer = open_writer(path, 'genre_title.csv')
+    with titles, genres:
+        link_id = 0
+        for title_id in range(1, sizes['titles'] + 1):
+            titles_writer.writerow((
+                title_id, make_text(rng, rng.randint(1, 4)),
+                rng.randint(1900, 2020), skewed_id(rng, CATEGORIES, 0.5),
+            ))
+            count = rng.randint(1, MAX_GENRES_PER_TITLE)
+            for genre_id in sorted(rng.sample(range(1, GENRES + 1), count)):
+                link_id += 1
+                genres_writer.writerow((link_id, title_id, genre_id))
+
+
+def write_reviews(path, rng, sizes, skew):
+    counts = get_review_counts(
+        rng, sizes['reviews'], sizes['titles'], sizes['users'], skew
+    )
+    file, writer = open_writer(path, 'review.csv')
+    with file:
+        review_id = 0
+        for title_id, count in counts.items():
+            quality = rng.gauss(7, 1.5)
+            for author in rng.sample(range(1, sizes['users'] + 1), count):
+                review_id += 1
+                score = min(10, max(1, round(rng.gauss(quality, 1.5))))
+                writer.writerow((
+                    review_id, title_id, make_text(rng, rng.randint(3, 30)),
+                    author, score, make_date(rng),
+                ))
+    return review_id
+
+
+def write_comments(path, rng, sizes, reviews, skew):
+    file, writer = open_writer(path, 'comments.csv')
+    with file:
+        for comment_id in range(1, sizes['comments'] + 1):
+            writer.writerow((
+                comment_id, skewed_id(rng, reviews, skew),
+                make_text(rng, rng.randint(2, 15)),
+                skewed_id(rng, sizes['users'], skew), make_date(rng),
+            ))
+
+
+def generate(path, reviews=1000, seed=0, skew=1.0):
+    """
+    Пишет в каталог path CSV-файлы в формате static/data. При одинаковых
+    reviews, seed и skew файлы получаются побайтно одинаковыми.
+    Строки пишутся потоком, в памяти держатся только счётчики
+    отзывов по произведениям.
+    """
+    rng = random.Random(seed)
+    sizes = get_sizes(reviews)
+    path.mkdir(parents=True, exist_ok=True)
+    write_catalogue(path, rng, sizes)
+    sizes['reviews'] = write_reviews(path, rng, sizes, skew)
+    write_comments(path, rng, sizes, sizes['reviews'], skew)
+    return sizes
@@ -0,0 +1,182 @@
+import binascii
+import csv
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .csv_import import CSV_FILES, get_columns
+from .datagen import HEADERS
+from .models import Change, Comments, Review, Title, User
+
+EXPORT_FILES = dict(CSV_FILES)
+encode_value = DjangoJSONEncoder().default
+
+
+class Echo:
+    """Файл для csv.writer, который возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def encode_cursor(change_id):
+    """Курсор для since=: id последней учтённой записи журнала."""
+    cursor = json.dumps({'change': change_id}, separators=(',', ':'))
+    return urlsafe_b64encode(cursor.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(value):
+    """Разбирает курсор since=; пустое значение - полная выгрузка."""
+    if not value:
+        return None
+    try:
+        cursor = json.loads(urlsafe_b64decode(value.encode('ascii')))
+        return int(cursor['change'])
+    except (binascii.Error, ValueError, TypeError, KeyError,
+            AttributeError):
+        raise ValueError('Некорректный курсор выгрузки.')
+
+
+def get_mark():
+    """
+    Последняя запись журнала на момент начала выгрузки. Изменения,
+    сделанные во время выгрузки, попадут и в следующую по курсору:
+    строки могут прийти повторно, но не теряются.
+    """
+    return Change.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+
+
+def has_reset(since, until):
+    """Была ли массовая загрузка: после неё нужна полная выгрузка."""
+    return Change.objects.filter(
+        pk__gt=since, pk__lte=until, action=Change.RESET
+    ).exists()
+
+
+def get_logged_ids(model, since, until):
+    """id объектов модели из журнала в (since, until] без повторов."""
+    return Change.objects.filter(
+        pk__gt=since, pk__lte=until, model=model._meta.model_name
+    ).order_by('object_id').values_list('object_id', flat=True).distinct()
+
+
+def get_changed_ids(filename, since, until):
+    """
+    Ключи изменённых строк файла. Связи жанров журнал отмечает
+    изменением произведения, поэтому genre_title обновляется целиком
+    по title_id. Пользователей журнал не ведёт: выгружаются авторы
+    изменённых отзывов и комментариев, чтобы на них было чем сослаться.
+    """
+    model = EXPORT_FILES[filename]
+    if model is Title.genre.through:
+        return get_logged_ids(Title, since, until)
+    if model is User:
+        return User.objects.filter(
+            Q(pk__in=Review.objects.filter(
+                pk__in=get_logged_ids(Review, since, until)
+            ).values('author'))
+            | Q(pk__in=Comments.objects.filter(
+                pk__in=get_logged_ids(Comments, since, until)
+            ).values('author'))
+        ).order_by('pk').values_list('pk', flat=True)
+    return get_logged_ids(model, since, until)
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (str, int)):
+        return value
+    return encode_value(value)
+
+
+def iter_rows(filename, chunk_size, keys=None):
+    """
+    Строки файла в порядке id: все или только с ключами из keys.
+    Строки читаются курсором базы пачками по chunk_size, память
+    не зависит от размера таблицы.
+    """
+    model = EXPORT_FILES[filename]
+    columns, _ = get_columns(model, HEADERS[filename])
+    names = [columns[name].attname for name in HEADERS[filename]]
+    rows = model.objects.order_by('pk').values_list(*names)
+    if keys is not None:
+        key = 'title_id' if model is Title.genre.through else 'pk'
+        rows = rows.filter(**{f'{key}__in': keys})
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield [format_value(value) for value in row]
+
+
+def iter_batches(keys, chunk_size):
+    batch = []
+    for key in keys.iterator(chunk_size=chunk_size):
+        batch.append(key)
+        if len(batch) == chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_changes(filename, since, until, chunk_size):
+    """
+    Изменения файла после курсора пачками по chunk_size ключей:
+    актуальные строки и tombstone {'id': ..., 'deleted': true} для
+    удалённых. Для genre_title tombstone с title_id снимает все связи
+    произведения, следом идут его актуальные связи.
+    """
+    header = HEADERS[filename]
+    links = EXPORT_FILES[filename] is Title.genre.through
+    for keys in iter_batches(
+        get_changed_ids(filename, since, until), chunk_size
+    ):
+        if links:
+            for key in keys:
+                yield {'title_id': key, 'deleted': True}
+        missing = set(keys)
+        for row in iter_rows(filename, chunk_size, keys):
+            missing.discard(row[0])
+            yield dict(zip(header, row))
+        if not links:
+            for key in sorted(missing):
+                yield {'id': key, 'deleted': True}
+
+
+def iter_csv(filename, chunk_size):
+    """Файл в формате static/data построчно, начиная с заголовка."""
+    writer = csv.writer(Echo(), lineterminator='\n')
+    yield writer.writerow(HEADERS[filename])
+    for row in iter_rows(filename, chunk_size):
+        yield writer.writerow(row)
+
+
+def iter_ndjson(since, until, chunk_size):
+    """
+    Все файлы одним потоком JSON-строк с полем table - именем файла
+    без расширения. С курсором since выгружаются только изменения после
+    него; если после него была массовая загрузка, первой идёт строка
+    {"reset": true} и полная выгрузка. Последняя строка содержит курсор
+    следующей выгрузки.
+    """
+    full = since is None or has_reset(since, until)
+    if since is not None and full:
+        yield json.dumps({'reset': True}) + '\n'
+    for filename in EXPORT_FILES:
+        table = filename.rsplit('.', 1)[0]
+        if full:
+            header = HEADERS[filename]
+            items = (
+                dict(zip(header, row))
+                for row in iter_rows(filename, chunk_size)
+            )
+        else:
+            items = iter_changes(filename, since, until, chunk_size)
+        for item in items:
+            yield json.dumps(
+                {'table': table, **item}, ensure_ascii=False
+            ) + '\n'
+    yield json.dumps({'cursor': encode_cursor(until)}) + '\n'
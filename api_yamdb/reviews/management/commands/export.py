@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...export import (EXPORT_FILES, decode_cursor, encode_cursor, get_mark,
+                       iter_csv, iter_ndjson)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает каталог с отзывами и комментариями в CSV-файлы '
+        'формата static/data или одним NDJSON-потоком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.BASE_DIR / 'static' / 'export',
+            help='Каталог для CSV-файлов.',
+        )
+        parser.add_argument(
+            '--ndjson',
+            action='store_true',
+            help='Писать NDJSON в stdout вместо CSV-файлов.',
+        )
+        parser.add_argument(
+            '--since',
+            default='',
+            help='Курсор прошлой выгрузки: выгрузить только изменения '
+                 'после него (только с --ndjson).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.EXPORT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за раз.',
+        )
+
+    def handle(self, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        try:
+            since = decode_cursor(options['since'])
+        except ValueError as error:
+            raise CommandError(error)
+        if since is not None and not options['ndjson']:
+            raise CommandError(
+                '--since работает только с --ndjson: удаления в CSV '
+                'не передать.'
+            )
+        until = get_mark()
+        if options['ndjson']:
+            for line in iter_ndjson(since, until, options['chunk_size']):
+                self.stdout.write(line, ending='')
+            return
+        path = settings.BASE_DIR / Path(options['path'])
+        path.mkdir(parents=True, exist_ok=True)
+        for filename in EXPORT_FILES:
+            with open(path / filename, 'w', encoding='utf-8',
+                      newline='') as file:
+                file.writelines(iter_csv(filename, options['chunk_size']))
+        self.stdout.write(self.style.SUCCESS(f'Выгружено в {path}.'))
+        self.stdout.write(f'Курсор для --since: {encode_cursor(until)}')
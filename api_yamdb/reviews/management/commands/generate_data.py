@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...datagen import generate
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические CSV-файлы в формате static/data '
+        'для нагрузочных замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.BASE_DIR / 'static' / 'generated',
+            help='Каталог для CSV-файлов.',
+        )
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=1000,
+            help='Количество отзывов; остальные таблицы растут вместе с ним.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора: одно зерно - одинаковые файлы.',
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help='Показатель закона Ципфа для популярности произведений.',
+        )
+
+    def handle(self, **options):
+        if options['reviews'] < 1:
+            raise CommandError('--reviews должен быть больше нуля.')
+        if options['skew'] < 0:
+            raise CommandError('--skew не может быть отрицательным.')
+        path = settings.BASE_DIR / Path(options['path'])
+        sizes = generate(
+            path, options['reviews'], options['seed'], options['skew']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Сгенерировано в {path}: ' + ', '.join(
+                f'{name} {count}' for name, count in sizes.items()
+            )
+        ))
+        self.stdout.write(
+            f'Загрузка: manage.py import_from_csv --path {path} --truncate'
+        )
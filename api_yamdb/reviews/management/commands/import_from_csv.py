@@ -1,88 +1,89 @@
-import csv
+import time
 
-from django.core.management.base import BaseCommand
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
 
-from ...models import (User, Category, Genre,
-                       Title, TitleGenre, Review, Comment)
+from ... import search
+from ...csv_import import CSV_FILES, CsvImporter
+from ...models import Change, Title, TitleRanking
+from ...signals import catalogue_reloaded
 
 
 class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов static/data в базу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.BASE_DIR / 'static' / 'data',
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одной пачке bulk_create.',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=None,
+            help='Количество процессов для разбора файлов; 1 - без пула.',
+        )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            '--truncate',
+            action='store_const',
+            dest='mode',
+            const=CsvImporter.TRUNCATE,
+            help='Очистить таблицы перед загрузкой.',
+        )
+        mode.add_argument(
+            '--upsert',
+            action='store_const',
+            dest='mode',
+            const=CsvImporter.UPSERT,
+            help='Обновить строки с существующими id, остальные добавить.',
+        )
+
     def handle(self, **options):
-        User.objects.all().delete()
-        Category.objects.all().delete()
-        Genre.objects.all().delete()
-        Title.objects.all().delete()
-        TitleGenre.objects.all().delete()
-        Review.objects.all().delete()
-        Comment.objects.all().delete()
-        with open(r'static\data\users.csv', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                User.objects.get_or_create(
-                    id=row[0],
-                    username=row[1],
-                    email=row[2],
-                    role=row[3],
-                )
-        with open(r'static\data\category.csv', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                Category.objects.get_or_create(
-                    id=row[0],
-                    name=row[1],
-                    slug=row[2],
-                )
-        with open(r'static\data\genre.csv', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                Genre.objects.get_or_create(
-                    id=row[0],
-                    name=row[1],
-                    slug=row[2],
-                )
-        with open(r'static\data\titles.csv', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                Title.objects.get_or_create(
-                    id=row[0],
-                    name=row[1],
-                    year=row[2],
-                    category=get_object_or_404(Category, pk=row[3])
-                )
-        with open(r'static\data\genre_title.csv', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                TitleGenre.objects.get_or_create(
-                    id=row[0],
-                    title=get_object_or_404(Title, pk=row[1]),
-                    genre=get_object_or_404(Genre, pk=row[2]),
-                )
-        with open(r'static\data\review.csv', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                Review.objects.get_or_create(
-                    id=row[0],
-                    title=get_object_or_404(Title, pk=row[1]),
-                    text=row[2],
-                    author=get_object_or_404(User, pk=row[3]),
-                    score=row[4],
-                    pub_date=row[5],
-                )
-        with open(r'static\data\comments.csv', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                Comment.objects.get_or_create(
-                    id=row[0],
-                    review=get_object_or_404(Review, pk=row[1]),
-                    text=row[2],
-                    author=get_object_or_404(User, pk=row[3]),
-                    pub_date=row[4],
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        if options['jobs'] is not None and options['jobs'] < 1:
+            raise CommandError('--jobs должен быть больше нуля.')
+        path = settings.BASE_DIR / options['path']
+        importer = CsvImporter(
+            batch_size=options['batch_size'],
+            mode=options['mode'] or CsvImporter.INSERT,
+            stdout=self.stdout,
+            progress=options['verbosity'] > 1,
+        )
+        started = time.monotonic()
+        if importer.mode == CsvImporter.TRUNCATE:
+            importer.truncate(model for _, model in CSV_FILES)
+        try:
+            if options['jobs'] == 1:
+                total = sum(
+                    importer.import_file(path / filename, model)[0]
+                    for filename, model in CSV_FILES
                 )
+            else:
+                total = importer.import_files(path, jobs=options['jobs'])
+        except IntegrityError as error:
+            raise CommandError(
+                f'{error}. Используйте --truncate или --upsert '
+                'для повторной загрузки.'
+            )
+        # bulk_create не вызывает сигналы, индекс и рейтинговые списки
+        # собираются целиком, клиенты синхронизации загружают всё заново,
+        # а кэш ответов каталога сбрасывается.
+        search.rebuild()
+        TitleRanking.objects.rebuild()
+        Change.objects.log_reset()
+        catalogue_reloaded.send(sender=Title)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {total} строк за {elapsed:.2f} с '
+            f'({total / max(elapsed, 1e-6):.0f} строк/с).'
+        ))
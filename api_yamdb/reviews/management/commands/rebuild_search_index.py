@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ... import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковый индекс произведений, жанров, категорий.'
+
+    def handle(self, **options):
+        if not search.is_supported():
+            self.stdout.write('Индекс FTS5 доступен только для SQLite.')
+            return
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс пересобран.'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Title, TitleRanking
+from ...signals import catalogue_reloaded
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает количество отзывов, сумму оценок, рейтинг '
+        'и рейтинговые списки.'
+    )
+
+    def handle(self, **options):
+        updated = Title.objects.recalculate_ratings()
+        TitleRanking.objects.rebuild()
+        catalogue_reloaded.send(sender=Title)
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинг пересчитан для {updated} произв.')
+        )
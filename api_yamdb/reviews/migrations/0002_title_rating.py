@@ -0,0 +1,47 @@
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    db_alias = schema_editor.connection.alias
+    reviews = Review.objects.using(db_alias).filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    Title.objects.using(db_alias).update(
+        reviews_count=Coalesce(Subquery(
+            reviews.annotate(value=Count('pk')).values('value')
+        ), 0),
+        score_sum=Coalesce(Subquery(
+            reviews.annotate(value=Sum('score')).values('value')
+        ), 0),
+        rating=Subquery(reviews.annotate(value=Avg('score')).values('value')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='reviews_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# Снимок схемы индекса на момент миграции: reviews.search может меняться.
+CREATE_INDEX = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_search USING fts5('
+    'name, description, extra, '
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_search_vocab '
+    "USING fts5vocab(reviews_search, 'row')",
+)
+
+# rowid = id * 4 + вид: 0 - произведение, 1 - жанр, 2 - категория.
+FILL_INDEX = (
+    'INSERT INTO reviews_search (rowid, name, description, extra) '
+    "SELECT id * 4 + 1, name, '', '' FROM reviews_genre",
+    'INSERT INTO reviews_search (rowid, name, description, extra) '
+    "SELECT id * 4 + 2, name, '', '' FROM reviews_category",
+    'INSERT INTO reviews_search (rowid, name, description, extra) '
+    'SELECT t.id * 4, t.name, t.description, '
+    "trim(coalesce(c.name, '') || ' ' || coalesce(("
+    "SELECT group_concat(g.name, ' ') FROM reviews_title_genre tg "
+    'JOIN reviews_genre g ON g.id = tg.genre_id '
+    "WHERE tg.title_id = t.id), '')) "
+    'FROM reviews_title t LEFT JOIN reviews_category c '
+    'ON c.id = t.category_id',
+)
+
+DROP_INDEX = (
+    'DROP TABLE IF EXISTS reviews_search_vocab',
+    'DROP TABLE IF EXISTS reviews_search',
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_INDEX + FILL_INDEX:
+        schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_review_comment_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
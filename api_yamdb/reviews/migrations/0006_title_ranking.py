@@ -0,0 +1,71 @@
+# Generated by Django 3.2 on 2026-10-18 18:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Снимок TitleRanking.objects.rebuild() на момент миграции.
+INSERT_RANKING = (
+    'INSERT INTO reviews_titleranking '
+    '(title_id, reviews_count, rating, weighted_rating, kind, value) '
+    'SELECT t.id, t.reviews_count, t.rating, '
+    '(%s * %s + t.score_sum) * 1.0 / (%s + t.reviews_count), %s, {value} '
+    'FROM reviews_title t {join}'
+)
+SCOPES = (
+    ('all', '0', ''),
+    ('year', 't.year', ''),
+    ('category', 't.category_id', 'WHERE t.category_id IS NOT NULL'),
+    ('genre', 'tg.genre_id',
+     'JOIN reviews_title_genre tg ON tg.title_id = t.id'),
+)
+
+
+def build_rankings(apps, schema_editor):
+    mean = settings.LEADERBOARD_PRIOR_MEAN
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    for kind, value, join in SCOPES:
+        schema_editor.execute(
+            INSERT_RANKING.format(value=value, join=join),
+            [mean, weight, weight, kind],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('all', 'Все произведения'), ('year', 'Год'), ('category', 'Категория'), ('genre', 'Жанр')], max_length=16, verbose_name='Список')),
+                ('value', models.IntegerField(default=0, verbose_name='Год или id категории, жанра')),
+                ('reviews_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+                ('rating', models.FloatField(null=True, verbose_name='Рейтинг')),
+                ('weighted_rating', models.FloatField(verbose_name='Байесовский рейтинг')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинговые списки',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['kind', 'value', '-rating', 'title'], name='ranking_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['kind', 'value', '-weighted_rating', 'title'], name='ranking_weighted_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(fields=('title', 'kind', 'value'), name='unique_ranking'),
+        ),
+        migrations.RunPython(build_rankings, migrations.RunPython.noop),
+    ]
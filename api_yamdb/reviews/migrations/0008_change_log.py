@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('created', 'Создан'), ('updated', 'Изменён'), ('deleted', 'Удалён'), ('reset', 'Массовая загрузка')], max_length=16, verbose_name='Действие')),
+                ('model', models.CharField(blank=True, max_length=32, verbose_name='Модель')),
+                ('object_id', models.PositiveBigIntegerField(default=0, verbose_name='id объекта')),
+                ('slug', models.SlugField(blank=True, db_index=False, verbose_name='Slug объекта')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_score_histogram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-year'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-year'], name='title_category_year_idx'),
+        ),
+        # Связь произведений с жанрами - автоматическая модель без Meta:
+        # покрывающий индекс для выборки произведений жанра без чтения
+        # строк таблицы.
+        migrations.RunSQL(
+            'CREATE INDEX "title_genre_genre_title_idx" '
+            'ON "reviews_title_genre" ("genre_id", "title_id");',
+            'DROP INDEX "title_genre_genre_title_idx";',
+        ),
+    ]
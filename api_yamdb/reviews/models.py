@@ -1,5 +1,14 @@
+import math
+import operator
+from collections import Counter
+from functools import reduce
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import (Count, F, FloatField, Func, OuterRef,
+                              Subquery)
+from django.db.models.functions import Cast, Coalesce, NullIf
 
 from core.models import CommentsAndReviews, CategoryAndGenre
 from api_yamdb.settings import AUTH_USER_MODEL
@@ -19,7 +28,20 @@ SCORE_CHOICES = (
 
 
 class User(AbstractUser):
-    pass
+    USER = 'user'
+    MODERATOR = 'moderator'
+    ADMIN = 'admin'
+    ROLE_CHOICES = (
+        (USER, 'Пользователь'),
+        (MODERATOR, 'Модератор'),
+        (ADMIN, 'Администратор'),
+    )
+    role = models.CharField(
+        'Роль', max_length=16, choices=ROLE_CHOICES, default=USER
+    )
+    bio = models.TextField('Биография', blank=True)
+    # Растёт при смене роли и прав: токены со старой версией отвергаются.
+    token_version = models.PositiveIntegerField(default=1, editable=False)
 
 
 class Category(CategoryAndGenre):
@@ -38,6 +60,115 @@ class Genre(CategoryAndGenre):
         verbose_name_plural = 'Жанры'
 
 
+SCORES = tuple(score for score, _ in SCORE_CHOICES)
+
+
+def score_field(score):
+    """Поле произведения с числом отзывов с оценкой score."""
+    return f'score_{score}'
+
+
+def get_counters(buckets):
+    """
+    Счётчики отзывов и рейтинг из выражений корзин гистограммы.
+    Гистограмма - единственный источник: остальные поля выводятся из неё
+    в том же UPDATE.
+    """
+    reviews_count = reduce(operator.add, buckets.values())
+    score_sum = reduce(operator.add, (
+        bucket * score for score, bucket in buckets.items()
+    ))
+    return {
+        'reviews_count': reviews_count,
+        'score_sum': score_sum,
+        'rating': Cast(score_sum, FloatField()) / NullIf(reviews_count, 0),
+    }
+
+
+def score_at(histogram, position):
+    """Оценка на месте position (с нуля) среди упорядоченных оценок."""
+    for score in SCORES:
+        position -= histogram[score]
+        if position < 0:
+            return score
+    raise IndexError(position)
+
+
+def get_score_stats(histogram, percentiles=(10, 25, 75, 90)):
+    """
+    Число отзывов, среднее, медиана и процентили (по ближайшему рангу)
+    по гистограмме: время не зависит от числа отзывов.
+    """
+    count = sum(histogram.values())
+    stats = {
+        'count': count,
+        'mean': None,
+        'median': None,
+        'percentiles': dict.fromkeys(
+            (f'p{percent}' for percent in percentiles), None
+        ),
+        'histogram': {str(score): histogram[score] for score in SCORES},
+    }
+    if not count:
+        return stats
+    stats['mean'] = sum(
+        score * number for score, number in histogram.items()
+    ) / count
+    stats['median'] = (
+        score_at(histogram, (count - 1) // 2)
+        + score_at(histogram, count // 2)
+    ) / 2
+    for percent in percentiles:
+        rank = max(math.ceil(percent * count / 100), 1)
+        stats['percentiles'][f'p{percent}'] = score_at(histogram, rank - 1)
+    return stats
+
+
+class TitleQuerySet(models.QuerySet):
+    """Операции над гистограммой оценок и рейтингом произведений."""
+
+    def shift_scores(self, added=None, removed=None):
+        """
+        Атомарно добавляет оценку added и убирает оценку removed
+        одним UPDATE без чтения строки; рейтинг пересчитывается
+        из гистограммы в том же запросе.
+        """
+        deltas = Counter()
+        if added is not None:
+            deltas[added] += 1
+        if removed is not None:
+            deltas[removed] -= 1
+        changed = {score: delta for score, delta in deltas.items() if delta}
+        if not changed:
+            return 0
+        buckets = {
+            score: F(score_field(score)) + changed.get(score, 0)
+            for score in SCORES
+        }
+        return self.update(
+            **{score_field(score): buckets[score] for score in changed},
+            **get_counters(buckets),
+        )
+
+    def recalculate_ratings(self):
+        """Пересобирает гистограмму и рейтинг по таблице отзывов с нуля."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        with transaction.atomic():
+            self.update(**{
+                score_field(score): Coalesce(Subquery(
+                    reviews.filter(score=score).annotate(
+                        value=Count('pk')
+                    ).values('value')
+                ), 0)
+                for score in SCORES
+            })
+            return self.update(**get_counters({
+                score: F(score_field(score)) for score in SCORES
+            }))
+
+
 class Title(models.Model):
     """Содержит данные о произведениях."""
     name = models.CharField('Название', max_length=256)
@@ -57,15 +188,57 @@ class Title(models.Model):
         blank=True,
         related_name='titles'
     )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0, editable=False
+    )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг', null=True, blank=True, editable=False
+    )
+    # Гистограмма оценок: число отзывов с каждой оценкой из SCORE_CHOICES.
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0,
+                                          editable=False)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0,
+                                          editable=False)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0,
+                                          editable=False)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0,
+                                          editable=False)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0,
+                                          editable=False)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0,
+                                          editable=False)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0,
+                                          editable=False)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0,
+                                          editable=False)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0,
+                                          editable=False)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0,
+                                           editable=False)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year',)
+        indexes = [
+            models.Index(fields=['-year'], name='title_year_idx'),
+            models.Index(
+                fields=['category', '-year'], name='title_category_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def histogram(self):
+        return {score: getattr(self, score_field(score)) for score in SCORES}
+
 
 # class TitleGenre(models.Model):
 #     """Служит для обеспечения связей многие-ко-многим."""
@@ -89,6 +262,9 @@ class Review(CommentsAndReviews):
         on_delete=models.CASCADE,
         related_name='reviews'
     )
+    version = models.PositiveIntegerField(
+        'Версия', default=1, editable=False
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
@@ -98,6 +274,189 @@ class Review(CommentsAndReviews):
                 fields=['author', 'title'], name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            )
+        ]
+
+    def save(self, *args, **kwargs):
+        # Сохранение отзыва и сдвиг рейтинга в сигналах - одна транзакция.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+def weighted_rating(score_sum, reviews_count):
+    """
+    Байесовское среднее: оценка тянется к априорному среднему, пока
+    отзывов мало, поэтому одна десятка не выводит произведение в лидеры.
+    """
+    mean = settings.LEADERBOARD_PRIOR_MEAN
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    return (mean * weight + score_sum) / (weight + reviews_count)
+
+
+class TitleRankingQuerySet(models.QuerySet):
+    """Поддержка предрассчитанных рейтинговых списков."""
+
+    def sync(self, title):
+        """Пересоздаёт записи произведения во всех списках."""
+        self.filter(title=title).delete()
+        scopes = [(TitleRanking.ALL, 0), (TitleRanking.YEAR, title.year)]
+        if title.category_id is not None:
+            scopes.append((TitleRanking.CATEGORY, title.category_id))
+        scopes.extend(
+            (TitleRanking.GENRE, genre_id)
+            for genre_id in title.genre.values_list('pk', flat=True)
+        )
+        counters = Title.objects.filter(pk=title.pk).values_list(
+            'reviews_count', 'score_sum', 'rating'
+        ).first()
+        if counters is None:
+            return
+        reviews_count, score_sum, rating = counters
+        self.bulk_create(
+            TitleRanking(
+                title=title, kind=kind, value=value,
+                reviews_count=reviews_count, rating=rating,
+                weighted_rating=weighted_rating(score_sum, reviews_count),
+            )
+            for kind, value in scopes
+        )
+
+    def refresh(self, *title_ids):
+        """Переносит в списки свежие счётчики отзывов произведений."""
+        counters = Title.objects.filter(pk__in=title_ids).values_list(
+            'pk', 'reviews_count', 'score_sum', 'rating'
+        )
+        for title_id, reviews_count, score_sum, rating in counters:
+            self.filter(title_id=title_id).update(
+                reviews_count=reviews_count,
+                rating=rating,
+                weighted_rating=weighted_rating(score_sum, reviews_count),
+            )
+
+    def rebuild(self):
+        """
+        Пересобирает все списки из счётчиков произведений. Удаление и
+        вставка идут в одной транзакции: читатели не видят пустых списков.
+        """
+        qn = connections[self.db].ops.quote_name
+        title = qn(Title._meta.db_table)
+        through = Title.genre.through._meta
+        scores = (
+            't.id, t.reviews_count, t.rating, '
+            '(%s * %s + t.score_sum) * 1.0 / (%s + t.reviews_count)'
+        )
+        scopes = (
+            (self.model.ALL, '0', ''),
+            (self.model.YEAR, 't.year', ''),
+            (self.model.CATEGORY, 't.category_id',
+             'WHERE t.category_id IS NOT NULL'),
+        )
+        mean = settings.LEADERBOARD_PRIOR_MEAN
+        weight = settings.LEADERBOARD_PRIOR_WEIGHT
+        columns = ', '.join(qn(name) for name in (
+            'title_id', 'reviews_count', 'rating', 'weighted_rating',
+            'kind', 'value',
+        ))
+        insert = f'INSERT INTO {qn(self.model._meta.db_table)} ({columns}) '
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            with connections[self.db].cursor() as cursor:
+                for kind, value, where in scopes:
+                    cursor.execute(
+                        f'{insert} SELECT {scores}, %s, {value} '
+                        f'FROM {title} t {where}',
+                        [mean, weight, weight, kind],
+                    )
+                cursor.execute(
+                    f'{insert} SELECT {scores}, %s, tg.{qn("genre_id")} '
+                    f'FROM {title} t JOIN {qn(through.db_table)} tg '
+                    f'ON tg.{qn("title_id")} = t.id',
+                    [mean, weight, weight, self.model.GENRE],
+                )
+
+    def top(self, limit, min_reviews=1, weighted=False,
+            category=None, genre=None, year=None):
+        """
+        Возвращает id лучших произведений. Самый узкий из заданных
+        списков читается по индексу, остальные условия - фильтр.
+        """
+        queryset = self.filter(reviews_count__gte=min_reviews)
+        if genre is not None:
+            queryset = queryset.filter(
+                kind=TitleRanking.GENRE,
+                value=models.Subquery(
+                    Genre.objects.filter(slug=genre).values('pk')
+                ),
+            )
+        elif category is not None:
+            queryset = queryset.filter(
+                kind=TitleRanking.CATEGORY,
+                value=models.Subquery(
+                    Category.objects.filter(slug=category).values('pk')
+                ),
+            )
+        elif year is not None:
+            queryset = queryset.filter(kind=TitleRanking.YEAR, value=year)
+        else:
+            queryset = queryset.filter(kind=TitleRanking.ALL)
+        if genre is not None and category is not None:
+            queryset = queryset.filter(title__category__slug=category)
+        if year is not None and (genre or category) is not None:
+            queryset = queryset.filter(title__year=year)
+        order = '-weighted_rating' if weighted else '-rating'
+        return list(queryset.order_by(order, 'title').values_list(
+            'title_id', flat=True
+        )[:limit])
+
+
+class TitleRanking(models.Model):
+    """Место произведения в рейтинговом списке: общем, по году,
+    по категории или по жанру."""
+    ALL = 'all'
+    YEAR = 'year'
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    KIND_CHOICES = (
+        (ALL, 'Все произведения'),
+        (YEAR, 'Год'),
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings'
+    )
+    kind = models.CharField('Список', max_length=16, choices=KIND_CHOICES)
+    value = models.IntegerField('Год или id категории, жанра', default=0)
+    reviews_count = models.PositiveIntegerField('Количество отзывов')
+    rating = models.FloatField('Рейтинг', null=True)
+    weighted_rating = models.FloatField('Байесовский рейтинг')
+
+    objects = TitleRankingQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинговые списки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'kind', 'value'], name='unique_ranking'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['kind', 'value', '-rating', 'title'],
+                name='ranking_rating_idx'
+            ),
+            models.Index(
+                fields=['kind', 'value', '-weighted_rating', 'title'],
+                name='ranking_weighted_idx'
+            ),
+        ]
 
 
 class Comments(models.Model):
@@ -120,6 +479,79 @@ class Comments(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    version = models.PositiveIntegerField(
+        'Версия', default=1, editable=False
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
 
     def __str__(self):
         return self.text
+
+
+class ChangeQuerySet(models.QuerySet):
+
+    def log(self, action, model, *objects):
+        """Записывает одно действие над объектами модели."""
+        self.bulk_create(
+            Change(action=action, model=model._meta.model_name,
+                   object_id=obj.pk, slug=getattr(obj, 'slug', ''))
+            for obj in objects
+        )
+
+    def log_ids(self, action, model, *ids):
+        self.bulk_create(
+            Change(action=action, model=model._meta.model_name, object_id=pk)
+            for pk in ids
+        )
+
+    def last_id(self):
+        """
+        Подзапрос с id последней записи журнала. MAX(id) SQLite читает
+        с конца первичного ключа, не сканируя таблицу.
+        """
+        return Subquery(self.model.objects.order_by().values(
+            last=Func(F('id'), function='MAX')
+        ))
+
+    def log_reset(self):
+        """Отмечает массовую загрузку: клиентам нужна полная выгрузка."""
+        return self.create(action=Change.RESET)
+
+
+class Change(models.Model):
+    """
+    Запись журнала изменений для синхронизации клиентов. Журнал только
+    дополняется, id записи служит токеном синхронизации.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    RESET = 'reset'
+    ACTION_CHOICES = (
+        (CREATED, 'Создан'),
+        (UPDATED, 'Изменён'),
+        (DELETED, 'Удалён'),
+        (RESET, 'Массовая загрузка'),
+    )
+    id = models.BigAutoField(primary_key=True)
+    action = models.CharField('Действие', max_length=16,
+                              choices=ACTION_CHOICES)
+    model = models.CharField('Модель', max_length=32, blank=True)
+    object_id = models.PositiveBigIntegerField('id объекта', default=0)
+    # Жанры и категории адресуются в API по slug, а не по id.
+    slug = models.SlugField('Slug объекта', blank=True, db_index=False)
+    created = models.DateTimeField('Время изменения', auto_now_add=True)
+
+    objects = ChangeQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ('id',)
@@ -0,0 +1,183 @@
+import difflib
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Category, Genre, Title
+
+INDEX_TABLE = 'reviews_search'
+VOCABULARY_TABLE = 'reviews_search_vocab'
+
+# Один индекс на произведения, жанры и категории: rowid = id * 4 + вид.
+KINDS = {Title: 0, Genre: 1, Category: 2}
+KINDS_COUNT = 4
+
+# Колонки индекса и их веса для bm25.
+COLUMNS = ('name', 'description', 'extra')
+WEIGHTS = (10.0, 1.0, 3.0)
+TYPO_CUTOFF = 0.75
+TYPO_CANDIDATES = 3
+# Опечатки ищутся среди слов на ту же букву и почти той же длины,
+# и не больше TYPO_SCAN_LIMIT слов из словаря за запрос.
+TYPO_MIN_LENGTH = 3
+TYPO_LENGTH_DELTA = 2
+TYPO_SCAN_LIMIT = 500
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def is_supported():
+    """Индекс FTS5 есть только в SQLite, для остальных баз - icontains."""
+    return connection.vendor == 'sqlite'
+
+
+def get_rowid(model, pk):
+    return pk * KINDS_COUNT + KINDS[model]
+
+
+def get_document(model, pk):
+    """Текст объекта для индекса: name, description, extra."""
+    if model is not Title:
+        name = model.objects.filter(pk=pk).values_list(
+            'name', flat=True
+        ).first()
+        return None if name is None else (name, '', '')
+    title = Title.objects.filter(pk=pk).values(
+        'name', 'description', 'category__name'
+    ).first()
+    if title is None:
+        return None
+    genres = Genre.objects.filter(titles=pk).values_list('name', flat=True)
+    extra = ' '.join([title['category__name'] or '', *genres]).strip()
+    return title['name'], title['description'], extra
+
+
+def reindex(model, *pks):
+    """Обновляет записи индекса; удалённые объекты из него убираются."""
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        for pk in pks:
+            rowid = get_rowid(model, pk)
+            cursor.execute(
+                f'DELETE FROM {INDEX_TABLE} WHERE rowid = %s', [rowid]
+            )
+            document = get_document(model, pk)
+            if document is not None:
+                cursor.execute(
+                    f'INSERT INTO {INDEX_TABLE} '
+                    '(rowid, name, description, extra) '
+                    'VALUES (%s, %s, %s, %s)',
+                    [rowid, *document],
+                )
+
+
+def rebuild():
+    """Пересобирает индекс целиком несколькими INSERT ... SELECT."""
+    if not is_supported():
+        return
+    qn = connection.ops.quote_name
+    title = qn(Title._meta.db_table)
+    category = qn(Category._meta.db_table)
+    genre = qn(Genre._meta.db_table)
+    through = Title.genre.through._meta
+    title_genre = qn(through.db_table)
+    title_id = qn(through.get_field('title').column)
+    genre_id = qn(through.get_field('genre').column)
+    insert = f'INSERT INTO {INDEX_TABLE} (rowid, name, description, extra) '
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+        for model in (Genre, Category):
+            cursor.execute(
+                f"{insert} SELECT id * {KINDS_COUNT} + {KINDS[model]}, "
+                f"name, '', '' FROM {qn(model._meta.db_table)}"
+            )
+        cursor.execute(
+            f"{insert} SELECT t.id * {KINDS_COUNT} + {KINDS[Title]}, "
+            "t.name, t.description, "
+            "trim(coalesce(c.name, '') || ' ' || coalesce(("
+            f"SELECT group_concat(g.name, ' ') FROM {title_genre} tg "
+            f"JOIN {genre} g ON g.id = tg.{genre_id} "
+            f"WHERE tg.{title_id} = t.id), '')) "
+            f"FROM {title} t LEFT JOIN {category} c ON c.id = t.category_id"
+        )
+
+
+def quote(term):
+    return '"{}"'.format(term.replace('"', '""'))
+
+
+def expand_term(cursor, term):
+    """
+    Термин ищется по префиксу. Если в словаре индекса нет слов с таким
+    префиксом, берутся похожие слова на ту же букву - это опечатки.
+    """
+    cursor.execute(
+        f'SELECT term FROM {VOCABULARY_TABLE} '
+        'WHERE term >= %s AND term < %s LIMIT 1',
+        [term, term + '\uffff'],
+    )
+    if cursor.fetchone() is not None or len(term) < TYPO_MIN_LENGTH:
+        return f'{quote(term)}*'
+    cursor.execute(
+        f'SELECT term FROM {VOCABULARY_TABLE} '
+        'WHERE term >= %s AND term < %s '
+        'AND length(term) BETWEEN %s AND %s LIMIT %s',
+        [term[0], term[0] + '\uffff', len(term) - TYPO_LENGTH_DELTA,
+         len(term) + TYPO_LENGTH_DELTA, TYPO_SCAN_LIMIT],
+    )
+    candidates = difflib.get_close_matches(
+        term, [row[0] for row in cursor.fetchall()],
+        n=TYPO_CANDIDATES, cutoff=TYPO_CUTOFF,
+    )
+    if not candidates:
+        return f'{quote(term)}*'
+    return '({})'.format(' OR '.join(map(quote, candidates)))
+
+
+def build_match(text, fields=COLUMNS):
+    """Запрос MATCH: каждое слово ищется только в колонках fields."""
+    terms = WORD_PATTERN.findall(text.lower())
+    if not terms:
+        return None
+    columns = ' '.join(field for field in fields if field in COLUMNS)
+    prefix = f'{{{columns}}} : ' if columns else ''
+    with connection.cursor() as cursor:
+        return ' AND '.join(
+            prefix + expand_term(cursor, term) for term in terms
+        )
+
+
+def search(queryset, text, fields=('name',)):
+    """
+    Фильтрует queryset по словам в полях fields и сортирует
+    по релевантности. В индексе поиск ограничен одноимёнными колонками,
+    без FTS5 - icontains по тем же полям.
+    """
+    model = queryset.model
+    if not is_supported():
+        for term in WORD_PATTERN.findall(text):
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+    match = build_match(text, fields)
+    if match is None:
+        return queryset
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    weights = ', '.join(map(str, WEIGHTS))
+    # Индекс присоединяется один раз: MATCH выполняется в нём, а строка
+    # модели находится по первичному ключу, вычисленному из rowid.
+    return queryset.extra(
+        tables=[INDEX_TABLE],
+        where=[
+            f'{INDEX_TABLE} MATCH %s',
+            f'{table}.{pk} = {INDEX_TABLE}.rowid / {KINDS_COUNT}',
+            f'{INDEX_TABLE}.rowid %% {KINDS_COUNT} = {KINDS[model]}',
+        ],
+        params=[match],
+        select={'search_rank': f'bm25({INDEX_TABLE}, {weights})'},
+    ).order_by('search_rank')
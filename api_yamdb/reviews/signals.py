@@ -0,0 +1,217 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import Signal, receiver
+
+from . import search
+from .models import (Category, Change, Comments, Genre, Review, Title,
+                     TitleRanking, User)
+
+# Каталог переписан массово, в обход сигналов моделей: загрузка CSV,
+# пересчёт рейтингов.
+catalogue_reloaded = Signal()
+
+
+@receiver(pre_save, sender=Review)
+@receiver(pre_save, sender=Comments)
+def bump_version(sender, instance, **kwargs):
+    """Увеличивает версию при каждом редактировании объекта."""
+    if not instance._state.adding:
+        instance.version += 1
+
+
+@receiver(pre_save, sender=User)
+def bump_token_version(sender, instance, **kwargs):
+    """Смена роли, прав или блокировка отзывает выданные токены."""
+    if instance._state.adding:
+        return
+    fields = ('role', 'is_superuser', 'is_staff', 'is_active')
+    users = User.objects.filter(pk=instance.pk)
+    previous = users.values_list(*fields, 'token_version').first()
+    if previous is None or previous[:-1] == tuple(
+        getattr(instance, name) for name in fields
+    ):
+        return
+    # Пишется сразу: save(update_fields=...) может не сохранить версию.
+    instance.token_version = previous[-1] + 1
+    users.update(token_version=instance.token_version)
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, **kwargs):
+    """Запоминает оценку и произведение отзыва до редактирования."""
+    instance._previous_score = None
+    if instance.pk is not None:
+        instance._previous_score = Review.objects.select_for_update().filter(
+            pk=instance.pk
+        ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, **kwargs):
+    """Переносит оценку в гистограмме произведения при записи отзыва."""
+    previous = getattr(instance, '_previous_score', None)
+    if previous is None:
+        Title.objects.filter(pk=instance.title_id).shift_scores(
+            added=instance.score
+        )
+        return
+    title_id, score = previous
+    if title_id == instance.title_id:
+        Title.objects.filter(pk=title_id).shift_scores(
+            added=instance.score, removed=score
+        )
+        return
+    Title.objects.filter(pk=title_id).shift_scores(removed=score)
+    Title.objects.filter(pk=instance.title_id).shift_scores(
+        added=instance.score
+    )
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва из гистограммы произведения."""
+    Title.objects.filter(pk=instance.title_id).shift_scores(
+        removed=instance.score
+    )
+
+
+def get_rated_title_ids(review):
+    """Произведения, рейтинг которых сдвинул отзыв."""
+    title_ids = {review.title_id}
+    previous = getattr(review, '_previous_score', None)
+    if previous is not None:
+        title_ids.add(previous[0])
+    return title_ids
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def refresh_rankings(sender, instance, **kwargs):
+    """Переносит сдвинутый рейтинг в рейтинговые списки."""
+    TitleRanking.objects.refresh(*get_rated_title_ids(instance))
+
+
+@receiver(post_save, sender=Title)
+def sync_title_rankings(sender, instance, **kwargs):
+    TitleRanking.objects.sync(instance)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def sync_genre_rankings(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        TitleRanking.objects.sync(instance)
+        return
+    if pk_set is None:
+        TitleRanking.objects.filter(
+            kind=TitleRanking.GENRE, value=instance.pk
+        ).delete()
+        return
+    for title in Title.objects.filter(pk__in=pk_set):
+        TitleRanking.objects.sync(title)
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def drop_rankings(sender, instance, **kwargs):
+    """Связи удаляются без сигналов, списки чистятся отдельно."""
+    kind = TitleRanking.GENRE if sender is Genre else TitleRanking.CATEGORY
+    TitleRanking.objects.filter(kind=kind, value=instance.pk).delete()
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def reindex_title(sender, instance, **kwargs):
+    search.reindex(Title, instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def reindex_title_genres(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        search.reindex(Title, instance.pk)
+    elif pk_set is not None:
+        search.reindex(Title, *pk_set)
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Category)
+def remember_indexed_titles(sender, instance, **kwargs):
+    """Запоминает произведения, в тексте которых есть удаляемое имя."""
+    instance._indexed_titles = list(
+        instance.titles.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def reindex_genre_or_category(sender, instance, **kwargs):
+    search.reindex(sender, instance.pk)
+    titles = getattr(instance, '_indexed_titles', None)
+    if titles is None:
+        titles = instance.titles.values_list('pk', flat=True)
+    search.reindex(Title, *titles)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comments)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def log_save(sender, instance, created, **kwargs):
+    action = Change.CREATED if created else Change.UPDATED
+    Change.objects.log(action, sender, instance)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comments)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def log_delete(sender, instance, **kwargs):
+    """
+    Tombstone удалённого объекта. Каскадное удаление идёт через
+    Collector и шлёт сигнал на каждый объект, поэтому комментарии
+    удалённого отзыва тоже попадают в журнал.
+    """
+    Change.objects.log(Change.DELETED, sender, instance)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def log_rating_change(sender, instance, **kwargs):
+    """Рейтинг входит в представление произведения."""
+    Change.objects.log_ids(
+        Change.UPDATED, Title, *get_rated_title_ids(instance)
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def log_genre_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._cleared_titles = list(
+            instance.titles.values_list('pk', flat=True)
+        )
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        Change.objects.log(Change.UPDATED, Title, instance)
+        return
+    if pk_set is None:
+        pk_set = getattr(instance, '_cleared_titles', ())
+    Change.objects.log_ids(Change.UPDATED, Title, *pk_set)
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def log_detached_titles(sender, instance, **kwargs):
+    """Связи с произведениями удаляются без сигналов."""
+    Change.objects.log_ids(
+        Change.UPDATED, Title, *getattr(instance, '_indexed_titles', ())
+    )
@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title
+
+
+def create_catalogue(size):
+    category, _ = Category.objects.get_or_create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.get_or_create(name='Драма', slug='drama')[0],
+        Genre.objects.get_or_create(name='Комедия', slug='comedy')[0],
+    ]
+    titles = []
+    for _ in range(size):
+        title = Title.objects.create(
+            name='Произведение', year=1990, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_titles_list_queries_do_not_grow(self, client):
+        create_catalogue(2)
+        small_page = count_queries(client, self.TITLES_URL)
+        create_catalogue(20)
+        large_page = count_queries(client, self.TITLES_URL)
+        assert small_page == large_page, (
+            f'Проверьте, что число SQL-запросов при GET-запросе к '
+            f'`{self.TITLES_URL}` не зависит от количества произведений: '
+            f'{small_page} запросов для 2 объектов и {large_page} для 22.'
+        )
+
+    def test_02_reviews_list_queries_do_not_grow(self, client,
+                                                 django_user_model):
+        title = create_catalogue(1)[0]
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        for idx in range(2):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+        small_page = count_queries(client, url)
+        for idx in range(2, 22):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+        large_page = count_queries(client, url)
+        assert small_page == large_page, (
+            f'Проверьте, что число SQL-запросов при GET-запросе к '
+            f'`{self.REVIEWS_URL_TEMPLATE}` не зависит от количества '
+            f'отзывов: {small_page} запросов для 2 объектов и '
+            f'{large_page} для 22.'
+        )
@@ -0,0 +1,41 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comments, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09ImportCsv:
+
+    def get_state(self):
+        return (
+            Title.objects.count(),
+            Title.genre.through.objects.count(),
+            Review.objects.count(),
+            Comments.objects.count(),
+            list(Title.objects.order_by('pk').values_list(
+                'reviews_count', 'score_sum', 'rating'
+            )),
+        )
+
+    def test_01_parallel_import_matches_sequential(self):
+        call_command('import_from_csv', '--jobs', '1')
+        sequential = self.get_state()
+        assert sequential[2] > 0, (
+            'Проверьте, что команда `import_from_csv` загружает отзывы '
+            'из `static/data/review.csv`.'
+        )
+        call_command('import_from_csv', '--truncate', '--jobs', '2')
+        assert self.get_state() == sequential, (
+            'Проверьте, что параллельная загрузка даёт тот же результат, '
+            'что и последовательная.'
+        )
+
+    def test_02_upsert_is_idempotent(self):
+        call_command('import_from_csv', '--jobs', '1')
+        loaded = self.get_state()
+        call_command('import_from_csv', '--upsert', '--batch-size', '7')
+        assert self.get_state() == loaded, (
+            'Проверьте, что повторная загрузка с `--upsert` не создаёт '
+            'дубликатов и не меняет рейтинг.'
+        )
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comments, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_reviews(self, django_user_model, title, start, stop):
+        for idx in range(start, stop):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'Отзыв {idx}', score=5
+            )
+
+    def walk(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` с параметром `cursor` '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            ids.extend(review['id'] for review in data['results'])
+            url = data['next']
+        return ids
+
+    def test_01_cursor_walks_all_reviews_once(self, client,
+                                              django_user_model):
+        title = Title.objects.create(name='Произведение', year=1990)
+        self.create_reviews(django_user_model, title, 0, 12)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(f'{url}?cursor=&limit=5')
+        data = response.json()
+        assert 'count' not in data and len(data['results']) == 5, (
+            'Проверьте, что при параметре `cursor` отзывы выводятся '
+            'страницами по ключу, без подсчёта общего количества.'
+        )
+        first_page = [review['id'] for review in data['results']]
+        self.create_reviews(django_user_model, title, 12, 15)
+        rest = self.walk(client, data['next'])
+        expected = list(Review.objects.filter(
+            pk__lte=first_page[0]
+        ).order_by('-pub_date', '-id').values_list('id', flat=True))
+        assert first_page + rest == expected, (
+            'Проверьте, что новые отзывы не сдвигают страницы, '
+            'уже выданные по курсору.'
+        )
+
+    def test_02_previous_link_and_limit_offset(self, client,
+                                               django_user_model):
+        title = Title.objects.create(name='Произведение', year=1990)
+        self.create_reviews(django_user_model, title, 0, 6)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        first = client.get(f'{url}?cursor=&limit=2').json()
+        second = client.get(first['next']).json()
+        previous = client.get(second['previous']).json()
+        assert previous['results'] == first['results'], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую '
+            'страницу отзывов.'
+        )
+        response = client.get(f'{url}?limit=2&offset=2')
+        assert response.json()['count'] == 6, (
+            'Проверьте, что пагинация limit/offset по-прежнему доступна.'
+        )
+        response = client.get(f'{url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что неверный курсор возвращает ответ со статусом 404.'
+        )
+
+    def test_03_limit_offset_is_ordered(self, client, user):
+        title = Title.objects.create(name='Произведение', year=1990)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        for idx in range(5):
+            Comments.objects.create(
+                review=review, author=user, text=f'Комментарий {idx}'
+            )
+        url = (f'/api/v1/titles/{title.id}/reviews/{review.id}'
+               '/comments/?limit=2&offset={offset}')
+        ids = [
+            comment['id']
+            for offset in (0, 2, 4)
+            for comment in client.get(url.format(offset=offset)).json()[
+                'results'
+            ]
+        ]
+        assert ids == list(Comments.objects.order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True)), (
+            'Проверьте, что страницы limit/offset сортируются по ключу '
+            'курсора (pub_date, id).'
+        )
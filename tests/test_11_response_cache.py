@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+
+from api.cache import get_generation
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_repeated_get_is_served_from_cache(self, client):
+        Title.objects.create(name='Произведение', year=1990)
+        first = client.get(f'{self.TITLES_URL}?year=1990&name=П')
+        second = client.get(f'{self.TITLES_URL}?name=П&year=1990')
+        assert first['X-Cache'] == 'MISS' and second['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{self.TITLES_URL}` '
+            'с теми же параметрами в другом порядке отдаётся из кэша.'
+        )
+        assert first.json() == second.json(), (
+            'Проверьте, что ответ из кэша совпадает с исходным.'
+        )
+
+    def test_02_changes_invalidate_cached_titles(self, client,
+                                                 django_user_model):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Произведение', year=1990, category=category
+        )
+        title.genre.add(genre)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        assert client.get(url).json()['rating'] is None
+        Review.objects.create(
+            title=title, text='Отзыв', score=7,
+            author=django_user_model.objects.create_user(username='author')
+        )
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сразу меняет рейтинг в ответе, '
+            'даже если ответ был закэширован.'
+        )
+        genre.name = 'Комедия'
+        genre.save()
+        assert client.get(url).json()['genre'][0]['name'] == 'Комедия', (
+            'Проверьте, что изменение жанра сбрасывает кэш произведений.'
+        )
+        title.genre.clear()
+        assert client.get(url).json()['genre'] == [], (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш.'
+        )
+
+    def test_03_stats_require_admin(self, client, django_user_model):
+        response = client.get('/api/v1/cache/stats/')
+        assert response.status_code in (
+            HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что статистика кэша недоступна анониму.'
+        admin = django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='1234567'
+        )
+        client.force_login(admin)
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        stats = client.get('/api/v1/cache/stats/').json()
+        assert stats['titles']['hits'] >= 1, (
+            'Проверьте, что статистика кэша считает попадания.'
+        )
+
+    def test_04_generation_changes_after_commit(self):
+        generation = get_generation('titles')
+        with transaction.atomic():
+            Title.objects.create(name='Произведение', year=1990)
+            assert get_generation('titles') == generation, (
+                'Проверьте, что поколение кэша меняется только после '
+                'коммита: иначе читатель закэширует данные до коммита '
+                'под новым поколением.'
+            )
+        assert get_generation('titles') != generation
+
+    def test_05_import_invalidates_cached_titles(self, client):
+        assert client.get(self.TITLES_URL).json() == []
+        call_command('import_from_csv', '--jobs', '1')
+        assert client.get(self.TITLES_URL).json() != [], (
+            'Проверьте, что `import_from_csv` сбрасывает кэш ответов: '
+            'загрузка идёт в обход сигналов моделей.'
+        )
+
+    def test_06_recalculate_ratings_invalidates_cached_titles(
+        self, client, django_user_model
+    ):
+        title = Title.objects.create(name='Произведение', year=1990)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        assert client.get(url).json()['rating'] is None
+        # bulk_create не шлёт сигналов: рейтинг появится только после
+        # пересчёта.
+        Review.objects.bulk_create([Review(
+            title=title, text='Отзыв', score=7,
+            author=django_user_model.objects.create_user(username='author')
+        )])
+        call_command('recalculate_ratings')
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что `recalculate_ratings` сбрасывает кэш ответов.'
+        )
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import get_cache
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalRequests:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def create_review(self, django_user_model):
+        title = Title.objects.create(name='Произведение', year=1990)
+        author = django_user_model.objects.create_user(username='author')
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        )
+        return title, review
+
+    def test_01_titles_not_modified_in_one_query(self, client):
+        title = Title.objects.create(name='Произведение', year=1990)
+        response = client.get(self.TITLES_URL)
+        etag = response['ETag']
+        assert etag and response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+            'содержит заголовки `ETag` и `Last-Modified`.'
+        )
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается '
+            'ответ со статусом 304, и `ETag` не зависит от кэша процесса.'
+        )
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что ответ 304 для произведений читает только '
+            'последнюю запись журнала изменений.'
+        )
+        Title.objects.create(name='Новое произведение', year=1991)
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения каталога `ETag` меняется.'
+        )
+        title_id = title.id
+        title.delete()
+        # ETag списка и объекта строятся из одной записи журнала.
+        etag = client.get(self.TITLES_URL)['ETag']
+        response = client.get(
+            f'{self.TITLES_URL}{title_id}/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что для удалённого произведения возвращается 404, '
+            'а не 304.'
+        )
+
+    def test_02_reviews_etag_tracks_edits(self, client, django_user_model):
+        title, review = self.create_review(django_user_model)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{self.REVIEWS_URL_TEMPLATE}` '
+            'с актуальным `If-None-Match` возвращает ответ со статусом 304.'
+        )
+        review.text = 'Исправленный отзыв'
+        review.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что редактирование отзыва меняет `ETag` списка.'
+        )
+
+    def test_03_if_match_on_review_delete(self, client, django_user_model):
+        title, review = self.create_review(django_user_model)
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        etag = client.get(url)['ETag']
+        review.score = 9
+        review.save()
+        client.force_login(review.author)
+        response = client.delete(url, HTTP_IF_MATCH=etag)
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+            'Проверьте, что DELETE-запрос с устаревшим `If-Match` '
+            'возвращает ответ со статусом 412.'
+        )
+        assert Review.objects.filter(pk=review.pk).exists()
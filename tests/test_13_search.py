@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews import search
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Search:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def create_titles(self):
+        category = Category.objects.create(name='Книга', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        first = Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Тюремная драма', category=category
+        )
+        first.genre.add(drama)
+        second = Title.objects.create(
+            name='Крёстный отец', year=1972,
+            description='Побег от прошлого', category=category
+        )
+        return first, second, drama
+
+    def search_genres(self, text):
+        # Жанры и категория произведения хранятся в колонке extra.
+        return list(search.search(Title.objects.all(), text,
+                                  fields=('extra',)))
+
+    def get_names(self, client, url):
+        return [item['name'] for item in client.get(url).json()]
+
+    def test_01_title_search_is_case_insensitive_and_ranked(self, client):
+        first, second, _ = self.create_titles()
+        names = self.get_names(client, f'{self.TITLES_URL}?name=ПОБЕГ')
+        assert names == [first.name], (
+            'Проверьте, что поиск по названию не зависит от регистра и '
+            'не находит совпадения в описании.'
+        )
+        titles = search.search(Title.objects.all(), 'побег',
+                               fields=search.COLUMNS)
+        assert list(titles) == [first, second], (
+            'Проверьте, что совпадения в названии ранжируются выше '
+            'совпадений в описании.'
+        )
+
+    def test_02_prefix_and_typo(self, client):
+        first, _, _ = self.create_titles()
+        assert self.get_names(
+            client, f'{self.TITLES_URL}?name=шоуш'
+        ) == [first.name], 'Проверьте поиск произведений по префиксу слова.'
+        assert self.get_names(
+            client, f'{self.TITLES_URL}?name=шоушенко'
+        ) == [first.name], 'Проверьте, что поиск переживает опечатку.'
+
+    def test_03_index_follows_changes(self, client):
+        first, _, drama = self.create_titles()
+        drama.name = 'Трагедия'
+        drama.save()
+        assert self.search_genres('трагедия') == [first], (
+            'Проверьте, что переименование жанра обновляет поисковый индекс.'
+        )
+        first.genre.clear()
+        assert self.search_genres('трагедия') == [], (
+            'Проверьте, что изменение жанров произведения обновляет индекс.'
+        )
+        names = self.get_names(client, f'{self.GENRES_URL}?search=траг')
+        assert names == ['Трагедия'], (
+            f'Проверьте, что поиск по `{self.GENRES_URL}` использует индекс.'
+        )
+
+    def test_04_match_runs_once(self):
+        self.create_titles()
+        with CaptureQueriesContext(connection) as context:
+            list(search.search(Title.objects.all(), 'побег'))
+        sql = context.captured_queries[-1]['sql']
+        assert sql.count('MATCH') == 1, (
+            'Проверьте, что поисковый индекс присоединяется к запросу один '
+            'раз, а не подзапросом для каждой строки.'
+        )
+
+    def test_05_name_filter_ignores_genres(self, client):
+        _, second, drama = self.create_titles()
+        second.genre.add(drama)
+        assert self.get_names(client, f'{self.TITLES_URL}?name=драма') == [], (
+            'Проверьте, что фильтр `name` ищет только в названии, '
+            'а не в жанрах и категории.'
+        )
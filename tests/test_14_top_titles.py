@@ -0,0 +1,119 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError
+
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TopTitles:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    def create_reviews(self, django_user_model, title, *scores):
+        for score in scores:
+            author, _ = django_user_model.objects.get_or_create(
+                username=f'author{Review.objects.count()}'
+            )
+            Review.objects.create(
+                title=title, text='Отзыв', score=score, author=author
+            )
+
+    def test_01_top_is_ordered_by_rating(self, client, django_user_model):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        good = Title.objects.create(name='Хорошее', year=1990,
+                                    category=films)
+        best = Title.objects.create(name='Лучшее', year=1991,
+                                    category=films)
+        book = Title.objects.create(name='Книга', year=1990, category=books)
+        good.genre.add(drama)
+        book.genre.add(drama)
+        self.create_reviews(django_user_model, good, 7, 8)
+        self.create_reviews(django_user_model, best, 10)
+        self.create_reviews(django_user_model, book, 9, 9)
+        Title.objects.create(name='Без отзывов', year=1990, category=films)
+
+        response = client.get(self.TOP_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.TOP_URL}` доступен без авторизации.'
+        )
+        assert [title['id'] for title in response.json()] == [
+            best.id, book.id, good.id
+        ], (
+            'Проверьте, что произведения упорядочены по рейтингу, '
+            'а произведения без отзывов не попадают в список.'
+        )
+        cases = (
+            ('category=films', [best.id, good.id]),
+            ('genre=drama', [book.id, good.id]),
+            ('genre=drama&category=films', [good.id]),
+            ('year=1990', [book.id, good.id]),
+            ('category=films&year=1991', [best.id]),
+            ('min_reviews=2&limit=1', [book.id]),
+            ('bayesian=true', [book.id, best.id, good.id]),
+        )
+        for query, expected in cases:
+            response = client.get(f'{self.TOP_URL}?{query}')
+            assert [title['id'] for title in response.json()] == expected, (
+                f'Проверьте фильтрацию `{self.TOP_URL}?{query}`.'
+            )
+
+    def test_02_rankings_follow_changes(self, client, django_user_model):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        first = Title.objects.create(name='Первое', year=1990)
+        second = Title.objects.create(name='Второе', year=1990)
+        self.create_reviews(django_user_model, first, 8)
+        self.create_reviews(django_user_model, second, 6)
+        url = f'{self.TOP_URL}?genre=drama'
+        assert client.get(url).json() == []
+        second.genre.add(drama)
+        assert [t['id'] for t in client.get(url).json()] == [second.id], (
+            'Проверьте, что добавление жанра сразу попадает в рейтинг жанра.'
+        )
+        review = second.reviews.get()
+        review.score = 10
+        review.save()
+        assert [t['id'] for t in client.get(self.TOP_URL).json()] == [
+            second.id, first.id
+        ], 'Проверьте, что изменение оценки сразу меняет рейтинг.'
+        review.delete()
+        drama.delete()
+        assert not TitleRanking.objects.filter(
+            kind=TitleRanking.GENRE
+        ).exists(), 'Проверьте, что удаление жанра очищает его рейтинг.'
+        fresh = list(TitleRanking.objects.values_list(
+            'title', 'kind', 'value', 'reviews_count', 'rating'
+        ).order_by('title', 'kind'))
+        TitleRanking.objects.rebuild()
+        assert fresh == list(TitleRanking.objects.values_list(
+            'title', 'kind', 'value', 'reviews_count', 'rating'
+        ).order_by('title', 'kind')), (
+            'Проверьте, что инкрементальные изменения рейтинговых списков '
+            'совпадают с полной пересборкой.'
+        )
+
+    def test_03_invalid_params(self, client):
+        for query in ('limit=0', 'limit=101', 'min_reviews=0', 'year=abc'):
+            response = client.get(f'{self.TOP_URL}?{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{self.TOP_URL}?{query}` '
+                'возвращает статус 400.'
+            )
+
+    def test_04_failed_rebuild_keeps_rankings(self):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Первое', year=1990)
+        title.genre.add(drama)
+        rankings = TitleRanking.objects.count()
+        # Списки жанров вставляются последними, уже после удаления.
+        with mock.patch.object(TitleRanking, 'GENRE', None):
+            with pytest.raises(IntegrityError):
+                TitleRanking.objects.rebuild()
+        assert TitleRanking.objects.count() == rankings, (
+            'Проверьте, что пересборка рейтинговых списков выполняется '
+            'в одной транзакции.'
+        )
@@ -0,0 +1,64 @@
+import logging
+import re
+from http import HTTPStatus
+
+import pytest
+from django.urls import resolve
+
+from api.metrics import QueryBudgetExceeded, reset_metrics
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Metrics:
+
+    TITLES_URL = '/api/v1/titles/'
+    METRICS_URL = '/api/v1/metrics/'
+
+    def test_01_server_timing_header(self, client):
+        Title.objects.create(name='Произведение', year=1990)
+        response = client.get(self.TITLES_URL)
+        timing = response.get('Server-Timing', '')
+        match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries', timing)
+        assert 'total;dur=' in timing and match, (
+            f'Проверьте, что ответ `{self.TITLES_URL}` содержит заголовок '
+            '`Server-Timing` со временем ответа и запросами к базе.'
+        )
+        assert int(match.group(1)) > 0
+
+    def test_02_metrics_endpoint(self, client, django_user_model):
+        reset_metrics()
+        response = client.get(self.METRICS_URL)
+        assert response.status_code in (
+            HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что метрики недоступны анониму.'
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        admin = django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='1234567'
+        )
+        client.force_login(admin)
+        metrics = client.get(self.METRICS_URL).json()
+        route = resolve(self.TITLES_URL).view_name
+        assert metrics[route]['requests'] == 2, (
+            'Проверьте, что метрики копятся по имени маршрута.'
+        )
+        for key in ('avg_ms', 'avg_db_ms', 'avg_queries',
+                    'duplicated_queries', 'avg_bytes', 'budget'):
+            assert key in metrics[route], (
+                f'Проверьте, что метрики маршрута содержат `{key}`.'
+            )
+
+    def test_03_budget_is_enforced(self, client, settings, caplog):
+        route = resolve(self.TITLES_URL).view_name
+        settings.QUERY_BUDGETS = {route: 0}
+        with pytest.raises(QueryBudgetExceeded):
+            client.get(self.TITLES_URL)
+        settings.QUERY_BUDGET_STRICT = False
+        with caplog.at_level(logging.WARNING, logger='api.metrics'):
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert route in caplog.text, (
+            'Проверьте, что без QUERY_BUDGET_STRICT превышение бюджета '
+            'пишется в лог, а ответ отдаётся как обычно.'
+        )
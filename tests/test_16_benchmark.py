@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Benchmark:
+
+    def read_files(self, path):
+        return {file.name: file.read_bytes() for file in path.glob('*.csv')}
+
+    def test_01_generator_is_deterministic(self, tmp_path):
+        for name in ('first', 'second'):
+            call_command('generate_data', '--path', tmp_path / name,
+                         '--reviews', '500', '--seed', '7')
+        first = self.read_files(tmp_path / 'first')
+        assert first and first == self.read_files(tmp_path / 'second'), (
+            'Проверьте, что `generate_data` с одним зерном создаёт '
+            'одинаковые файлы.'
+        )
+        call_command('generate_data', '--path', tmp_path / 'other',
+                     '--reviews', '500', '--seed', '8')
+        assert self.read_files(tmp_path / 'other') != first
+
+    def test_02_benchmark_reports_routes(self, tmp_path):
+        call_command('generate_data', '--path', tmp_path, '--reviews', '500')
+        call_command('import_from_csv', '--path', tmp_path, '--jobs', '1')
+        assert Review.objects.count() == 500, (
+            'Проверьте, что сгенерированные файлы загружаются '
+            'командой `import_from_csv` без потерь.'
+        )
+        counts = list(Title.objects.order_by('-reviews_count').values_list(
+            'reviews_count', flat=True
+        ))
+        assert counts[0] > 5 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределены по произведениям неравномерно.'
+        )
+        report_path = tmp_path / 'report.json'
+        call_command('benchmark', '--requests', '5', '--warmup', '1',
+                     '--route', 'titles-list', '--route', 'reviews-list',
+                     '--output', report_path)
+        report = json.loads(report_path.read_text())
+        assert set(report['routes']) == {'titles-list', 'reviews-list'}
+        for route in report['routes'].values():
+            assert route['requests'] == 5 and route['errors'] == 0
+            assert route['p50_ms'] <= route['p99_ms'], (
+                'Проверьте, что отчёт содержит перцентили задержек.'
+            )
+            assert route['avg_queries'] is not None, (
+                'Проверьте, что отчёт содержит число запросов к базе.'
+            )
+        call_command('benchmark', '--requests', '5', '--route', 'titles-list',
+                     '--compare', report_path, '--output', report_path)
+        assert 'titles-list' in json.loads(
+            report_path.read_text()
+        )['comparison']
+
+    def test_03_benchmark_covers_writes_and_auth(self, tmp_path):
+        call_command('generate_data', '--path', tmp_path, '--reviews', '50')
+        call_command('import_from_csv', '--path', tmp_path, '--jobs', '1')
+        routes = (
+            'titles-stats', 'sync', 'export', 'users-list', 'users-me',
+            'metrics', 'cache-stats', 'reviews-create', 'reviews-update',
+            'reviews-delete', 'comments-create', 'comments-update',
+            'comments-delete', 'auth-signup', 'auth-token',
+        )
+        report_path = tmp_path / 'report.json'
+        call_command('benchmark', '--requests', '3', '--warmup', '1',
+                     *(f'--route={name}' for name in routes),
+                     '--output', report_path)
+        report = json.loads(report_path.read_text())
+        assert set(report['routes']) == set(routes), (
+            'Проверьте, что бенчмарк замеряет служебные маршруты, запись '
+            'и вход по коду.'
+        )
+        for name, route in report['routes'].items():
+            assert route['errors'] == 0, (
+                f'Проверьте, что запросы сценария `{name}` выполняются '
+                f'без ошибок: {route["statuses"]}.'
+            )
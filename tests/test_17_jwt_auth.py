@@ -0,0 +1,117 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import ClaimsAccessToken, forget_claims
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17JwtAuth:
+
+    STATS_URL = '/api/v1/cache/stats/'
+
+    def get_client(self, user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+        )
+        return client
+
+    def test_01_authentication_without_queries(self, django_user_model):
+        staff = django_user_model.objects.create_user(
+            username='staff', password='1234567', is_staff=True
+        )
+        client = self.get_client(staff)
+        assert client.get(self.STATS_URL).status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not context.captured_queries, (
+            'Проверьте, что повторный запрос с JWT-токеном не загружает '
+            'пользователя из базы.'
+        )
+
+    def test_02_role_change_revokes_token(self, django_user_model):
+        staff = django_user_model.objects.create_user(
+            username='staff', password='1234567', is_staff=True
+        )
+        client = self.get_client(staff)
+        assert client.get(self.STATS_URL).status_code == HTTPStatus.OK
+        staff.role = django_user_model.MODERATOR
+        staff.save()
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что смена роли отзывает выданные токены.'
+        assert self.get_client(staff).get(
+            self.STATS_URL
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что новый токен после смены роли принимается.'
+        )
+
+    def test_03_cached_claims_expire(self, django_user_model, settings):
+        staff = django_user_model.objects.create_user(
+            username='staff', password='1234567', is_staff=True
+        )
+        client = self.get_client(staff)
+        assert client.get(self.STATS_URL).status_code == HTTPStatus.OK
+        # Так версия меняется в другом процессе: сигналы сюда не доходят.
+        django_user_model.objects.filter(pk=staff.pk).update(
+            token_version=F('token_version') + 1
+        )
+        assert client.get(self.STATS_URL).status_code == HTTPStatus.OK
+        settings.JWT_CLAIMS_CACHE_TIMEOUT = 0
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что после истечения кэша claims отозванный '
+            'токен отвергается.'
+        )
+
+    def test_04_token_user_is_usable_as_author(self, user):
+        title = Title.objects.create(name='Произведение', year=1990)
+        response = self.get_client(user).post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        assert Review.objects.get().author_id == user.id, (
+            'Проверьте, что пользователь из токена становится автором отзыва.'
+        )
+
+    def test_05_roles_come_from_claims_cache(self, django_user_model):
+        staff = django_user_model.objects.create_user(
+            username='staff', password='1234567', is_staff=True
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(staff)}'
+        )
+        assert client.get(self.STATS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что токен без версии принимается, а права '
+            'берутся из базы.'
+        )
+        staff.is_staff = False
+        staff.save()
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что права токена без версии берутся из базы.'
+
+    def test_06_token_claims_do_not_override_database(
+        self, django_user_model
+    ):
+        staff = django_user_model.objects.create_user(
+            username='staff', password='1234567', is_staff=True
+        )
+        client = self.get_client(staff)
+        # Версия не меняется: расходятся только claims токена и базы.
+        django_user_model.objects.filter(pk=staff.pk).update(is_staff=False)
+        forget_claims()
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что права из базы важнее claims токена.'
@@ -0,0 +1,123 @@
+import pytest
+from django.db import IntegrityError
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.jobs import enqueue_email, retry_later
+from core.models import Job
+
+
+class CountingBackend(EmailBackend):
+    """locmem-бэкенд, считающий открытые соединения."""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+    """locmem-бэкенд, не принимающий письма на адреса с «bad»."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any('bad' in address for address in message.to):
+                raise ConnectionError('Почтовый сервер недоступен')
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18JobQueue:
+
+    def run_workers(self, *args):
+        call_command('run_workers', '--once', *args)
+
+    def test_01_emails_are_sent_in_one_connection(self, mailoutbox,
+                                                  settings):
+        settings.EMAIL_BACKEND = (
+            'tests.test_18_job_queue.CountingBackend'
+        )
+        CountingBackend.opened = 0
+        for number in range(5):
+            enqueue_email('Код', f'Код {number}', [f'user{number}@yamdb.fake'])
+        assert not mailoutbox, (
+            'Проверьте, что письма не отправляются до запуска обработчиков.'
+        )
+        self.run_workers('--workers', '1')
+        assert len(mailoutbox) == 5
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение.'
+        )
+        assert set(Job.objects.values_list('status', flat=True)) == {
+            Job.DONE
+        }
+
+    def test_02_repeated_signup_is_deduplicated(self, mailoutbox):
+        for code in ('111', '222', '333'):
+            enqueue_email('Код', f'Код {code}', ['user@yamdb.fake'],
+                          dedup_key='signup:user')
+        enqueue_email('Код', 'Код 444', ['other@yamdb.fake'],
+                      dedup_key='signup:other')
+        assert Job.objects.count() == 2, (
+            'Проверьте, что повторная регистрация, пока письмо ждёт '
+            'в очереди, не ставит новую задачу.'
+        )
+        self.run_workers('--workers', '2')
+        bodies = sorted(message.body for message in mailoutbox)
+        assert bodies == ['Код 333', 'Код 444'], (
+            'Проверьте, что отправляется только последний код.'
+        )
+        enqueue_email('Код', 'Код 555', ['user@yamdb.fake'],
+                      dedup_key='signup:user')
+        self.run_workers()
+        assert mailoutbox[-1].body == 'Код 555', (
+            'Проверьте, что после отправки письма повторная регистрация '
+            'ставит новую задачу, а не склеивается с выполненной.'
+        )
+
+    def test_03_failed_jobs_are_retried_with_backoff(self, mailoutbox,
+                                                     settings):
+        settings.EMAIL_BACKEND = 'tests.test_18_job_queue.FailingBackend'
+        bad = enqueue_email('Код', 'Код', ['bad@yamdb.fake'])
+        enqueue_email('Код', 'Код', ['good@yamdb.fake'])
+        self.run_workers()
+        assert len(mailoutbox) == 1
+        bad.refresh_from_db()
+        assert bad.status == Job.PENDING and bad.attempts == 1, (
+            'Проверьте, что неудавшаяся задача возвращается в очередь.'
+        )
+        assert bad.run_after > timezone.now() and bad.last_error, (
+            'Проверьте, что повтор откладывается и ошибка сохраняется.'
+        )
+        settings.JOB_RETRY_DELAY = 0
+        settings.JOB_MAX_ATTEMPTS = 3
+        Job.objects.filter(pk=bad.pk).update(run_after=timezone.now())
+        self.run_workers()
+        bad.refresh_from_db()
+        assert bad.status == Job.FAILED and bad.attempts == 3, (
+            'Проверьте, что после JOB_MAX_ATTEMPTS попыток задача '
+            'помечается как невыполненная.'
+        )
+
+    def test_04_pending_job_is_unique_per_key(self, mailoutbox, settings):
+        settings.EMAIL_BACKEND = 'tests.test_18_job_queue.FailingBackend'
+        stale = enqueue_email('Код', 'Код 111', ['bad@yamdb.fake'],
+                              dedup_key='signup:user')
+        with pytest.raises(IntegrityError):
+            Job.objects.create(
+                kind=stale.kind, payload={}, dedup_key=stale.dedup_key,
+                run_after=timezone.now(),
+            )
+        Job.objects.filter(pk=stale.pk).update(status=Job.RUNNING)
+        fresh = enqueue_email('Код', 'Код 222', ['user@yamdb.fake'],
+                              dedup_key='signup:user')
+        assert fresh.pk != stale.pk
+        retry_later(stale, ConnectionError(), timezone.now())
+        stale.refresh_from_db()
+        assert stale.status == Job.FAILED, (
+            'Проверьте, что упавшая задача не возвращается в очередь, '
+            'если там уже ждёт более новая с тем же ключом.'
+        )
+        self.run_workers()
+        assert [message.body for message in mailoutbox] == ['Код 222']
@@ -0,0 +1,83 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.tokens import confirmation_code_generator, send_confirmation_code
+from core.models import Job
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ConfirmationCodes:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_code_is_checked_without_queries(self, user):
+        code = confirmation_code_generator.make_code(user)
+        assert code == confirmation_code_generator.make_code(user), (
+            'Проверьте, что повторный запрос кода в том же интервале '
+            'даёт тот же код.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            assert confirmation_code_generator.check_code(user, code)
+            assert not confirmation_code_generator.check_code(user, 'x' * 16)
+            assert not confirmation_code_generator.check_code(user, 12345)
+        assert not context.captured_queries, (
+            'Проверьте, что проверка кода не обращается к базе.'
+        )
+
+    def test_02_code_expires(self, user, settings, monkeypatch):
+        now = time.time()
+        timeout = settings.CONFIRMATION_CODE_TIMEOUT
+        monkeypatch.setattr(confirmation_code_generator, '_now', lambda: now)
+        code = confirmation_code_generator.make_code(user)
+        monkeypatch.setattr(confirmation_code_generator, '_now',
+                            lambda: now + timeout)
+        assert confirmation_code_generator.check_code(user, code), (
+            'Проверьте, что код действует не меньше '
+            '`CONFIRMATION_CODE_TIMEOUT` секунд.'
+        )
+        monkeypatch.setattr(confirmation_code_generator, '_now',
+                            lambda: now + 2 * timeout)
+        assert not confirmation_code_generator.check_code(user, code), (
+            'Проверьте, что код перестаёт действовать через два интервала.'
+        )
+
+    def test_03_code_depends_on_user_state(self, user, admin):
+        code = confirmation_code_generator.make_code(user)
+        assert not confirmation_code_generator.check_code(admin, code)
+        user.email = 'changed@yamdb.fake'
+        assert not confirmation_code_generator.check_code(user, code), (
+            'Проверьте, что смена email делает код недействительным.'
+        )
+
+    def test_04_repeated_signup_does_not_write_codes(self, user):
+        with CaptureQueriesContext(connection) as context:
+            send_confirmation_code(user)
+            send_confirmation_code(user)
+        user_table = user._meta.db_table
+        assert not any(
+            query['sql'].startswith('UPDATE') and user_table in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что код подтверждения не сохраняется в базе.'
+        assert Job.objects.count() == 1, (
+            'Проверьте, что повторная регистрация не ставит второе письмо.'
+        )
+
+    def test_05_code_is_single_use(self, client, user):
+        data = {
+            'username': user.username,
+            'confirmation_code': confirmation_code_generator.make_code(user),
+        }
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{self.URL_TOKEN}` с верным '
+            'кодом возвращает токен.'
+        )
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения нельзя обменять на токен '
+            'повторно.'
+        )
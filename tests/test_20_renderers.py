@@ -0,0 +1,93 @@
+import datetime
+import decimal
+import uuid
+from collections import OrderedDict
+from http import HTTPStatus
+
+import msgpack
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.authentication import ClaimsAccessToken
+from api.renderers import ORJSONRenderer
+from reviews.models import Genre, Review, Title
+
+
+class Test20Renderers:
+
+    def test_01_orjson_matches_json_renderer(self):
+        data = OrderedDict([
+            ('name', 'Произведение\u2028\u2029 "кавычки"'),
+            ('pub_date', datetime.datetime(
+                2020, 1, 13, 23, 20, 2, 422187, tzinfo=datetime.timezone.utc
+            )),
+            ('day', datetime.date(2020, 1, 13)),
+            ('price', decimal.Decimal('9.90')),
+            ('id', uuid.UUID(int=1)),
+            ('scores', {1: 10, 2: None}),
+            ('nested', [{'rating': 7.5, 'genre': []}, True]),
+        ])
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data), (
+            'Проверьте, что ORJSONRenderer выдаёт те же байты, '
+            'что и JSONRenderer.'
+        )
+        assert ORJSONRenderer().render(
+            data, 'application/json; indent=4'
+        ) == JSONRenderer().render(data, 'application/json; indent=4')
+
+    def test_02_orjson_strict_rejects_non_finite(self):
+        data = {'rating': None, 'scores': [7.5, float('nan')]}
+        with pytest.raises(ValueError):
+            JSONRenderer().render(data)
+        with pytest.raises(ValueError):
+            ORJSONRenderer().render(data)
+        renderer = ORJSONRenderer()
+        renderer.strict = False
+        assert renderer.render(data) == b'{"rating":null,"scores":[7.5,null]}'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ContentNegotiation:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_msgpack_response(self, client):
+        title = Title.objects.create(name='Произведение', year=1990)
+        title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        as_json = client.get(self.TITLES_URL).json()
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT='application/msgpack'
+        )
+        assert response['Content-Type'] == 'application/msgpack', (
+            'Проверьте, что `Accept: application/msgpack` выбирает '
+            'MessagePack.'
+        )
+        assert msgpack.unpackb(response.content) == as_json, (
+            'Проверьте, что MessagePack-ответ совпадает с JSON-ответом.'
+        )
+
+    def test_02_msgpack_request(self, user):
+        title = Title.objects.create(name='Произведение', year=1990)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+        )
+        response = client.post(
+            f'{self.TITLES_URL}{title.id}/reviews/',
+            data=msgpack.packb({'text': 'Отзыв', 'score': 9}),
+            content_type='application/msgpack',
+            HTTP_ACCEPT='application/msgpack',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert msgpack.unpackb(response.content)['score'] == 9
+        assert Review.objects.get().score == 9, (
+            'Проверьте, что тело запроса в MessagePack разбирается.'
+        )
+        response = client.post(
+            f'{self.TITLES_URL}{title.id}/reviews/',
+            data=b'{"text": ', content_type='application/json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что битый JSON возвращает статус 400.'
+        )
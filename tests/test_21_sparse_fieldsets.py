@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    return response, [query['sql'] for query in context.captured_queries]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21SparseFieldsets:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_title(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Произведение', year=1990, category=category,
+            description='Очень длинное описание',
+        )
+        title.genre.add(genre)
+        return title
+
+    def test_01_fields_limit_output_and_sql(self, client):
+        title = self.create_title()
+        response, queries = get_with_queries(
+            client, f'{self.TITLES_URL}?fields=id,name,rating'
+        )
+        assert response.json() == [
+            {'id': title.id, 'name': title.name, 'rating': None}
+        ], (
+            'Проверьте, что с `?fields=` в ответе остаются только '
+            'перечисленные поля.'
+        )
+        assert not any('description' in sql for sql in queries), (
+            'Проверьте, что колонки неперечисленных полей не читаются '
+            'из базы.'
+        )
+        assert not any('reviews_genre' in sql for sql in queries), (
+            'Проверьте, что без поля `genre` жанры не подгружаются.'
+        )
+        assert not any('reviews_category' in sql for sql in queries), (
+            'Проверьте, что без поля `category` не выполняется JOIN '
+            'с категориями.'
+        )
+
+    def test_02_omit_drops_fields(self, client):
+        self.create_title()
+        response, queries = get_with_queries(
+            client, f'{self.TITLES_URL}?omit=description,genre'
+        )
+        result = response.json()[0]
+        assert set(result) == {'id', 'name', 'year', 'rating', 'category'}, (
+            'Проверьте, что поля из `?omit=` не попадают в ответ.'
+        )
+        assert result['category'] == {'name': 'Фильм', 'slug': 'films'}, (
+            'Проверьте, что `?omit=` не влияет на вложенные объекты.'
+        )
+        assert not any('description' in sql for sql in queries), (
+            'Проверьте, что колонки полей из `?omit=` не читаются из базы.'
+        )
+
+    def test_03_full_output_by_default(self, client):
+        self.create_title()
+        response = client.get(f'{self.TITLES_URL}?fields=unknown,name')
+        assert list(response.json()[0]) == ['name'], (
+            'Проверьте, что неизвестные имена в `?fields=` пропускаются.'
+        )
+        response = client.get(self.TITLES_URL)
+        assert set(response.json()[0]) == {
+            'id', 'name', 'year', 'rating', 'description', 'genre',
+            'category',
+        }, 'Проверьте, что без параметров отдаются все поля.'
+
+    def test_04_expand_review_title(self, client, django_user_model):
+        title = self.create_title()
+        author = django_user_model.objects.create_user(username='author')
+        Review.objects.create(title=title, author=author, text='Отзыв',
+                              score=7)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        review = client.get(url).json()[0]
+        assert review['title'] == title.id, (
+            'Проверьте, что по умолчанию отзыв ссылается на произведение '
+            'по id.'
+        )
+        response, _ = get_with_queries(
+            client, f'{url}?fields=id,text,title&expand=title'
+        )
+        review = response.json()[0]
+        assert set(review) == {'id', 'text', 'title'}, (
+            'Проверьте, что `?fields=` работает и для отзывов.'
+        )
+        assert review['title']['name'] == title.name, (
+            'Проверьте, что `?expand=title` отдаёт произведение объектом.'
+        )
+        assert review['title']['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+
+    def test_05_paginated_expand_fits_budget(self, client,
+                                             django_user_model):
+        title = self.create_title()
+        author = django_user_model.objects.create_user(username='author')
+        Review.objects.create(title=title, author=author, text='Отзыв',
+                              score=7)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        response, queries = get_with_queries(
+            client, f'{url}?expand=title&limit=1'
+        )
+        review = response.json()['results'][0]
+        assert review['title']['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ], (
+            'Проверьте, что `?expand=` работает вместе с пагинацией.'
+        )
+        _, plain = get_with_queries(client, f'{url}?limit=1')
+        assert len(queries) == len(plain) + 1, (
+            'Проверьте, что `?expand=title` добавляет один запрос за жанры '
+            'и бюджет маршрута учитывает его.'
+        )
+
+    def test_06_writes_ignore_fieldset(self, admin_client):
+        category = Category.objects.create(name='Фильм', slug='films')
+        Genre.objects.create(name='Драма', slug='drama')
+        response = admin_client.post(
+            f'{self.TITLES_URL}?fields=id', data={
+                'name': 'Новое', 'year': 1990, 'category': category.slug,
+                'genre': ['drama'],
+            }
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert 'name' in response.json(), (
+            'Проверьте, что `?fields=` не применяется к записи.'
+        )
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.export import EXPORT_FILES
+from reviews.models import (Category, Change, Comments, Genre, Review,
+                            Title)
+
+
+def read_csv(response):
+    content = b''.join(response.streaming_content).decode('utf-8')
+    return list(csv.reader(io.StringIO(content)))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Export:
+
+    EXPORT_URL = '/api/v1/export/'
+
+    def create_catalogue(self, django_user_model):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Произведение', year=1990,
+                                     category=category)
+        title.genre.add(genre)
+        author = django_user_model.objects.create_user(
+            username='author', email='author@yamdb.fake'
+        )
+        review = Review.objects.create(title=title, author=author,
+                                       text='Отзыв, с "кавычками"', score=7)
+        Comments.objects.create(review=review, author=author,
+                                text='Комментарий')
+        return title, review
+
+    def test_01_export_requires_admin(self, client, user_client):
+        for test_client in (client, user_client):
+            response = test_client.get(self.EXPORT_URL)
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), 'Проверьте, что выгрузка доступна только администратору.'
+
+    def test_02_csv_mirrors_static_data(self, user_superuser_client,
+                                        django_user_model):
+        client = user_superuser_client
+        title, review = self.create_catalogue(django_user_model)
+        response = client.get(f'{self.EXPORT_URL}review.csv')
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, 'Проверьте, что выгрузка потоковая.'
+        rows = read_csv(response)
+        assert rows[0] == [
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        ], 'Проверьте, что заголовок совпадает с static/data/review.csv.'
+        assert rows[1][:5] == [
+            str(review.id), str(title.id), review.text,
+            str(review.author_id), '7',
+        ]
+        response = client.get(f'{self.EXPORT_URL}unknown.csv')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def read_ndjson(self, client, query=''):
+        response = client.get(f'{self.EXPORT_URL}{query}')
+        assert response.status_code == HTTPStatus.OK
+        lines = [json.loads(line) for line in b''.join(
+            response.streaming_content
+        ).decode('utf-8').splitlines()]
+        assert response['X-Export-Cursor'] == lines[-1]['cursor']
+        return lines[:-1], lines[-1]['cursor']
+
+    def test_03_since_exports_changes(self, user_superuser_client,
+                                      django_user_model):
+        client = user_superuser_client
+        title, review = self.create_catalogue(django_user_model)
+        rows, cursor = self.read_ndjson(client)
+        assert {row.get('table') for row in rows} == {
+            'users', 'category', 'genre', 'titles', 'genre_title', 'review',
+            'comments',
+        }, 'Проверьте, что NDJSON содержит все таблицы.'
+
+        deleted_id = review.comments.get().id
+        newer = Comments.objects.create(
+            review=review, author=review.author, text='Новый'
+        )
+        Comments.objects.get(pk=deleted_id).delete()
+        review.text = 'Исправленный отзыв'
+        review.save()
+        rows, cursor = self.read_ndjson(client, f'?since={cursor}')
+        tables = {}
+        for row in rows:
+            tables.setdefault(row.pop('table'), []).append(row)
+        assert tables['comments'] == [
+            {'id': newer.id, 'review_id': review.id, 'text': 'Новый',
+             'author': review.author_id,
+             'pub_date': tables['comments'][0]['pub_date']},
+            {'id': deleted_id, 'deleted': True},
+        ], (
+            'Проверьте, что с `since=` выгружаются новые строки и '
+            'tombstone удалённых.'
+        )
+        assert [row['text'] for row in tables['review']] == [
+            'Исправленный отзыв'
+        ], 'Проверьте, что с `since=` выгружаются изменённые строки.'
+        assert tables['genre_title'][0] == {
+            'title_id': title.id, 'deleted': True
+        } and len(tables['genre_title']) == 2
+        assert [row['id'] for row in tables['users']] == [review.author_id]
+        assert 'category' not in tables and 'genre' not in tables
+
+        rows, cursor = self.read_ndjson(client, f'?since={cursor}')
+        assert rows == [], (
+            'Проверьте, что без изменений выгрузка по курсору пуста.'
+        )
+        Change.objects.log_reset()
+        rows, _ = self.read_ndjson(client, f'?since={cursor}')
+        assert rows[0] == {'reset': True} and len(
+            {row['table'] for row in rows[1:]}
+        ) == len(EXPORT_FILES), (
+            'Проверьте, что после массовой загрузки выгрузка по курсору '
+            'начинается с reset и содержит весь каталог.'
+        )
+        for query in ('?since=broken', f'review.csv?since={cursor}'):
+            response = client.get(f'{self.EXPORT_URL}{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_command_round_trips_with_import(self, django_user_model,
+                                                tmp_path):
+        self.create_catalogue(django_user_model)
+        call_command('export', '--path', str(tmp_path), '--chunk-size', '1')
+        counts = [model.objects.count()
+                  for model in (Title, Review, Comments, Genre)]
+        call_command('import_from_csv', '--path', str(tmp_path),
+                     '--truncate', '--jobs', '1')
+        assert [model.objects.count()
+                for model in (Title, Review, Comments, Genre)] == counts, (
+            'Проверьте, что выгрузку можно загрузить командой '
+            '`import_from_csv`.'
+        )
+        assert Title.objects.get().genre.get().slug == 'drama'
@@ -0,0 +1,121 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Change, Comments, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Sync:
+
+    SYNC_URL = '/api/v1/sync/'
+
+    def get_changes(self, client, token, **params):
+        response = client.get(self.SYNC_URL, {'token': token, **params})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.SYNC_URL}` доступен без авторизации.'
+        )
+        return response.json()
+
+    def get_token(self, client):
+        data = client.get(self.SYNC_URL).json()
+        assert data['reset'] and data['changes'] == [], (
+            'Проверьте, что без токена клиент получает reset и токен.'
+        )
+        return data['token']
+
+    def test_01_creates_updates_and_deletes(self, client, django_user_model):
+        token = self.get_token(client)
+        category = Category.objects.create(name='Фильм', slug='films')
+        title = Title.objects.create(name='Произведение', year=1990,
+                                     category=category)
+        data = self.get_changes(client, token)
+        assert not data['reset'] and not data['has_more']
+        changes = {(c['model'], c['id']): c for c in data['changes']}
+        assert changes[('title', title.id)]['action'] == 'created'
+        assert changes[('title', title.id)]['data']['name'] == title.name
+        assert changes[('category', category.id)]['slug'] == 'films', (
+            'Проверьте, что жанры и категории передаются со slug.'
+        )
+        token = data['token']
+        assert self.get_changes(client, token)['changes'] == [], (
+            'Проверьте, что после токена не повторяются старые изменения.'
+        )
+
+        author = django_user_model.objects.create_user(username='author')
+        review = Review.objects.create(title=title, author=author,
+                                       text='Отзыв', score=8)
+        data = self.get_changes(client, token)
+        title_change = [c for c in data['changes'] if c['model'] == 'title']
+        assert title_change[0]['action'] == 'updated', (
+            'Проверьте, что новый отзыв меняет рейтинг произведения в журнале.'
+        )
+        assert title_change[0]['data']['rating'] == 8
+        token = data['token']
+
+        category.delete()
+        data = self.get_changes(client, token)
+        assert {(c['model'], c['action']) for c in data['changes']} == {
+            ('category', 'deleted'), ('title', 'updated'),
+        }
+        token = data['token']
+
+        comments = [
+            Comments.objects.create(review=review, author=author, text=text)
+            for text in ('Первый', 'Второй')
+        ]
+        review_id = review.id
+        review.delete()
+        data = self.get_changes(client, token)
+        assert sorted(
+            (c['model'], c['id'], c['action']) for c in data['changes']
+            if c['model'] != 'title'
+        ) == sorted(
+            [('comments', comment.id, 'deleted') for comment in comments]
+            + [('review', review_id, 'deleted')]
+        ), (
+            'Проверьте, что удаление отзыва оставляет tombstone для него '
+            'и для его комментариев.'
+        )
+        assert all('data' not in c for c in data['changes']
+                   if c['action'] == 'deleted')
+
+    def test_02_pages_read_only_changes(self, client):
+        for number in range(30):
+            Genre.objects.create(name=f'Жанр {number}', slug=f'g{number}')
+        token = self.get_token(client)
+        genre = Genre.objects.get(slug='g0')
+        for number in range(3):
+            genre.name = f'Имя {number}'
+            genre.save()
+        new = Genre.objects.create(name='Новый', slug='new')
+        with CaptureQueriesContext(connection) as context:
+            data = self.get_changes(client, token, limit=2)
+        queries = [q['sql'] for q in context.captured_queries]
+        assert data['has_more'] and len(data['changes']) == 1, (
+            'Проверьте, что несколько правок объекта на странице '
+            'склеиваются в одну запись.'
+        )
+        assert data['changes'][0]['data']['name'] == 'Имя 2'
+        assert len([sql for sql in queries if 'reviews_genre' in sql]) == 1, (
+            'Проверьте, что объекты страницы загружаются одним запросом '
+            'на модель.'
+        )
+        data = self.get_changes(client, data['token'], limit=100)
+        assert [(c['id'], c['action']) for c in data['changes']] == [
+            (genre.id, 'updated'), (new.id, 'created'),
+        ]
+        assert not data['has_more']
+
+    def test_03_bulk_load_requires_reset(self, client):
+        token = self.get_token(client)
+        Genre.objects.create(name='Драма', slug='drama')
+        reset = Change.objects.log_reset()
+        data = self.get_changes(client, token)
+        assert data['reset'] and data['token'] == str(reset.pk), (
+            'Проверьте, что после массовой загрузки клиент получает reset.'
+        )
+        response = client.get(self.SYNC_URL, {'token': 'abc'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,91 @@
+import json
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+from core.db import configure_sqlite, retry_on_locked
+from core.models import Job
+from reviews.models import Category, Title
+
+
+def pragma(cursor, name):
+    cursor.execute(f'PRAGMA {name}')
+    return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SqliteTuning:
+
+    def test_01_pragmas_applied_on_connect(self, settings):
+        with connection.cursor() as cursor:
+            values = {
+                name: pragma(cursor, name) for name in (
+                    'synchronous', 'temp_store', 'busy_timeout', 'cache_size'
+                )
+            }
+        assert values == {
+            'synchronous': 1, 'temp_store': 2,
+            'busy_timeout': settings.DB_LOCK_TIMEOUT * 1000,
+            'cache_size': -64 * 1024,
+        }, (
+            'Проверьте, что PRAGMA применяются к каждому соединению, '
+            'а ожидание блокировки берётся из `DB_LOCK_TIMEOUT`.'
+        )
+
+    def test_02_file_database_uses_wal(self, tmp_path):
+        raw = sqlite3.connect(tmp_path / 'db.sqlite3')
+        try:
+            configure_sqlite(raw)
+            assert pragma(raw.cursor(), 'journal_mode') == 'wal', (
+                'Проверьте, что файловая база переводится в режим WAL.'
+            )
+        finally:
+            raw.close()
+
+    def test_03_writes_are_retried_when_locked(self, settings):
+        settings.DB_LOCK_RETRY_DELAY = 0
+        calls = []
+
+        @retry_on_locked
+        def write(error):
+            calls.append(error)
+            Job.objects.create(kind='test', payload={},
+                               run_after=timezone.now())
+            if len(calls) < 3:
+                raise OperationalError(error)
+
+        write('database is locked')
+        assert len(calls) == 3 and Job.objects.count() == 1, (
+            'Проверьте, что транзакция повторяется целиком и неудачные '
+            'попытки откатываются.'
+        )
+        calls.clear()
+        with pytest.raises(OperationalError):
+            write('no such table')
+        assert len(calls) == 1, (
+            'Проверьте, что повторяются только ошибки блокировки.'
+        )
+
+    def test_04_mixed_load_without_lock_errors(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        for number in range(30):
+            Title.objects.create(name=f'Произведение {number}', year=1990,
+                                 category=category)
+        output = StringIO()
+        call_command('stress_db', '--workers', '4', '--seconds', '1',
+                     '--write-ratio', '0.3', stdout=output)
+        report = json.loads(output.getvalue())
+        assert report['errors'] == 0, (
+            'Проверьте, что при одновременных чтениях и записях запросы '
+            'не падают с «database is locked».'
+        )
+        operations = (report['read']['operations'],
+                      report['write']['operations'])
+        assert all(operations), (
+            'Проверьте, что под нагрузкой выполняются и чтения, и записи.'
+        )
+        assert not Job.objects.filter(kind='stress').exists()
@@ -0,0 +1,92 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connections
+
+from core import routers
+from reviews.models import Title
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """
+    Вторая SQLite-база с копией основной. Копия обновляется только
+    вызовом фикстуры, так что между вызовами реплика отстаёт.
+    """
+    connections.databases[REPLICA] = {
+        **connections.databases['default'],
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    settings.DATABASE_REPLICAS = {REPLICA: 1}
+    routers.get_pin_cache().clear()
+    routers._health.clear()
+
+    def replicate():
+        primary, copy = connections['default'], connections[REPLICA]
+        primary.ensure_connection()
+        copy.ensure_connection()
+        primary.connection.backup(copy.connection)
+
+    replicate()
+    yield replicate
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+    routers._health.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Replicas:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_reads_lag_but_writer_sees_own_review(self, client,
+                                                     user_client, replica):
+        title = Title.objects.create(name='Произведение', year=1990)
+        replica()
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        # Локальный кэш процесса пуст, как в другом воркере.
+        cache.clear()
+        assert len(user_client.get(url).json()) == 1, (
+            'Проверьте, что после записи клиент читает с основной базы '
+            'и видит свой отзыв.'
+        )
+        assert client.get(url).json() == [], (
+            'Проверьте, что чтения остальных клиентов идут на реплику.'
+        )
+        replica()
+        assert len(client.get(url).json()) == 1, (
+            'Проверьте, что после репликации отзыв виден всем.'
+        )
+
+    def test_02_pin_expires(self, user_client, replica, settings):
+        title = Title.objects.create(name='Произведение', year=1990)
+        replica()
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        settings.REPLICA_PIN_SECONDS = 0.05
+        user_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        time.sleep(0.1)
+        assert user_client.get(url).json() == [], (
+            'Проверьте, что без свежей записи клиент читает с реплики.'
+        )
+
+    def test_03_unhealthy_replica_is_skipped(self, client, replica,
+                                             tmp_path):
+        title = Title.objects.create(name='Произведение', year=1990)
+        connections[REPLICA].close()
+        connections.databases[REPLICA]['NAME'] = str(
+            tmp_path / 'missing' / 'replica.sqlite3'
+        )
+        routers._health.clear()
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что при недоступной реплике чтения идут '
+            'на основную базу.'
+        )
+        assert routers._health[REPLICA][1] is False
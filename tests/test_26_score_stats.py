@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import SCORES, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ScoreStats:
+
+    STATS_URL_TEMPLATE = '/api/v1/titles/{title_id}/stats/'
+
+    def create_reviews(self, django_user_model, title, scores):
+        reviews = []
+        for number, score in enumerate(scores):
+            author = django_user_model.objects.create_user(
+                username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+            )
+            reviews.append(Review.objects.create(
+                author=author, title=title, text='Отзыв', score=score
+            ))
+        return reviews
+
+    def get_state(self, title):
+        title = Title.objects.get(pk=title.pk)
+        return (title.histogram, title.reviews_count, title.score_sum,
+                title.rating)
+
+    def test_01_stats_from_histogram(self, client, django_user_model):
+        title = Title.objects.create(name='Произведение', year=1990)
+        self.create_reviews(django_user_model, title, [1, 4, 4, 7, 9, 10])
+        response = client.get(self.STATS_URL_TEMPLATE.format(
+            title_id=title.id
+        ))
+        assert response.status_code == HTTPStatus.OK
+        stats = response.json()
+        assert stats['histogram'] == {
+            str(score): {1: 1, 4: 2, 7: 1, 9: 1, 10: 1}.get(score, 0)
+            for score in SCORES
+        }, 'Проверьте, что гистограмма считает отзывы по каждой оценке.'
+        assert (stats['count'], stats['mean'], stats['median']) == (
+            6, 35 / 6, 5.5
+        ), 'Проверьте число отзывов, среднее и медиану.'
+        assert stats['percentiles'] == {
+            'p10': 1, 'p25': 4, 'p75': 9, 'p90': 10,
+        }, 'Проверьте процентили по ближайшему рангу.'
+        assert Title.objects.get(pk=title.pk).rating == stats['mean'], (
+            'Проверьте, что рейтинг выводится из той же гистограммы.'
+        )
+
+    def test_02_histogram_follows_reviews(self, django_user_model):
+        title = Title.objects.create(name='Произведение', year=1990)
+        other = Title.objects.create(name='Другое', year=1991)
+        first, second, third = self.create_reviews(
+            django_user_model, title, [2, 8, 8]
+        )
+        first.score = 10
+        first.save()
+        second.title = other
+        second.save()
+        third.delete()
+        state = self.get_state(title)
+        assert state == (
+            {score: int(score == 10) for score in SCORES}, 1, 10, 10.0
+        ), (
+            'Проверьте, что изменение, перенос и удаление отзыва '
+            'сдвигают гистограмму и рейтинг.'
+        )
+        assert self.get_state(other)[1:] == (1, 8, 8.0)
+        Title.objects.recalculate_ratings()
+        assert self.get_state(title) == state, (
+            'Проверьте, что пересчёт с нуля совпадает с инкрементальными '
+            'счётчиками.'
+        )
+
+    def test_03_empty_and_missing_title(self, client):
+        title = Title.objects.create(name='Произведение', year=1990)
+        stats = client.get(self.STATS_URL_TEMPLATE.format(
+            title_id=title.id
+        )).json()
+        assert (stats['count'], stats['mean'], stats['median']) == (
+            0, None, None
+        ), 'Проверьте статистику произведения без отзывов.'
+        assert set(stats['percentiles'].values()) == {None}
+        response = client.get(self.STATS_URL_TEMPLATE.format(
+            title_id=title.id + 1
+        ))
+        assert response.status_code == HTTPStatus.NOT_FOUND
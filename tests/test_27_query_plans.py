@@ -0,0 +1,57 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.explain import HOT_QUERIES, analyze, capture, explain_hot_queries
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27QueryPlans:
+
+    def test_01_hot_queries_use_indexes(self):
+        report = explain_hot_queries()
+        assert set(report) == set(HOT_QUERIES)
+        scans = {
+            name: analysis['plan'] for name, analysis in report.items()
+            if analysis['full_scans']
+        }
+        assert not scans, (
+            'Проверьте, что горячие запросы API не сканируют таблицы '
+            f'целиком: {scans}'
+        )
+        sorted_in_memory = [
+            name for name in ('titles-list', 'titles-by-category',
+                              'reviews-list', 'comments-list')
+            if report[name]['temp_sort']
+        ]
+        assert not sorted_in_memory, (
+            'Проверьте, что списки читаются в порядке индекса, без '
+            f'сортировки во временном B-дереве: {sorted_in_memory}'
+        )
+
+    def test_02_full_scan_gets_index_proposal(self):
+        sql, params = Title.objects.filter(
+            description='описание'
+        ).order_by('-name').query.sql_with_params()
+        analysis = analyze(sql, params)
+        assert analysis['full_scans'] == ['reviews_title']
+        assert analysis['proposals'] == [
+            'CREATE INDEX "reviews_title_description_name_idx" '
+            'ON "reviews_title" ("description", "name" DESC);'
+        ], (
+            'Проверьте, что для полного сканирования предлагается индекс '
+            'по столбцам условия и сортировки.'
+        )
+
+    def test_03_captured_request_and_strict_command(self, client):
+        category = Category.objects.create(name='Фильм', slug='films')
+        Title.objects.create(name='Произведение', year=1990,
+                             category=category)
+        statements = capture(client.get, '/api/v1/titles/?category=films')
+        assert statements, 'Проверьте, что SQL запроса перехватывается.'
+        for sql, params in statements:
+            assert not analyze(sql, params)['full_scans'], sql
+        call_command('explain_queries', '--strict',
+                     stdout=StringIO(), stderr=StringIO())
@@ -0,0 +1,130 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import ClaimsAccessToken
+from reviews.models import Comments, Review, Title
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Permissions:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_review(self, author):
+        title = Title.objects.create(name='Произведение', year=1990)
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        return title, review, f'{url}{review.id}/'
+
+    def test_01_review_permissions(self, client, user, moderator, admin,
+                                   django_user_model):
+        other = django_user_model.objects.create_user(username='other')
+        title, review, url = self.create_review(user)
+        assert client.get(url).status_code == HTTPStatus.OK
+        response = client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+            data={'text': 'Отзыв', 'score': 5},
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что аноним не может оставить отзыв.'
+        )
+        for method in ('patch', 'delete'):
+            response = getattr(get_client(other), method)(
+                url, data={'text': 'Чужой'}
+            )
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что пользователь не может менять и удалять '
+                'чужой отзыв.'
+            )
+        for author in (user, moderator, admin):
+            response = get_client(author).patch(url, data={'text': 'Правка'})
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что отзыв могут править автор, модератор '
+                'и администратор.'
+            )
+        response = get_client(moderator).delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Review.objects.filter(pk=review.pk).exists()
+
+    def test_02_detail_check_is_one_query(self, user, django_user_model):
+        other = get_client(
+            django_user_model.objects.create_user(username='other')
+        )
+        title, review, url = self.create_review(user)
+        other.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = other.delete(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert len(context) == 1, (
+            'Проверьте, что наличие отзыва и его автор проверяются одним '
+            'запросом, без загрузки пользователя и произведения: '
+            f'{[query["sql"] for query in context]}'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = other.delete(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=title.id + 1)
+                + f'{review.id}/'
+            )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что отзыв чужого произведения не находится.'
+        )
+        assert len(context) == 1
+
+    def test_03_catalog_is_admin_only(self, client, user_client,
+                                      admin_client):
+        data = {'name': 'Фильм', 'slug': 'films'}
+        assert client.post('/api/v1/categories/', data=data).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        response = user_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пользователь не может менять каталог.'
+        )
+        response = admin_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что администратор может менять каталог.'
+        )
+        assert client.get('/api/v1/categories/').status_code == HTTPStatus.OK
+
+    def test_04_comment_permissions(self, user, moderator,
+                                    django_user_model):
+        other = get_client(
+            django_user_model.objects.create_user(username='other')
+        )
+        title, review, url = self.create_review(user)
+        comment = Comments.objects.create(
+            review=review, author=user, text='Комментарий'
+        )
+        url = f'{url}comments/{comment.id}/'
+        other.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = other.patch(url, data={'text': 'Чужой'})
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пользователь не может менять чужой комментарий.'
+        )
+        assert len(context) == 1, (
+            'Проверьте, что наличие комментария и его автор проверяются '
+            'одним запросом.'
+        )
+        response = get_client(user).patch(url, data={'text': 'Правка'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор может править свой комментарий.'
+        )
+        response = get_client(moderator).delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            'Проверьте, что модератор может удалить комментарий.'
+        )
@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comments, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29NestedRoutes:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_chain(self, author):
+        title = Title.objects.create(name='Произведение', year=1990)
+        other = Title.objects.create(name='Другое', year=1991)
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        )
+        Comments.objects.create(review=review, author=author,
+                                text='Комментарий')
+        return title, other, review
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        return response, len(context)
+
+    def test_01_reviews_list_checks_title_once(self, client, user):
+        title, other, _ = self.create_chain(user)
+        response, queries = self.get(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()) == 1
+        assert queries == 2, (
+            'Проверьте, что произведение ищется один раз - вместе '
+            'со счётчиками для ETag, - а отзывы вторым запросом.'
+        )
+        response, queries = self.get(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=other.id + 1)
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert queries == 1
+
+    def test_02_comments_chain_in_one_query(self, client, user):
+        title, other, review = self.create_chain(user)
+        response, queries = self.get(client, self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        ))
+        assert response.status_code == HTTPStatus.OK
+        assert [comment['text'] for comment in response.json()] == [
+            'Комментарий'
+        ]
+        assert queries == 1, (
+            'Проверьте, что цепочка произведение - отзыв проверяется '
+            'тем же запросом, что выбирает комментарии.'
+        )
+        for title_id, review_id in ((other.id, review.id),
+                                    (title.id, review.id + 1)):
+            response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ))
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что отзыв чужого произведения и несуществующий '
+                'отзыв дают 404.'
+            )
+        Comments.objects.all().delete()
+        response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        ))
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что у отзыва без комментариев список пуст, а не 404.'
+        )
+        assert response.json() == []
+
+    def test_03_create_uses_resolved_parent(self, user_client, user):
+        title, other, review = self.create_chain(user)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        user_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ещё'})
+        assert response.status_code == HTTPStatus.CREATED
+        parents = [
+            query['sql'] for query in context
+            if query['sql'].startswith('SELECT')
+            and '"reviews_review"' in query['sql']
+        ]
+        assert len(parents) == 1, (
+            'Проверьте, что отзыв загружается при создании один раз.'
+        )
+        comment = Comments.objects.get(text='Ещё')
+        assert (comment.review_id, comment.author_id) == (review.id, user.id)
+        response = user_client.post(
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=other.id, review_id=review.id
+            ), data={'text': 'Мимо'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
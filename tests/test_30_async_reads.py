@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.urls import resolve
+
+from api import views
+from api.authentication import ClaimsAccessToken
+from reviews.models import Genre, Review, Title
+
+
+def run(*requests):
+    async def gather():
+        return await asyncio.gather(*requests)
+    return asyncio.run(gather())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30AsyncReads:
+
+    def test_01_async_reads_match_sync(self, client, user):
+        title = Title.objects.create(name='Произведение', year=1990)
+        Genre.objects.create(name='Драма', slug='drama')
+        Review.objects.create(title=title, author=user, text='Отзыв', score=7)
+        urls = ('/api/v1/titles/', f'/api/v1/titles/{title.id}/',
+                '/api/v1/genres/', '/api/v1/categories/',
+                f'/api/v1/titles/{title.id}/reviews/')
+        expected = [client.get(url).json() for url in urls]
+        async_client = AsyncClient()
+        responses = run(*(async_client.get(url) for url in urls))
+        assert [response.status_code for response in responses] == [
+            HTTPStatus.OK
+        ] * len(urls)
+        assert [response.json() for response in responses] == expected, (
+            'Проверьте, что под ASGI чтение отдаёт те же данные, что под WSGI.'
+        )
+        assert '2 queries' in responses[-1]['Server-Timing'], (
+            'Проверьте, что запросы из рабочего потока попадают в метрики.'
+        )
+        assert not asyncio.iscoroutinefunction(resolve(urls[0]).func), (
+            'Проверьте, что вне цикла событий маршрут отдаёт синхронную '
+            'вьюху.'
+        )
+
+    def test_02_reads_run_in_parallel(self, monkeypatch):
+        first = Title.objects.create(name='Первое', year=1990)
+        second = Title.objects.create(name='Второе', year=1991)
+        barrier = threading.Barrier(2, timeout=5)
+        get_score_stats = views.get_score_stats
+
+        def wait_for_each_other(histogram):
+            barrier.wait()
+            return get_score_stats(histogram)
+
+        monkeypatch.setattr(views, 'get_score_stats', wait_for_each_other)
+        async_client = AsyncClient()
+        responses = run(*(
+            async_client.get(f'/api/v1/titles/{title.id}/stats/')
+            for title in (first, second)
+        ))
+        assert [response.status_code for response in responses] == [
+            HTTPStatus.OK, HTTPStatus.OK
+        ], (
+            'Проверьте, что под ASGI два чтения выполняются одновременно, '
+            'а не по очереди в одном общем потоке.'
+        )
+
+    def test_03_writes_and_fan_in_benchmark(self, user):
+        title = Title.objects.create(name='Произведение', year=1990)
+        response, = run(AsyncClient().post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data=json.dumps({'text': 'Отзыв', 'score': 8}),
+            content_type='application/json',
+            authorization=f'Bearer {ClaimsAccessToken.for_user(user)}',
+        ))
+        assert response.status_code == HTTPStatus.CREATED
+        assert Title.objects.get(pk=title.pk).rating == 8
+        output = StringIO()
+        call_command('benchmark', '--fan-in', '4', '--requests', '8',
+                     '--route', 'titles-list', stdout=output)
+        route = json.loads(output.getvalue())['routes']['titles-list']
+        assert set(route) == {'wsgi', 'asgi'}, (
+            'Проверьте, что --fan-in сравнивает WSGI и ASGI.'
+        )
+        assert all(
+            mode['requests'] == 8 and mode['errors'] == 0
+            for mode in route.values()
+        )